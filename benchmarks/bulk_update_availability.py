@@ -0,0 +1,107 @@
+"""
+Measures POST /availability/bulk throughput at the service layer.
+
+Seeds the requested number of professionals into the database pointed at by DATABASE_URL (prefer a scratch database),
+then times bulkUpdateAvailability for each scale, once creating the RealTimeStatus rows and once updating them.
+
+Usage:
+    python -m benchmarks.bulk_update_availability --scales 1000 10000 100000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import List
+
+import project.bulkUpdateAvailability_service as bulk
+from prisma import Prisma
+
+SEED_PROFESSIONALS_QUERY = """
+WITH new_users AS (
+    INSERT INTO "User" ("email", "password", "role")
+    SELECT 'bench-professional-' || g || '@example.com', 'x', 'Professional'::"Role"
+    FROM generate_series(1, $1::int) AS g
+    ON CONFLICT ("email") DO NOTHING
+    RETURNING "id"
+), new_profiles AS (
+    INSERT INTO "Profile" ("userId", "firstName", "lastName")
+    SELECT "id", 'Bench', 'Professional' FROM new_users
+    RETURNING "id"
+)
+INSERT INTO "ProfessionalInfo" ("profileId", "availability")
+SELECT "id", '{}'::jsonb FROM new_profiles
+"""
+
+BENCH_PROFESSIONAL_IDS_QUERY = """
+SELECT pi."id" AS "id"
+FROM "ProfessionalInfo" pi
+JOIN "Profile" p ON p."id" = pi."profileId"
+JOIN "User" u ON u."id" = p."userId"
+WHERE u."email" LIKE 'bench-professional-%'
+ORDER BY pi."id"
+LIMIT $1
+"""
+
+CLEAR_BENCH_STATUSES_QUERY = """
+DELETE FROM "RealTimeStatus"
+WHERE "professionalInfoId" = ANY(SELECT (jsonb_array_elements_text($1::jsonb))::int)
+"""
+
+
+async def professional_ids(db: Prisma, count: int) -> List[int]:
+    await db.execute_raw(SEED_PROFESSIONALS_QUERY, count)
+    rows = await db.query_raw(BENCH_PROFESSIONAL_IDS_QUERY, count)
+    return [row["id"] for row in rows]
+
+
+async def time_bulk_update(ids: List[int]) -> float:
+    updates = [
+        bulk.ProfessionalAvailabilityUpdate(
+            professionalInfoId=professional_info_id,
+            isAvailable=random.random() < 0.5,
+            currentActivity=random.choice([None, "In a meeting", "On a break"]),
+        )
+        for professional_info_id in ids
+    ]
+    started = time.perf_counter()
+    response = await bulk.bulkUpdateAvailability(updates)
+    elapsed = time.perf_counter() - started
+    if response.errors:
+        raise RuntimeError(f"{len(response.errors)} rows failed: {response.errors[:3]}")
+    return elapsed
+
+
+async def main(scales: List[int]) -> None:
+    db = Prisma(auto_register=True)
+    await db.connect()
+    results = []
+    try:
+        for scale in scales:
+            ids = await professional_ids(db, scale)
+            await db.execute_raw(CLEAR_BENCH_STATUSES_QUERY, json.dumps(ids))
+            insert_seconds = await time_bulk_update(ids)
+            update_seconds = await time_bulk_update(ids)
+            results.append(
+                {
+                    "rows": len(ids),
+                    "chunk_size": bulk.UPSERT_CHUNK_SIZE,
+                    "insert_seconds": round(insert_seconds, 4),
+                    "insert_rows_per_second": round(len(ids) / insert_seconds),
+                    "update_seconds": round(update_seconds, 4),
+                    "update_rows_per_second": round(len(ids) / update_seconds),
+                }
+            )
+            print(json.dumps(results[-1]))
+    finally:
+        await db.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--scales", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.scales))
@@ -0,0 +1,544 @@
+"""
+Drives every route of a running server with a concurrent async load generator and reports, per endpoint,
+throughput, p50/p95/p99 latency and database queries per request.
+
+Start the server against a database seeded with `benchmarks.seed`, then run:
+
+    python -m benchmarks.load --base-url http://localhost:8000 --concurrency 32 --duration 10
+
+DATABASE_URL must point at the same database so that fixtures can be read. Queries per request are taken from
+pg_stat_statements and are reported as null when the extension is not installed. Results are written as JSON to
+benchmarks/results/ so that runs can be compared. Routes that mutate data run after all read-only routes; pass
+--read-only to skip them.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+import project.auth
+from benchmarks.seed import BENCH_PASSWORD
+from prisma import Prisma
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+FIXTURE_QUERIES = {
+    "user_ids": """SELECT "id" FROM "User" WHERE "email" LIKE 'bench-user-%' ORDER BY "id" """,
+    "user_emails": """SELECT "email" AS "id" FROM "User" WHERE "email" LIKE 'bench-user-%' LIMIT 1000""",
+    "professional_user_ids": """SELECT "id" FROM "User" WHERE "email" LIKE 'bench-professional-%' ORDER BY "id" """,
+    "profile_ids": """SELECT p."id" FROM "Profile" p JOIN "User" u ON u."id" = p."userId"
+        WHERE u."email" LIKE 'bench-professional-%' ORDER BY p."id" """,
+    "professional_info_ids": """SELECT "id" FROM "ProfessionalInfo" ORDER BY "id" """,
+    "appointment_ids": """SELECT "id" FROM "Appointment" ORDER BY "id" DESC LIMIT 100000""",
+    "feedback_ids": """SELECT "id" FROM "Feedback" ORDER BY "id" DESC LIMIT 100000""",
+}
+
+STATEMENT_COUNT_QUERY = """
+SELECT coalesce(sum("calls"), 0)::bigint AS "calls"
+FROM pg_stat_statements
+WHERE "query" NOT ILIKE '%pg_stat_statements%'
+"""
+
+
+@dataclass
+class Fixtures:
+    pools: Dict[str, List[Any]]
+    admin_token: str = ""
+    consumed: Dict[str, itertools.count] = field(default_factory=dict)
+
+    def any(self, name: str) -> Any:
+        return random.choice(self.pools[name])
+
+    def take(self, name: str) -> Any:
+        """
+        Hands out each ID once, for routes that delete or otherwise consume the row.
+        """
+        position = next(self.consumed.setdefault(name, itertools.count()))
+        if position >= len(self.pools[name]):
+            raise IndexError(f"fixture pool {name} exhausted")
+        return self.pools[name][position]
+
+    def admin(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.admin_token}"}
+
+    def user(self) -> Dict[str, str]:
+        token = project.auth.issue_token(self.any("user_ids"), "User")
+        return {"Authorization": f"Bearer {token}"}
+
+
+@dataclass
+class Scenario:
+    method: str
+    path: str
+    build: Callable[[Fixtures], Dict[str, Any]]
+    mutating: bool = False
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.path}"
+
+
+def future_time() -> str:
+    hours = random.randint(24, 24 * 365)
+    moment = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    return (moment + timedelta(hours=hours)).isoformat()
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("GET", "/availability", lambda f: {"params": {"limit": 500}}),
+    Scenario("GET", "/availability/export", lambda f: {"params": {"batch_size": 1000}}),
+    Scenario("GET", "/availability/changes", lambda f: {"params": {"since": 0, "limit": 1000}}),
+    Scenario(
+        "GET",
+        "/availability/{professionalId}",
+        lambda f: {"url": f"/availability/{f.any('professional_info_ids')}"},
+    ),
+    Scenario(
+        "POST",
+        "/availability/query",
+        lambda f: {
+            "json": {
+                "professionalIds": random.sample(
+                    f.pools["professional_info_ids"],
+                    min(100, len(f.pools["professional_info_ids"])),
+                )
+            }
+        },
+    ),
+    Scenario(
+        "GET",
+        "/calendar/schedule/{professionalId}",
+        lambda f: {
+            "url": f"/calendar/schedule/{f.any('profile_ids')}",
+            "params": {"startDate": datetime.now(timezone.utc).date().isoformat()},
+        },
+    ),
+    Scenario("GET", "/calendar/slots", lambda f: {"params": {"count": 10}}),
+    Scenario("GET", "/users/{id}", lambda f: {"url": f"/users/{f.any('user_ids')}"}),
+    Scenario(
+        "GET",
+        "/bookings/{bookingId}",
+        lambda f: {"url": f"/bookings/{f.any('appointment_ids')}"},
+    ),
+    Scenario(
+        "GET",
+        "/feedback",
+        lambda f: {"params": {"professional_id": f.any("profile_ids"), "limit": 50}},
+    ),
+    Scenario(
+        "GET",
+        "/feedback/export",
+        lambda f: {"params": {"professional_id": f.any("profile_ids"), "fields": "id,rating"}},
+    ),
+    Scenario(
+        "GET",
+        "/feedback/{feedbackId}",
+        lambda f: {
+            "url": f"/feedback/{f.any('feedback_ids')}",
+            "headers": f.admin(),
+        },
+    ),
+    Scenario(
+        "GET",
+        "/professionals/{professionalId}/rating",
+        lambda f: {"url": f"/professionals/{f.any('profile_ids')}/rating"},
+    ),
+    Scenario(
+        "GET",
+        "/professionals/ratings",
+        lambda f: {"params": {"ids": [f.any("profile_ids") for _ in range(20)]}},
+    ),
+    Scenario(
+        "POST",
+        "/users/authenticate",
+        lambda f: {"params": {"email": f.any("user_emails"), "password": BENCH_PASSWORD}},
+    ),
+    Scenario(
+        "PATCH",
+        "/availability/{professionalId}",
+        lambda f: {
+            "url": f"/availability/{f.any('professional_info_ids')}",
+            "params": {
+                "isAvailable": random.choice(["true", "false"]),
+                "currentActivity": "Benchmark",
+            },
+        },
+        mutating=True,
+    ),
+    Scenario(
+        "POST",
+        "/availability/{professionalId}",
+        lambda f: {
+            "url": f"/availability/{f.any('professional_info_ids')}",
+            "params": {"isAvailable": "true", "currentActivity": "Benchmark"},
+        },
+        mutating=True,
+    ),
+    Scenario(
+        "POST",
+        "/availability/bulk",
+        lambda f: {
+            "json": [
+                {
+                    "professionalInfoId": professional_info_id,
+                    "isAvailable": random.random() < 0.5,
+                    "currentActivity": None,
+                }
+                for professional_info_id in random.sample(
+                    f.pools["professional_info_ids"],
+                    min(500, len(f.pools["professional_info_ids"])),
+                )
+            ]
+        },
+        mutating=True,
+    ),
+    Scenario(
+        "POST",
+        "/notifications/availability",
+        lambda f: {
+            "params": {
+                "professionalId": f.any("professional_user_ids"),
+                "userId": f.any("user_ids"),
+                "newAvailability": random.choice(["true", "false"]),
+            }
+        },
+        mutating=True,
+    ),
+    Scenario(
+        "POST",
+        "/bookings",
+        lambda f: {
+            "params": {
+                "userId": f.any("user_ids"),
+                "professionalId": f.any("profile_ids"),
+                "appointmentTime": future_time(),
+            }
+        },
+        mutating=True,
+    ),
+    Scenario(
+        "POST",
+        "/calendar/book",
+        lambda f: {
+            "params": {
+                "professionalId": f.any("professional_user_ids"),
+                "userId": f.any("user_ids"),
+                "time": future_time(),
+                "notes": "Benchmark",
+            }
+        },
+        mutating=True,
+    ),
+    Scenario(
+        "POST",
+        "/notifications/booking",
+        lambda f: {
+            "params": {
+                "booking_id": f.any("appointment_ids"),
+                "user_id": f.any("user_ids"),
+                "professional_id": f.any("profile_ids"),
+            }
+        },
+        mutating=True,
+    ),
+    Scenario(
+        "PUT",
+        "/bookings/{bookingId}",
+        lambda f: {
+            "url": f"/bookings/{f.any('appointment_ids')}",
+            "params": {"newTime": future_time(), "status": "Confirmed"},
+        },
+        mutating=True,
+    ),
+    Scenario(
+        "PUT",
+        "/calendar/appointment/{appointmentId}",
+        lambda f: {
+            "url": f"/calendar/appointment/{f.any('appointment_ids')}",
+            "params": {"new_time": future_time()},
+        },
+        mutating=True,
+    ),
+    Scenario(
+        "POST",
+        "/feedback",
+        lambda f: {
+            "params": {
+                "professional_id": f.any("profile_ids"),
+                "user_id": f.any("user_ids"),
+                "content": "Benchmark feedback",
+                "rating": random.randint(1, 5),
+            }
+        },
+        mutating=True,
+    ),
+    Scenario(
+        "PUT",
+        "/feedback/{feedbackId}",
+        lambda f: {
+            "url": f"/feedback/{f.any('feedback_ids')}",
+            "params": {
+                "content": "Updated benchmark feedback",
+                "rating": random.randint(1, 5),
+            },
+            "headers": f.admin(),
+        },
+        mutating=True,
+    ),
+    Scenario(
+        "POST",
+        "/users/register",
+        lambda f: {
+            "params": {
+                "name": "Bench Registrant",
+                "email": f"bench-registrant-{time.time_ns()}-{random.random()}@example.com",
+                "password": BENCH_PASSWORD,
+            }
+        },
+        mutating=True,
+    ),
+    Scenario(
+        "POST",
+        "/professionals/{professionalId}/watch",
+        lambda f: {
+            "url": f"/professionals/{f.any('profile_ids')}/watch",
+            "headers": f.user(),
+        },
+        mutating=True,
+    ),
+    Scenario(
+        "DELETE",
+        "/professionals/{professionalId}/watch",
+        lambda f: {
+            "url": f"/professionals/{f.any('profile_ids')}/watch",
+            "headers": f.user(),
+        },
+        mutating=True,
+    ),
+    Scenario(
+        "POST",
+        "/users/logout",
+        lambda f: {"headers": f.user()},
+        mutating=True,
+    ),
+    Scenario(
+        "POST",
+        "/users/{id}/revoke-tokens",
+        lambda f: {
+            "url": f"/users/{f.any('professional_user_ids')}/revoke-tokens",
+            "headers": f.admin(),
+        },
+        mutating=True,
+    ),
+    Scenario(
+        "PUT",
+        "/users/{id}/role",
+        lambda f: {
+            "url": f"/users/{f.any('user_ids')}/role",
+            "params": {"new_role": "User"},
+            "headers": f.admin(),
+        },
+        mutating=True,
+    ),
+    Scenario(
+        "DELETE",
+        "/calendar/appointment/{appointmentId}",
+        lambda f: {"url": f"/calendar/appointment/{f.take('appointment_ids')}"},
+        mutating=True,
+    ),
+    Scenario(
+        "DELETE",
+        "/bookings/{bookingId}",
+        lambda f: {"url": f"/bookings/{f.take('appointment_ids')}"},
+        mutating=True,
+    ),
+    Scenario(
+        "DELETE",
+        "/feedback/{feedbackId}",
+        lambda f: {
+            "url": f"/feedback/{f.take('feedback_ids')}",
+            "headers": f.admin(),
+        },
+        mutating=True,
+    ),
+    Scenario(
+        "DELETE",
+        "/availability/{professionalId}",
+        lambda f: {"url": f"/availability/{f.take('profile_ids')}"},
+        mutating=True,
+    ),
+    Scenario(
+        "DELETE",
+        "/users/{id}",
+        lambda f: {
+            "url": f"/users/{f.take('user_ids')}",
+            "params": {"confirmation": "true"},
+            "headers": f.admin(),
+        },
+        mutating=True,
+    ),
+]
+
+# Long-lived streams have no meaningful request latency; they are listed so the coverage check does not flag them.
+UNBENCHMARKED_ROUTES = {"GET /availability/stream"}
+
+
+async def load_fixtures(db: Prisma) -> Fixtures:
+    pools = {}
+    for name, query in FIXTURE_QUERIES.items():
+        rows = await db.query_raw(query)
+        pools[name] = [row["id"] for row in rows]
+        if not pools[name]:
+            raise SystemExit(f"No {name} found; seed the database with benchmarks.seed first")
+    # Tokens are verified locally, so an admin token signed with the server's JWT_SECRET_KEY needs no admin row. It
+    # belongs to a user ID that does not exist, so that role changes and revocations in the run never revoke it.
+    admin_token = project.auth.issue_token(0, "Admin")
+    return Fixtures(pools, admin_token)
+
+
+async def statement_count(db: Prisma) -> Optional[int]:
+    try:
+        rows = await db.query_raw(STATEMENT_COUNT_QUERY)
+    except Exception:
+        return None
+    return int(rows[0]["calls"])
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    db: Prisma,
+    fixtures: Fixtures,
+    scenario: Scenario,
+    concurrency: int,
+    duration: float,
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    deadline = time.perf_counter() + duration
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            try:
+                request = scenario.build(fixtures)
+            except IndexError:
+                return
+            url = request.pop("url", scenario.path)
+            started = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, url, **request)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    statements_before = await statement_count(db)
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    statements_after = await statement_count(db)
+
+    requests = len(latencies)
+    queries_per_request = None
+    if statements_before is not None and statements_after is not None and requests:
+        # The "after" snapshot itself is counted once.
+        queries_per_request = round((statements_after - statements_before - 1) / requests, 2)
+    return {
+        "endpoint": scenario.name,
+        "requests": requests,
+        "throughput_rps": round(requests / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99": round(percentile(latencies, 0.99) * 1000, 2),
+            "mean": round(statistics.fmean(latencies) * 1000, 2),
+        }
+        if latencies
+        else None,
+        "status_codes": {str(code): count for code, count in sorted(statuses.items())},
+        "queries_per_request": queries_per_request,
+    }
+
+
+async def uncovered_routes(client: httpx.AsyncClient) -> List[str]:
+    openapi = (await client.get("/openapi.json")).json()
+    routes = {
+        f"{method.upper()} {path}"
+        for path, operations in openapi["paths"].items()
+        for method in operations
+    }
+    covered = {scenario.name for scenario in SCENARIOS} | UNBENCHMARKED_ROUTES
+    return sorted(routes - covered)
+
+
+async def main(args: argparse.Namespace) -> None:
+    started_at = datetime.now(timezone.utc)
+    db = Prisma()
+    await db.connect()
+    try:
+        fixtures = await load_fixtures(db)
+        scenarios = [s for s in SCENARIOS if not (args.read_only and s.mutating)]
+        if args.only:
+            scenarios = [s for s in scenarios if any(o in s.name for o in args.only)]
+        scenarios.sort(key=lambda s: s.mutating)
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(
+            base_url=args.base_url, limits=limits, timeout=60.0
+        ) as client:
+            missing = await uncovered_routes(client)
+            if missing:
+                print(f"Routes without a benchmark scenario: {missing}", file=sys.stderr)
+            results = []
+            for scenario in scenarios:
+                result = await run_scenario(
+                    client, db, fixtures, scenario, args.concurrency, args.duration
+                )
+                print(json.dumps(result))
+                results.append(result)
+    finally:
+        await db.disconnect()
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    output = args.output or RESULTS_DIR / (
+        started_at.strftime("%Y%m%dT%H%M%SZ") + ".json"
+    )
+    Path(output).write_text(
+        json.dumps(
+            {
+                "base_url": args.base_url,
+                "concurrency": args.concurrency,
+                "duration_seconds": args.duration,
+                "started_at": started_at.isoformat(),
+                "uncovered_routes": missing,
+                "results": results,
+            },
+            indent=2,
+        )
+    )
+    print(f"Results written to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per endpoint")
+    parser.add_argument("--read-only", action="store_true")
+    parser.add_argument("--only", nargs="*", help="substrings of endpoints to run")
+    parser.add_argument("--output", help="path of the JSON results file")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,182 @@
+"""
+Seeds a scratch database with a benchmark dataset shaped like production traffic.
+
+The dataset is scaled from the number of appointments: one professional per 200 appointments (at least 50), one
+user per 20 appointments (at least 100), and one feedback entry and one calendar event per 10 appointments. Every
+user watches WATCHES_PER_USER professionals, so availability changes fan out to their followers.
+Appointments are spread over the 30 days around now. Run against an empty database created with
+`prisma db push --force-reset`.
+
+Usage:
+    python -m benchmarks.seed --appointments 100000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import bcrypt
+import project.rating_aggregates
+from prisma import Prisma
+
+BENCH_PASSWORD = "benchmark-password"
+WATCHES_PER_USER = 3
+
+WEEKLY_TEMPLATE = json.dumps(
+    {
+        "mon": "08:00-18:00",
+        "tue": "08:00-18:00",
+        "wed": "08:00-18:00",
+        "thu": "08:00-18:00",
+        "fri": "08:00-16:00",
+    }
+)
+
+SEED_USERS_QUERY = """
+WITH new_users AS (
+    INSERT INTO "User" ("email", "password", "role")
+    SELECT 'bench-' || $3 || '-' || g || '@example.com', $2, $4::"Role"
+    FROM generate_series(1, $1::int) AS g
+    ON CONFLICT ("email") DO NOTHING
+    RETURNING "id"
+)
+INSERT INTO "Profile" ("userId", "firstName", "lastName", "bio")
+SELECT "id", 'Bench', initcap($3) || ' ' || "id", 'Seeded for benchmarks' FROM new_users
+"""
+
+SEED_PROFESSIONAL_INFO_QUERY = """
+WITH new_info AS (
+    INSERT INTO "ProfessionalInfo" ("profileId", "availability")
+    SELECT p."id", $1::jsonb
+    FROM "Profile" p
+    JOIN "User" u ON u."id" = p."userId"
+    WHERE u."email" LIKE 'bench-professional-%'
+    ON CONFLICT ("profileId") DO NOTHING
+    RETURNING "id", "profileId"
+), new_status AS (
+    INSERT INTO "RealTimeStatus" ("professionalInfoId", "isAvailable", "currentActivity")
+    SELECT "id", "id" % 3 <> 0, CASE WHEN "id" % 3 = 0 THEN 'In a session' END FROM new_info
+)
+INSERT INTO "Calendar" ("profileId")
+SELECT "profileId" FROM new_info
+"""
+
+SEED_APPOINTMENTS_QUERY = """
+WITH users AS (
+    SELECT u."id", row_number() OVER (ORDER BY u."id") AS rn
+    FROM "User" u WHERE u."email" LIKE 'bench-user-%'
+), professionals AS (
+    SELECT p."id", row_number() OVER (ORDER BY p."id") AS rn
+    FROM "Profile" p JOIN "User" u ON u."id" = p."userId"
+    WHERE u."email" LIKE 'bench-professional-%'
+), counts AS (
+    SELECT (SELECT count(*) FROM users) AS users, (SELECT count(*) FROM professionals) AS professionals
+)
+INSERT INTO "Appointment" ("userId", "profileId", "time", "status", "updatedAt")
+SELECT us."id",
+       pr."id",
+       date_trunc('hour', now()) + ((g / counts.professionals) % 720 - 360) * interval '1 hour',
+       (ARRAY['Pending', 'Confirmed', 'Completed', 'Cancelled']::"Status"[])[1 + g % 4],
+       now()
+FROM generate_series(1, $1::int) AS g
+CROSS JOIN counts
+JOIN users us ON us.rn = 1 + g % counts.users
+JOIN professionals pr ON pr.rn = 1 + g % counts.professionals
+"""
+
+SEED_FEEDBACK_QUERY = """
+WITH users AS (
+    SELECT u."id", row_number() OVER (ORDER BY u."id") AS rn
+    FROM "User" u WHERE u."email" LIKE 'bench-user-%'
+), professionals AS (
+    SELECT p."id", row_number() OVER (ORDER BY p."id") AS rn
+    FROM "Profile" p JOIN "User" u ON u."id" = p."userId"
+    WHERE u."email" LIKE 'bench-professional-%'
+), counts AS (
+    SELECT (SELECT count(*) FROM users) AS users, (SELECT count(*) FROM professionals) AS professionals
+)
+INSERT INTO "Feedback" ("userId", "profileId", "content", "rating", "createdAt")
+SELECT us."id", pr."id", 'Seeded feedback ' || g, 1 + g % 5, now() - (g % 10000) * interval '1 minute'
+FROM generate_series(1, $1::int) AS g
+CROSS JOIN counts
+JOIN users us ON us.rn = 1 + g % counts.users
+JOIN professionals pr ON pr.rn = 1 + (g * 7) % counts.professionals
+"""
+
+SEED_CALENDAR_EVENTS_QUERY = """
+WITH calendars AS (
+    SELECT "id", row_number() OVER (ORDER BY "id") AS rn FROM "Calendar"
+), counts AS (
+    SELECT count(*) AS calendars FROM calendars
+)
+INSERT INTO "CalendarEvent" ("calendarId", "start", "end", "title")
+SELECT c."id",
+       date_trunc('hour', now()) + ((g / counts.calendars) % 720 - 360) * interval '1 hour' + interval '30 minutes',
+       date_trunc('hour', now()) + ((g / counts.calendars) % 720 - 360) * interval '1 hour' + interval '90 minutes',
+       'Blocked time'
+FROM generate_series(1, $1::int) AS g
+CROSS JOIN counts
+JOIN calendars c ON c.rn = 1 + g % counts.calendars
+"""
+
+SEED_WATCHES_QUERY = """
+WITH users AS (
+    SELECT u."id", row_number() OVER (ORDER BY u."id") AS rn
+    FROM "User" u WHERE u."email" LIKE 'bench-user-%'
+), professionals AS (
+    SELECT p."id", row_number() OVER (ORDER BY p."id") AS rn
+    FROM "Profile" p JOIN "User" u ON u."id" = p."userId"
+    WHERE u."email" LIKE 'bench-professional-%'
+), counts AS (
+    SELECT count(*) AS professionals FROM professionals
+)
+INSERT INTO "ProfessionalWatch" ("userId", "profileId")
+SELECT us."id", pr."id"
+FROM users us
+CROSS JOIN generate_series(0, $1::int - 1) AS k
+CROSS JOIN counts
+JOIN professionals pr ON pr.rn = 1 + (us.rn * 7 + k) % counts.professionals
+ON CONFLICT ("userId", "profileId") DO NOTHING
+"""
+
+
+async def seed(appointments: int) -> dict:
+    professionals = max(50, appointments // 200)
+    users = max(100, appointments // 20)
+    password = bcrypt.hashpw(BENCH_PASSWORD.encode("utf-8"), bcrypt.gensalt()).decode(
+        "utf-8"
+    )
+    db = Prisma()
+    await db.connect()
+    started = time.perf_counter()
+    try:
+        await db.execute_raw(SEED_USERS_QUERY, users, password, "user", "User")
+        await db.execute_raw(
+            SEED_USERS_QUERY, professionals, password, "professional", "Professional"
+        )
+        await db.execute_raw(SEED_PROFESSIONAL_INFO_QUERY, WEEKLY_TEMPLATE)
+        await db.execute_raw(SEED_APPOINTMENTS_QUERY, appointments)
+        await db.execute_raw(SEED_FEEDBACK_QUERY, appointments // 10)
+        await db.execute_raw(project.rating_aggregates.REBUILD_QUERY)
+        await db.execute_raw(SEED_CALENDAR_EVENTS_QUERY, appointments // 10)
+        await db.execute_raw(SEED_WATCHES_QUERY, WATCHES_PER_USER)
+        await db.execute_raw("ANALYZE")
+    finally:
+        await db.disconnect()
+    return {
+        "appointments": appointments,
+        "professionals": professionals,
+        "users": users,
+        "feedback": appointments // 10,
+        "calendar_events": appointments // 10,
+        "watches": users * WATCHES_PER_USER,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--appointments", type=int, default=100_000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(seed(args.appointments))))
@@ -0,0 +1,134 @@
+"""
+Measures the CPU time spent turning a large response into bytes, comparing FastAPI's default path (build the response
+model, validate it against response_model, run jsonable_encoder, encode) with the project.fast_json path used by
+GET /availability and GET /feedback.
+
+No database is needed: each route returns a synthetic page of the given size, and requests are made in-process.
+
+Usage:
+    python -m benchmarks.serialization --sizes 1000 10000 100000
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+import project.checkAllAvailability_service as availability
+import project.fast_json
+import project.listFeedback_service as feedback
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+
+def availability_page(size: int) -> dict:
+    return {
+        "availability": [
+            {
+                "professional_id": professional_id,
+                "is_available": random.random() < 0.5,
+                "current_activity": random.choice([None, "In a meeting", "On a break"]),
+            }
+            for professional_id in range(1, size + 1)
+        ],
+        "next_after_id": size,
+    }
+
+
+def feedback_page(size: int) -> dict:
+    return {
+        "feedbacks": [
+            {
+                "id": feedback_id,
+                "userId": random.randint(1, 10000),
+                "profileId": random.randint(1, 1000),
+                "content": "Very helpful and on time.",
+                "rating": random.randint(1, 5),
+                # As read from the database: UTC, with millisecond precision.
+                "createdAt": datetime(2024, 5, 1, 12, 0, random.randint(0, 59), tzinfo=timezone.utc)
+                + timedelta(milliseconds=random.randint(0, 999)),
+            }
+            for feedback_id in range(1, size + 1)
+        ],
+        "next_cursor": None,
+    }
+
+
+def build_app(pages: Dict[str, dict]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/model/availability", response_model=availability.FetchAvailabilityResponse)
+    async def model_availability() -> availability.FetchAvailabilityResponse:
+        return availability.FetchAvailabilityResponse.model_validate(pages["availability"])
+
+    @app.get("/fast/availability", response_model=availability.FetchAvailabilityResponse)
+    async def fast_availability() -> project.fast_json.FastJSONResponse:
+        return project.fast_json.FastJSONResponse(pages["availability"])
+
+    @app.get(
+        "/model/feedback",
+        response_model=feedback.FeedbackListResponse,
+        response_model_exclude_unset=True,
+    )
+    async def model_feedback() -> feedback.FeedbackListResponse:
+        page = pages["feedback"]
+        return feedback.FeedbackListResponse(
+            feedbacks=[feedback.Feedback(**entry) for entry in page["feedbacks"]],
+            next_cursor=page["next_cursor"],
+        )
+
+    @app.get("/fast/feedback", response_model=feedback.FeedbackListResponse)
+    async def fast_feedback() -> project.fast_json.FastJSONResponse:
+        return project.fast_json.FastJSONResponse(pages["feedback"])
+
+    return app
+
+
+def cpu_ms(request: Callable[[], object], repeat: int) -> float:
+    """
+    Median CPU time of one request, in milliseconds.
+    """
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.process_time()
+        request()
+        samples.append((time.process_time() - started) * 1000)
+    samples.sort()
+    return round(samples[len(samples) // 2], 2)
+
+
+def main(sizes: List[int], repeat: int) -> None:
+    results = []
+    for size in sizes:
+        pages = {"availability": availability_page(size), "feedback": feedback_page(size)}
+        with TestClient(build_app(pages)) as client:
+            for route in ("availability", "feedback"):
+                # Warm up both paths so that imports and schema generation are not measured.
+                model_body = client.get(f"/model/{route}").content
+                fast_body = client.get(f"/fast/{route}").content
+                if json.loads(model_body) != json.loads(fast_body):
+                    raise RuntimeError(f"The two paths disagree on /{route}")
+                model = cpu_ms(lambda: client.get(f"/model/{route}"), repeat)
+                fast = cpu_ms(lambda: client.get(f"/fast/{route}"), repeat)
+                results.append(
+                    {
+                        "route": route,
+                        "size": size,
+                        "bytes": len(fast_body),
+                        "encoder": project.fast_json.ENCODER,
+                        "model_cpu_ms": model,
+                        "fast_cpu_ms": fast,
+                        "speedup": round(model / fast, 2) if fast else None,
+                    }
+                )
+                print(json.dumps(results[-1]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.sizes, args.repeat)
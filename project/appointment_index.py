@@ -0,0 +1,342 @@
+import asyncio
+import os
+from bisect import bisect_left, insort
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import prisma
+import prisma.enums
+import prisma.models
+from project.cache import LRUCache
+
+# Appointments do not store a length; every appointment occupies this much time from its start.
+APPOINTMENT_DURATION = timedelta(hours=1)
+
+
+def as_utc(value: datetime) -> datetime:
+    """
+    Normalises a datetime to an aware UTC datetime. Naive values are taken to be UTC already.
+
+    Args:
+        value (datetime): The datetime to normalise.
+
+    Returns:
+        datetime: The same instant as an aware UTC datetime.
+    """
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class IntervalIndex:
+    """
+    The non-cancelled appointments of one professional, ordered by start time. Overlap queries bisect to the first
+    appointment starting at or after the end of the queried interval and walk back only while a start is recent enough
+    to still overlap, which is O(log n) for a schedule without overlapping appointments.
+    """
+
+    def __init__(self, loaded_from: datetime):
+        self.loaded_from = loaded_from
+        self._starts: List[Tuple[datetime, int]] = []
+        self._intervals: Dict[int, Tuple[datetime, datetime]] = {}
+        self._max_duration = APPOINTMENT_DURATION
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    def covers(self, start: datetime) -> bool:
+        """
+        Whether every appointment that could overlap an interval starting at ``start`` was loaded into the index.
+        """
+        return as_utc(start) - self._max_duration >= self.loaded_from
+
+    def add(self, appointmentId: int, start: datetime, end: datetime) -> None:
+        self.remove(appointmentId)
+        start, end = as_utc(start), as_utc(end)
+        insort(self._starts, (start, appointmentId))
+        self._intervals[appointmentId] = (start, end)
+        self._max_duration = max(self._max_duration, end - start)
+
+    def remove(self, appointmentId: int) -> None:
+        interval = self._intervals.pop(appointmentId, None)
+        if interval is None:
+            return
+        position = bisect_left(self._starts, (interval[0], appointmentId))
+        del self._starts[position]
+
+    def overlapping(
+        self, start: datetime, end: datetime, exclude_id: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        Finds an appointment overlapping the half-open interval [start, end).
+
+        Args:
+            start (datetime): Start of the interval.
+            end (datetime): End of the interval.
+            exclude_id (Optional[int]): An appointment to ignore, e.g. the one being moved.
+
+        Returns:
+            Optional[int]: The ID of an overlapping appointment, or None if the interval is free.
+        """
+        start, end = as_utc(start), as_utc(end)
+        earliest_start = start - self._max_duration
+        position = bisect_left(self._starts, (end,)) - 1
+        while position >= 0:
+            candidate_start, appointmentId = self._starts[position]
+            if candidate_start <= earliest_start:
+                break
+            if appointmentId != exclude_id and self._intervals[appointmentId][1] > start:
+                return appointmentId
+            position -= 1
+        return None
+
+
+_indexes: LRUCache[int, IntervalIndex] = LRUCache(
+    int(os.environ.get("APPOINTMENT_INDEX_SIZE", "10000"))
+)
+
+
+class _ProfessionalLock:
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+# Both only hold professionals that are in use right now, so neither grows with the number of professionals seen: a
+# lock lives while someone holds or waits for it, and a version while the professional's index is being loaded.
+_locks: Dict[int, _ProfessionalLock] = {}
+# Bumped by every change during a load so that a load which raced with a booking is retried instead of caching a stale
+# snapshot.
+_versions: Dict[int, int] = {}
+_loads: Dict[int, int] = {}
+
+
+@asynccontextmanager
+async def lock(*profileIds: int) -> AsyncIterator[None]:
+    """
+    Holds the locks serialising conflict checks and writes for the given professionals within this process. Hold it
+    from the conflict check until the appointment has been written and recorded, so two concurrent bookings cannot both
+    see the slot as free in the index. Other processes are kept out by ``claim`` in the write transaction. Pass every
+    professional whose index the write touches, e.g. both the old and the new professional of a
+    moved appointment; the locks are always taken in the same order.
+
+    Args:
+        *profileIds (int): The professionals' Profile IDs.
+    """
+    ordered = sorted(set(profileIds))
+    for profileId in ordered:
+        entry = _locks.get(profileId)
+        if entry is None:
+            entry = _locks[profileId] = _ProfessionalLock()
+        entry.users += 1
+    acquired: List[asyncio.Lock] = []
+    try:
+        for profileId in ordered:
+            await _locks[profileId].lock.acquire()
+            acquired.append(_locks[profileId].lock)
+        yield
+    finally:
+        for held in reversed(acquired):
+            held.release()
+        for profileId in ordered:
+            entry = _locks[profileId]
+            entry.users -= 1
+            if entry.users == 0:
+                del _locks[profileId]
+
+
+def _changed(profileId: int) -> None:
+    if profileId in _versions:
+        _versions[profileId] += 1
+
+
+async def get_index(profileId: int) -> IntervalIndex:
+    """
+    Returns the professional's index, loading their current and future non-cancelled appointments on first use.
+
+    Args:
+        profileId (int): The professional's Profile ID.
+
+    Returns:
+        IntervalIndex: The professional's index.
+    """
+    index = _indexes.get(profileId)
+    if index is not None:
+        return index
+    _loads[profileId] = _loads.get(profileId, 0) + 1
+    _versions.setdefault(profileId, 0)
+    try:
+        while True:
+            version = _versions[profileId]
+            loaded_from = datetime.now(timezone.utc) - APPOINTMENT_DURATION
+            appointments = await prisma.models.Appointment.prisma().find_many(
+                where={
+                    "profileId": profileId,
+                    "status": {"not": prisma.enums.Status.Cancelled},
+                    "time": {"gte": loaded_from},
+                }
+            )
+            if version != _versions[profileId]:
+                continue
+            index = IntervalIndex(loaded_from)
+            for appointment in appointments:
+                index.add(
+                    appointment.id,
+                    appointment.time,
+                    appointment.time + APPOINTMENT_DURATION,
+                )
+            _indexes.set(profileId, index)
+            return index
+    finally:
+        _loads[profileId] -= 1
+        if _loads[profileId] == 0:
+            del _loads[profileId]
+            del _versions[profileId]
+
+
+class SlotTaken(Exception):
+    """
+    Raised by ``claim`` inside a write transaction, rolling it back, when the database already holds an appointment
+    in the slot.
+    """
+
+    def __init__(self, appointmentId: int):
+        super().__init__(f"The slot is taken by appointment {appointmentId}")
+        self.appointmentId = appointmentId
+
+
+class AppointmentMoved(Exception):
+    """
+    Raised inside a write transaction, rolling it back, when the appointment being changed no longer belongs to the
+    professional whose locks were taken, so the caller can retry with the right locks.
+    """
+
+
+def _forget(profileId: int) -> None:
+    _changed(profileId)
+    _indexes.invalidate(profileId)
+
+
+async def stored_conflict(
+    profileId: int,
+    start: datetime,
+    duration: timedelta = APPOINTMENT_DURATION,
+    exclude_id: Optional[int] = None,
+    client: Optional[prisma.Prisma] = None,
+) -> Optional[int]:
+    """
+    Checks the database for a non-cancelled appointment overlapping an appointment starting at ``start``.
+
+    Args:
+        profileId (int): The professional's Profile ID.
+        start (datetime): Proposed start of the appointment.
+        duration (timedelta): Proposed length of the appointment.
+        exclude_id (Optional[int]): An appointment to ignore, e.g. the one being rescheduled.
+        client (Optional[prisma.Prisma]): The transaction client to check on; the default client if None.
+
+    Returns:
+        Optional[int]: The ID of a conflicting appointment, or None if the slot is free.
+    """
+    start = as_utc(start)
+    where = {
+        "profileId": profileId,
+        "status": {"not": prisma.enums.Status.Cancelled},
+        "time": {"gt": start - APPOINTMENT_DURATION, "lt": start + duration},
+    }
+    if exclude_id is not None:
+        where["id"] = {"not": exclude_id}
+    conflict = await prisma.models.Appointment.prisma(client).find_first(where=where)
+    return conflict.id if conflict else None
+
+
+async def find_conflict(
+    profileId: int,
+    start: datetime,
+    duration: timedelta = APPOINTMENT_DURATION,
+    exclude_id: Optional[int] = None,
+) -> Optional[int]:
+    """
+    Checks whether an appointment starting at ``start`` would overlap an existing non-cancelled appointment. This is
+    only a pre-check that turns most conflicting requests away without opening a transaction: the index does not see
+    bookings made by other processes, so writers must still ``claim`` the slot inside their transaction.
+
+    Args:
+        profileId (int): The professional's Profile ID.
+        start (datetime): Proposed start of the appointment.
+        duration (timedelta): Proposed length of the appointment.
+        exclude_id (Optional[int]): An appointment to ignore, e.g. the one being rescheduled.
+
+    Returns:
+        Optional[int]: The ID of a conflicting appointment, or None if the slot is free.
+    """
+    start = as_utc(start)
+    index = await get_index(profileId)
+    if not index.covers(start):
+        # The index only holds appointments from when it was loaded; older slots are checked against the database.
+        return await stored_conflict(profileId, start, duration, exclude_id)
+    if index.overlapping(start, start + duration, exclude_id) is None:
+        return None
+    # Another process may have cancelled or moved the conflicting appointment, so the database has the final say
+    # before a booking is turned away, and an index it contradicts is reloaded on next use.
+    conflict = await stored_conflict(profileId, start, duration, exclude_id)
+    if conflict is None:
+        _forget(profileId)
+    return conflict
+
+
+async def claim(
+    client: prisma.Prisma,
+    profileId: int,
+    start: datetime,
+    exclude_id: Optional[int] = None,
+) -> None:
+    """
+    Rechecks a slot against the database inside the write transaction that books it. Call it after
+    ``project.schedule_versions.bump``: the professional's version row stays locked until the transaction ends, so no
+    writer in any process can book an overlapping slot between this check and the commit.
+
+    Args:
+        client (prisma.Prisma): The transaction client of the write.
+        profileId (int): The professional's Profile ID.
+        start (datetime): Start of the appointment being written.
+        exclude_id (Optional[int]): The appointment being rescheduled, if any.
+
+    Raises:
+        SlotTaken: If the slot is taken. The professional's index missed that appointment and is dropped.
+    """
+    conflict = await stored_conflict(profileId, start, exclude_id=exclude_id, client=client)
+    if conflict is not None:
+        _forget(profileId)
+        raise SlotTaken(conflict)
+
+
+def record(profileId: int, appointmentId: int, start: datetime) -> None:
+    """
+    Adds or moves an appointment in the professional's index after it has been written.
+
+    Args:
+        profileId (int): The professional's Profile ID.
+        appointmentId (int): The appointment's ID.
+        start (datetime): The appointment's start time.
+    """
+    _changed(profileId)
+    index = _indexes.get(profileId)
+    if index is not None:
+        index.add(appointmentId, start, as_utc(start) + APPOINTMENT_DURATION)
+
+
+def discard(profileId: int, appointmentId: int) -> None:
+    """
+    Removes an appointment from the professional's index after it has been cancelled, deleted or moved away.
+
+    Args:
+        profileId (int): The professional's Profile ID.
+        appointmentId (int): The appointment's ID.
+    """
+    _changed(profileId)
+    index = _indexes.get(profileId)
+    if index is not None:
+        index.remove(appointmentId)
@@ -0,0 +1,140 @@
+import hashlib
+import os
+import time
+import uuid
+from typing import Optional
+
+import project.token_revocation
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import JWTError, jwt
+from project.cache import LRUCache
+from pydantic import BaseModel
+
+SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "your-secret-key")
+ALGORITHM = "HS256"
+TOKEN_TTL_SECONDS = int(os.environ.get("JWT_TTL_SECONDS", "3600"))
+
+
+class AuthenticatedUser(BaseModel):
+    """
+    The verified claims of a bearer token, passed to services in place of a User lookup.
+    """
+
+    user_id: int
+    role: str
+    token_id: str
+    issued_at: int
+    expires_at: int
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == "Admin"
+
+
+class AuthenticationError(Exception):
+    """
+    Raised when a token is malformed, has a bad signature or has expired.
+    """
+
+
+# Decoding and checking the signature costs tens of microseconds; a repeat token costs one hash and a dict lookup.
+# Keyed by a digest so that the cache never holds bearer tokens themselves.
+_claims: LRUCache[str, AuthenticatedUser] = LRUCache(
+    int(os.environ.get("TOKEN_CACHE_SIZE", "10000"))
+)
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def issue_token(user_id: int, role: str) -> str:
+    """
+    Issues a signed access token carrying the user's ID and role, valid for TOKEN_TTL_SECONDS.
+
+    Args:
+        user_id (int): The authenticated user's ID.
+        role (str): The user's role at the time of issue.
+
+    Returns:
+        str: The encoded JWT.
+    """
+    issued_at = int(time.time())
+    claims = {
+        "user_id": user_id,
+        # Enum members (prisma.enums.Role) are stored by value.
+        "role": getattr(role, "value", role),
+        "jti": uuid.uuid4().hex,
+        "iat": issued_at,
+        "exp": issued_at + TOKEN_TTL_SECONDS,
+    }
+    return jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def verify_token(token: str) -> AuthenticatedUser:
+    """
+    Verifies a token locally, without touching the database. Decoded claims are cached until the token expires.
+
+    Args:
+        token (str): The encoded JWT from the Authorization header.
+
+    Returns:
+        AuthenticatedUser: The token's verified claims.
+
+    Raises:
+        AuthenticationError: If the token is invalid or expired.
+    """
+    key = _token_key(token)
+    user = _claims.get(key)
+    if user is not None:
+        if user.expires_at > time.time():
+            return user
+        _claims.invalidate(key)
+        raise AuthenticationError("Token has expired")
+    try:
+        claims = jwt.decode(
+            token, SECRET_KEY, algorithms=[ALGORITHM], options={"require_exp": True}
+        )
+        user = AuthenticatedUser(
+            user_id=claims["user_id"],
+            role=claims["role"],
+            token_id=claims.get("jti", key),
+            issued_at=claims.get("iat", 0),
+            expires_at=claims["exp"],
+        )
+    except (JWTError, KeyError, ValueError) as e:
+        raise AuthenticationError(f"Invalid token: {e}")
+    _claims.set(key, user)
+    return user
+
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer),
+) -> AuthenticatedUser:
+    """
+    FastAPI dependency resolving the caller from the ``Authorization: Bearer`` header. Answers 401 when the header
+    is missing, the token does not verify or it has been revoked.
+    """
+    if credentials is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    try:
+        user = verify_token(credentials.credentials)
+    except AuthenticationError as e:
+        raise HTTPException(
+            status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"}
+        )
+    if project.token_revocation.is_revoked(user.token_id, user.user_id, user.issued_at):
+        raise HTTPException(
+            status_code=401,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
@@ -1,7 +1,7 @@
-import bcrypt
 import prisma
 import prisma.models
-from jose import jwt
+import project.auth
+import project.password_hashing
 from pydantic import BaseModel
 
 
@@ -29,11 +29,13 @@ async def authenticateUser(email: str, password: str) -> AuthenticationResponse:
         AuthenticationResponse: The response model returns a JWT token that the client
         can use in subsequent requests to authenticate sessions if the credentials
         are verified successfully.
+
+    Raises:
+        HashingOverloadedError: If too many password checks are already queued.
     """
     user = await prisma.models.User.prisma().find_unique(where={"email": email})
-    if user and bcrypt.checkpw(password.encode("utf-8"), user.password.encode("utf-8")):
-        token_data = {"user_id": user.id, "role": user.role}
-        token = jwt.encode(token_data, "your-secret-key", algorithm="HS256")
+    if user and await project.password_hashing.verify_password(password, user.password):
+        token = project.auth.issue_token(user.id, user.role)
         return AuthenticationResponse(token=token)
     else:
         raise Exception("Invalid email or password")
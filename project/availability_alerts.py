@@ -0,0 +1,136 @@
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from typing import Dict, Set
+
+import prisma
+import project.metrics
+
+logger = logging.getLogger(__name__)
+
+FANOUT_CHUNK_SIZE = int(os.environ.get("ALERT_FANOUT_CHUNK_SIZE", "1000"))
+
+PROFESSIONAL_QUERY = """
+SELECT p."id", p."firstName", p."lastName"
+FROM "ProfessionalInfo" pi
+JOIN "Profile" p ON p."id" = pi."profileId"
+WHERE pi."id" = $1
+"""
+
+# One round trip per chunk: the page of watchers is selected and turned into notifications inside the database, and
+# only the keyset cursor comes back.
+FANOUT_CHUNK_QUERY = """
+WITH page AS (
+    SELECT "id", "userId"
+    FROM "ProfessionalWatch"
+    WHERE "profileId" = $1 AND "id" > $3
+    ORDER BY "id"
+    LIMIT $4
+), inserted AS (
+    INSERT INTO "Notification" ("userId", "message")
+    SELECT "userId", $2 FROM page
+)
+SELECT max("id") AS "lastId", count(*)::int AS "count" FROM page
+"""
+
+ALERTS_SENT = project.metrics.Counter(
+    "availability_alerts_sent_total",
+    "Availability notifications written for watchers of a professional.",
+)
+FANOUT_SECONDS = project.metrics.Histogram(
+    "availability_alert_fanout_seconds",
+    "Time to notify every watcher of one availability change.",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+# Latest unannounced availability per professional. A professional toggling several times while a fan-out is running
+# is announced once more with the final state, not once per toggle.
+_pending: Dict[int, bool] = {}
+_workers: Dict[int, asyncio.Task] = {}
+_tasks: Set[asyncio.Task] = set()
+
+
+async def fan_out(professionalInfoId: int, isAvailable: bool) -> int:
+    """
+    Notifies every user watching a professional that their availability changed, inserting one chunk of
+    FANOUT_CHUNK_SIZE notifications per statement.
+
+    Args:
+        professionalInfoId (int): The ProfessionalInfo ID whose availability changed.
+        isAvailable (bool): The new availability.
+
+    Returns:
+        int: The number of notifications written.
+    """
+    started = time.perf_counter()
+    professionals = await prisma.get_client().query_raw(
+        PROFESSIONAL_QUERY, professionalInfoId
+    )
+    if not professionals:
+        return 0
+    professional = professionals[0]
+    available_text = "available" if isAvailable else "not available"
+    message = f"{professional['firstName']} {professional['lastName']} is now {available_text}."
+    sent = 0
+    last_id = 0
+    while True:
+        rows = await prisma.get_client().query_raw(
+            FANOUT_CHUNK_QUERY, professional["id"], message, last_id, FANOUT_CHUNK_SIZE
+        )
+        count = rows[0]["count"] if rows else 0
+        sent += count
+        if count < FANOUT_CHUNK_SIZE:
+            break
+        last_id = rows[0]["lastId"]
+    ALERTS_SENT.inc(sent)
+    FANOUT_SECONDS.observe(time.perf_counter() - started)
+    return sent
+
+
+async def _announce(professionalInfoId: int) -> None:
+    announced = None
+    try:
+        while professionalInfoId in _pending:
+            isAvailable = _pending.pop(professionalInfoId)
+            # Toggled away and back while the previous fan-out ran: watchers already have the current state.
+            if isAvailable == announced:
+                continue
+            try:
+                await fan_out(professionalInfoId, isAvailable)
+                announced = isAvailable
+            except Exception:
+                logger.exception(
+                    "Failed to notify watchers of professional info %s", professionalInfoId
+                )
+    finally:
+        del _workers[professionalInfoId]
+
+
+def schedule(professionalInfoId: int, isAvailable: bool) -> None:
+    """
+    Queues a background fan-out to a professional's watchers and returns immediately, so the status update that
+    triggered it does not wait for thousands of inserts.
+
+    Args:
+        professionalInfoId (int): The ProfessionalInfo ID whose availability changed.
+        isAvailable (bool): The new availability.
+    """
+    _pending[professionalInfoId] = isAvailable
+    if professionalInfoId not in _workers:
+        # A fresh context, so the fan-out's queries are not attributed to the request that triggered it.
+        task = asyncio.get_running_loop().create_task(
+            _announce(professionalInfoId), context=contextvars.Context()
+        )
+        _workers[professionalInfoId] = task
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+
+
+async def drain() -> None:
+    """
+    Waits for every queued fan-out to finish. Called by the server lifespan before the database client disconnects.
+    """
+    while _tasks:
+        await asyncio.gather(*list(_tasks), return_exceptions=True)
@@ -0,0 +1,285 @@
+import asyncio
+import hashlib
+import logging
+import os
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import prisma
+import prisma.models
+from project.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+SYNC_SECONDS = float(os.environ.get("AVAILABILITY_CACHE_SYNC_SECONDS", "1"))
+
+# The professionals with change log entries in [$1, horizon), and the horizon itself, as one row per professional or a
+# single row without one. Entries below the horizon are final (see project.getAvailabilityChanges_service), so walking
+# the log from horizon to horizon sees every committed write exactly once.
+CHANGED_QUERY = """
+SELECT h."horizon" AS "horizon", l."compactedThrough" AS "compacted_through",
+       c."professionalInfoId" AS "professional_info_id"
+FROM (SELECT txid_snapshot_xmin(txid_current_snapshot()) AS "horizon") h
+LEFT JOIN "RealTimeStatusChangeLog" l ON l."id" = 1
+LEFT JOIN LATERAL (
+    SELECT DISTINCT "professionalInfoId" FROM "RealTimeStatusChange"
+    WHERE "txid" >= $1 AND "txid" < h."horizon"
+) c ON true
+"""
+
+
+class CachedStatus(NamedTuple):
+    """
+    A snapshot of a professional's RealTimeStatus row. ``exists`` is False when the professional has no status row,
+    so that misses are cached as well.
+    """
+
+    exists: bool
+    isAvailable: bool
+    currentActivity: Optional[str] = None
+
+
+ABSENT = CachedStatus(exists=False, isAvailable=False)
+
+_cache: LRUCache[int, CachedStatus] = LRUCache(
+    int(os.environ.get("AVAILABILITY_CACHE_SIZE", "50000"))
+)
+# Bumped on every write so that a read-through which raced with a write does not store a stale row.
+_generation = 0
+# The _generation of each professional's latest write, for as many professionals as the cache holds. A professional
+# that was evicted reads as written at the newest evicted generation, which is never earlier than their real one.
+_evicted_version = 0
+
+
+def _version_evicted(professionalInfoId: int, generation: int) -> None:
+    global _evicted_version
+    _evicted_version = max(_evicted_version, generation)
+
+
+_versions: LRUCache[int, int] = LRUCache(_cache.maxsize, on_evict=_version_evicted)
+# The change log position up to which writes made by other processes have been applied, see follow().
+_cursor: Optional[int] = None
+
+
+def _changed(professionalInfoId: int) -> None:
+    global _generation
+    _generation += 1
+    _versions.set(professionalInfoId, _generation)
+
+
+def version(professionalInfoId: int) -> int:
+    """
+    Returns a professional's change counter, which increases with every write to their RealTimeStatus row made by this
+    process. Looking a professional up does not start tracking them.
+
+    Args:
+        professionalInfoId (int): The ProfessionalInfo ID the RealTimeStatus row belongs to.
+
+    Returns:
+        int: The current counter.
+    """
+    return _versions.get(professionalInfoId, _evicted_version)
+
+
+def status_version(status: CachedStatus) -> str:
+    """
+    Returns a version of a status that is equal across processes exactly when the statuses are, for tagging
+    responses built from it.
+
+    Args:
+        status (CachedStatus): The status.
+
+    Returns:
+        str: The version, comparable only for equality.
+    """
+    if not status.exists:
+        return "0"
+    activity = hashlib.blake2b(
+        (status.currentActivity or "").encode("utf-8"), digest_size=8
+    ).hexdigest()
+    return f"1.{int(status.isAvailable)}.{int(status.currentActivity is not None)}.{activity}"
+
+
+async def follow() -> int:
+    """
+    Drops the entries of professionals whose RealTimeStatus was written since the last call, by this or any other
+    process, as recorded in the availability change log. The first call only positions the cursor and empties the
+    cache, as does a call that finds the log compacted past the cursor.
+
+    Returns:
+        int: The number of professionals whose entries were dropped.
+    """
+    global _cursor, _generation
+    # Before the first call there is no cursor; NULL matches no entries.
+    rows = await prisma.get_client().query_raw(CHANGED_QUERY, _cursor)
+    horizon = rows[0]["horizon"]
+    compacted_through = rows[0]["compacted_through"] or 0
+    if _cursor is None or compacted_through >= _cursor:
+        _generation += 1
+        _cache.clear()
+        _cursor = horizon
+        return 0
+    changed = [row["professional_info_id"] for row in rows if row["professional_info_id"] is not None]
+    for professionalInfoId in changed:
+        invalidate(professionalInfoId)
+    _cursor = horizon
+    return len(changed)
+
+
+async def run_follower() -> None:
+    """
+    Applies writes made by other processes every SYNC_SECONDS, which bounds how long a cached status can lag behind
+    the table. Started as a background task by the server lifespan.
+    """
+    while True:
+        try:
+            await follow()
+        except Exception:
+            logger.exception("Failed to follow the availability change log")
+        await asyncio.sleep(SYNC_SECONDS)
+
+
+def get(professionalInfoId: int) -> Optional[CachedStatus]:
+    """
+    Returns the cached status for a professional without touching the database.
+
+    Args:
+        professionalInfoId (int): The ProfessionalInfo ID the RealTimeStatus row belongs to.
+
+    Returns:
+        Optional[CachedStatus]: The cached status, ``ABSENT`` if the professional is known to have no status row,
+        or None if nothing is cached.
+    """
+    return _cache.get(professionalInfoId)
+
+
+def store(
+    professionalInfoId: int, isAvailable: bool, currentActivity: Optional[str]
+) -> None:
+    """
+    Write-through update after a RealTimeStatus row has been created or updated.
+
+    Args:
+        professionalInfoId (int): The ProfessionalInfo ID the RealTimeStatus row belongs to.
+        isAvailable (bool): The stored availability flag.
+        currentActivity (Optional[str]): The stored current activity.
+    """
+    _changed(professionalInfoId)
+    _cache.set(
+        professionalInfoId,
+        CachedStatus(
+            exists=True, isAvailable=isAvailable, currentActivity=currentActivity
+        ),
+    )
+
+
+def store_absent(professionalInfoId: int) -> None:
+    """
+    Write-through update after a RealTimeStatus row has been deleted.
+
+    Args:
+        professionalInfoId (int): The ProfessionalInfo ID whose RealTimeStatus row was removed.
+    """
+    _changed(professionalInfoId)
+    _cache.set(professionalInfoId, ABSENT)
+
+
+def invalidate(professionalInfoId: int) -> None:
+    """
+    Drops a professional's entry so that the next read goes to the database.
+
+    Args:
+        professionalInfoId (int): The ProfessionalInfo ID to drop.
+    """
+    _changed(professionalInfoId)
+    _cache.invalidate(professionalInfoId)
+
+
+def remember(professionalInfoId: int, status: Optional[prisma.models.RealTimeStatus]) -> None:
+    """
+    Caches a row that was just read from the database.
+
+    Args:
+        professionalInfoId (int): The ProfessionalInfo ID that was looked up.
+        status (Optional[prisma.models.RealTimeStatus]): The row that was read, or None if there was none.
+    """
+    _cache.set(
+        professionalInfoId,
+        ABSENT
+        if status is None
+        else CachedStatus(
+            exists=True,
+            isAvailable=status.isAvailable,
+            currentActivity=status.currentActivity,
+        ),
+    )
+
+
+async def fetch(professionalInfoId: int) -> CachedStatus:
+    """
+    Read-through lookup of a professional's RealTimeStatus. Only a cache miss costs a database round trip.
+
+    Args:
+        professionalInfoId (int): The ProfessionalInfo ID the RealTimeStatus row belongs to.
+
+    Returns:
+        CachedStatus: The current status, or ``ABSENT`` if the professional has no status row.
+    """
+    cached = _cache.get(professionalInfoId)
+    if cached is not None:
+        return cached
+    generation = _generation
+    real_time_status = await prisma.models.RealTimeStatus.prisma().find_unique(
+        where={"professionalInfoId": professionalInfoId}
+    )
+    if generation == _generation:
+        remember(professionalInfoId, real_time_status)
+    if real_time_status is None:
+        return ABSENT
+    return CachedStatus(
+        exists=True,
+        isAvailable=real_time_status.isAvailable,
+        currentActivity=real_time_status.currentActivity,
+    )
+
+
+async def fetch_many(professionalInfoIds: Iterable[int]) -> Dict[int, CachedStatus]:
+    """
+    Read-through lookup of many professionals at once. Cached entries are served from memory and all misses are
+    loaded with a single ``IN`` query.
+
+    Args:
+        professionalInfoIds (Iterable[int]): The ProfessionalInfo IDs to look up.
+
+    Returns:
+        Dict[int, CachedStatus]: The status of every requested ID, ``ABSENT`` for those without a status row.
+    """
+    statuses: Dict[int, CachedStatus] = {}
+    missing: List[int] = []
+    for professionalInfoId in dict.fromkeys(professionalInfoIds):
+        cached = _cache.get(professionalInfoId)
+        if cached is None:
+            missing.append(professionalInfoId)
+        else:
+            statuses[professionalInfoId] = cached
+    if not missing:
+        return statuses
+    generation = _generation
+    rows = await prisma.models.RealTimeStatus.prisma().find_many(
+        where={"professionalInfoId": {"in": missing}}
+    )
+    found = {row.professionalInfoId: row for row in rows}
+    store_results = generation == _generation
+    for professionalInfoId in missing:
+        row = found.get(professionalInfoId)
+        if store_results:
+            remember(professionalInfoId, row)
+        statuses[professionalInfoId] = (
+            ABSENT
+            if row is None
+            else CachedStatus(
+                exists=True,
+                isAvailable=row.isAvailable,
+                currentActivity=row.currentActivity,
+            )
+        )
+    return statuses
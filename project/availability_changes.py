@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import prisma
+import prisma.models
+import project.metrics
+
+logger = logging.getLogger(__name__)
+
+CHANGES_RETENTION_SECONDS = float(
+    os.environ.get("AVAILABILITY_CHANGES_RETENTION_SECONDS", str(7 * 24 * 3600))
+)
+CHANGES_COMPACT_SECONDS = float(os.environ.get("AVAILABILITY_CHANGES_COMPACT_SECONDS", "300"))
+
+# Entries with a newer entry for the same professional carry nothing a reader still needs: readers answer every
+# professional in a page with its newest entry, so a reader gets the newer state when it reaches either entry.
+#
+# Both deletions bump RealTimeStatusChangeLog.compactions in the same statement, so that log_version changes when
+# entries are removed as well as when they are added.
+DROP_SUPERSEDED_QUERY = """
+WITH superseded AS (
+    DELETE FROM "RealTimeStatusChange" c
+    WHERE EXISTS (
+        SELECT 1 FROM "RealTimeStatusChange" n
+        WHERE n."professionalInfoId" = c."professionalInfoId" AND n."seq" > c."seq"
+    )
+    RETURNING 1
+)
+INSERT INTO "RealTimeStatusChangeLog" ("id", "compactions")
+SELECT 1, 1 WHERE EXISTS (SELECT 1 FROM superseded)
+ON CONFLICT ("id") DO UPDATE
+SET "compactions" = "RealTimeStatusChangeLog"."compactions" + 1
+RETURNING (SELECT count(*) FROM superseded)::int AS "superseded"
+"""
+
+# Entries past the retention period are dropped, and the highest transaction ID among them is recorded so that readers
+# with an older cursor are told to resync.
+DROP_EXPIRED_QUERY = """
+WITH expired AS (
+    DELETE FROM "RealTimeStatusChange"
+    WHERE "createdAt" < $1::timestamp
+    RETURNING "txid"
+)
+INSERT INTO "RealTimeStatusChangeLog" ("id", "compactedThrough", "compactions")
+SELECT 1, max("txid"), 1 FROM expired HAVING count(*) > 0
+ON CONFLICT ("id") DO UPDATE
+SET "compactedThrough" = GREATEST(
+        "RealTimeStatusChangeLog"."compactedThrough", EXCLUDED."compactedThrough"
+    ),
+    "compactions" = "RealTimeStatusChangeLog"."compactions" + 1
+RETURNING (SELECT count(*) FROM expired)::int AS "expired"
+"""
+
+# Every transaction below the horizon has ended, so no entry can appear below it later: each entry that crosses it has
+# a higher txid than every entry already below it. The newest txid below the horizon therefore grows with every commit
+# to the log, and is found by a backwards scan of the txid index.
+LOG_VERSION_QUERY = """
+SELECT coalesce((
+           SELECT max("txid") FROM "RealTimeStatusChange"
+           WHERE "txid" < txid_snapshot_xmin(txid_current_snapshot())
+       ), 0) AS "txid",
+       coalesce((SELECT "compactions" FROM "RealTimeStatusChangeLog" WHERE "id" = 1), 0) AS "compactions"
+"""
+
+CHANGES_COMPACTED = project.metrics.Counter(
+    "availability_changes_compacted_total",
+    "Availability change log entries dropped by compaction, by reason.",
+    ["reason"],
+)
+
+
+async def record(
+    client: prisma.Prisma,
+    professionalInfoId: int,
+    isAvailable: bool,
+    currentActivity: Optional[str] = None,
+    removed: bool = False,
+) -> None:
+    """
+    Appends one change to the log. Run it on the transaction client of the RealTimeStatus write, after the write, so
+    that changes to one professional are numbered in the order their row was written.
+
+    Args:
+        client (prisma.Prisma): The transaction client of the write.
+        professionalInfoId (int): The ProfessionalInfo ID the RealTimeStatus row belongs to.
+        isAvailable (bool): The stored availability flag.
+        currentActivity (Optional[str]): The stored current activity.
+        removed (bool): True if the RealTimeStatus row was deleted.
+    """
+    await prisma.models.RealTimeStatusChange.prisma(client).create(
+        data={
+            "professionalInfoId": professionalInfoId,
+            "isAvailable": isAvailable,
+            "currentActivity": currentActivity,
+            "removed": removed,
+        }
+    )
+
+
+async def log_version(client: prisma.Prisma) -> str:
+    """
+    Returns a version of the whole RealTimeStatus table that changes with every write to it, in any process. Seqs of
+    different professionals can commit out of order, so the newest seq cannot serve; instead the version is the newest
+    transaction below the visibility horizon, as used by the change feed, plus the count of compactions that removed
+    entries. A write is reflected once every transaction older than it has ended, usually within milliseconds.
+
+    Args:
+        client (prisma.Prisma): The database the caller is about to read the table from.
+
+    Returns:
+        str: The version, comparable only for equality.
+    """
+    row = (await client.query_raw(LOG_VERSION_QUERY))[0]
+    return f"{row['txid']}.{row['compactions']}"
+
+
+async def compact() -> None:
+    """
+    Drops superseded entries and entries older than CHANGES_RETENTION_SECONDS.
+    """
+    client = prisma.get_client()
+    superseded = await client.query_raw(DROP_SUPERSEDED_QUERY)
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=CHANGES_RETENTION_SECONDS)
+    expired = await client.query_raw(
+        DROP_EXPIRED_QUERY, cutoff.replace(tzinfo=None).isoformat()
+    )
+    # Nothing is returned when nothing was dropped.
+    CHANGES_COMPACTED.inc(superseded[0]["superseded"] if superseded else 0, reason="superseded")
+    CHANGES_COMPACTED.inc(expired[0]["expired"] if expired else 0, reason="expired")
+
+
+async def run_compactor() -> None:
+    """
+    Compacts the log every CHANGES_COMPACT_SECONDS. Started as a background task by the server lifespan.
+    """
+    while True:
+        try:
+            await compact()
+        except Exception:
+            logger.exception("Failed to compact the availability change log")
+        await asyncio.sleep(CHANGES_COMPACT_SECONDS)
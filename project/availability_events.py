@@ -0,0 +1,54 @@
+from typing import Optional
+
+import project.availability_alerts
+import project.availability_cache
+import project.availability_stream
+
+
+async def status_changed(
+    professionalInfoId: int,
+    isAvailable: bool,
+    currentActivity: Optional[str],
+    previousIsAvailable: Optional[bool] = None,
+) -> None:
+    """
+    Records that a RealTimeStatus row was created or updated. Every availability write path calls this after its
+    database write so that the cache and the live stream stay in step with the table, and so that the professional's
+    watchers are alerted when the availability flag flips.
+
+    Args:
+        professionalInfoId (int): The ProfessionalInfo ID the RealTimeStatus row belongs to.
+        isAvailable (bool): The stored availability flag.
+        currentActivity (Optional[str]): The stored current activity.
+        previousIsAvailable (Optional[bool]): The flag before the write, False if the row was just created. When not
+            given, the cached status is used; if that is unknown too, watchers are not alerted.
+    """
+    if previousIsAvailable is None:
+        cached = project.availability_cache.get(professionalInfoId)
+        if cached is not None:
+            previousIsAvailable = cached.isAvailable
+    project.availability_cache.store(professionalInfoId, isAvailable, currentActivity)
+    if previousIsAvailable is not None and previousIsAvailable != isAvailable:
+        project.availability_alerts.schedule(professionalInfoId, isAvailable)
+    project.availability_stream.broker.publish(
+        project.availability_stream.AvailabilityDelta(
+            professionalInfoId=professionalInfoId,
+            isAvailable=isAvailable,
+            currentActivity=currentActivity,
+        )
+    )
+
+
+async def status_removed(professionalInfoId: int) -> None:
+    """
+    Records that a professional's RealTimeStatus row was deleted.
+
+    Args:
+        professionalInfoId (int): The ProfessionalInfo ID whose RealTimeStatus row was removed.
+    """
+    project.availability_cache.store_absent(professionalInfoId)
+    project.availability_stream.broker.publish(
+        project.availability_stream.AvailabilityDelta(
+            professionalInfoId=professionalInfoId, isAvailable=False, removed=True
+        )
+    )
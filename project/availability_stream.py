@@ -0,0 +1,139 @@
+import asyncio
+import itertools
+from typing import AsyncIterator, Dict, Optional, Set
+
+from pydantic import BaseModel
+
+KEEPALIVE_SECONDS = 15.0
+
+
+class AvailabilityDelta(BaseModel):
+    """
+    A single change to a professional's real-time status, as pushed to stream subscribers.
+    """
+
+    professionalInfoId: int
+    isAvailable: bool
+    currentActivity: Optional[str] = None
+    removed: bool = False
+
+
+class Subscription:
+    """
+    One connected stream client. Deltas are coalesced per professional, so a slow client only ever holds the latest
+    delta for each professional instead of an unbounded backlog.
+    """
+
+    def __init__(self, professionalInfoId: Optional[int]):
+        self.professionalInfoId = professionalInfoId
+        self._pending: Dict[int, str] = {}
+        self._wakeup = asyncio.Event()
+
+    def push(self, professionalInfoId: int, payload: str) -> None:
+        # Re-insert so that the batch stays ordered by the most recent change.
+        self._pending.pop(professionalInfoId, None)
+        self._pending[professionalInfoId] = payload
+        self._wakeup.set()
+
+    async def next_batch(self, timeout: float) -> Dict[int, str]:
+        """
+        Waits for pending deltas and hands them over.
+
+        Args:
+            timeout (float): Seconds to wait before returning an empty batch.
+
+        Returns:
+            Dict[int, str]: Encoded deltas keyed by professionalInfoId; empty if the wait timed out.
+        """
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            return {}
+        self._wakeup.clear()
+        batch, self._pending = self._pending, {}
+        return batch
+
+
+class AvailabilityBroker:
+    """
+    In-process fan-out of availability deltas. Publishing is O(matching subscribers) and never awaits, so write paths
+    are not slowed down by connected clients.
+    """
+
+    def __init__(self):
+        self._all: Set[Subscription] = set()
+        self._by_professional: Dict[int, Set[Subscription]] = {}
+        self._sequence = itertools.count(1)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._all) + sum(len(s) for s in self._by_professional.values())
+
+    def subscribe(self, professionalInfoId: Optional[int] = None) -> Subscription:
+        subscription = Subscription(professionalInfoId)
+        if professionalInfoId is None:
+            self._all.add(subscription)
+        else:
+            self._by_professional.setdefault(professionalInfoId, set()).add(
+                subscription
+            )
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        if subscription.professionalInfoId is None:
+            self._all.discard(subscription)
+            return
+        subscribers = self._by_professional.get(subscription.professionalInfoId)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._by_professional[subscription.professionalInfoId]
+
+    def publish(self, delta: AvailabilityDelta) -> None:
+        """
+        Pushes a delta to every subscriber of that professional and to every subscriber of all professionals.
+
+        Args:
+            delta (AvailabilityDelta): The change to publish.
+        """
+        subscribers = self._by_professional.get(delta.professionalInfoId)
+        if not self._all and not subscribers:
+            return
+        payload = f"id: {next(self._sequence)}\nevent: availability\ndata: {delta.model_dump_json()}\n\n"
+        for subscription in self._all:
+            subscription.push(delta.professionalInfoId, payload)
+        if subscribers:
+            for subscription in subscribers:
+                subscription.push(delta.professionalInfoId, payload)
+
+
+broker = AvailabilityBroker()
+
+
+async def event_stream(
+    professionalInfoId: Optional[int] = None,
+    initial: Optional[AvailabilityDelta] = None,
+) -> AsyncIterator[str]:
+    """
+    Yields Server-Sent Events for availability changes until the client disconnects.
+
+    Args:
+        professionalInfoId (Optional[int]): Restricts the stream to one professional; None streams every professional.
+        initial (Optional[AvailabilityDelta]): A current snapshot sent before any live delta.
+
+    Yields:
+        str: Encoded Server-Sent Events, with periodic keep-alive comments.
+    """
+    subscription = broker.subscribe(professionalInfoId)
+    try:
+        yield "retry: 3000\n\n"
+        if initial is not None:
+            yield f"event: availability\ndata: {initial.model_dump_json()}\n\n"
+        while True:
+            batch = await subscription.next_batch(KEEPALIVE_SECONDS)
+            if not batch:
+                yield ": keep-alive\n\n"
+                continue
+            yield "".join(batch.values())
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,285 @@
+import functools
+import json
+import logging
+import os
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import prisma
+import prisma.models
+from project.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+FULL_DAY = (1 << SLOTS_PER_DAY) - 1
+
+WEEKDAYS = {
+    name: index
+    for index, names in enumerate(
+        [
+            ("monday", "mon"),
+            ("tuesday", "tue"),
+            ("wednesday", "wed"),
+            ("thursday", "thu"),
+            ("friday", "fri"),
+            ("saturday", "sat"),
+            ("sunday", "sun"),
+        ]
+    )
+    for name in names
+}
+
+
+class WeeklyTemplate:
+    """
+    A professional's compiled weekly availability: one bitset per weekday, where bit ``n`` is set when the
+    ``n``-th SLOT_MINUTES slot of that day is within working hours. Times are interpreted in ``tz``.
+    """
+
+    __slots__ = ("days", "tz")
+
+    def __init__(self, days: Tuple[int, ...], tz: tzinfo = timezone.utc):
+        self.days = days
+        self.tz = tz
+
+    def __bool__(self) -> bool:
+        return any(self.days)
+
+    def is_scheduled(self, moment: datetime) -> bool:
+        """
+        Whether the professional is scheduled to work at ``moment``. A single bit test.
+
+        Args:
+            moment (datetime): The instant to test. Naive values are taken to be UTC.
+
+        Returns:
+            bool: True if ``moment`` falls inside a working slot.
+        """
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        local = moment.astimezone(self.tz)
+        slot = (local.hour * 60 + local.minute) // SLOT_MINUTES
+        return bool(self.days[local.weekday()] >> slot & 1)
+
+    def windows(self, day: date) -> Tuple[Tuple[datetime, datetime], ...]:
+        """
+        Expands the working slots of one local calendar day into contiguous windows.
+
+        Args:
+            day (date): The local calendar day.
+
+        Returns:
+            Tuple[Tuple[datetime, datetime], ...]: Aware (start, end) pairs of working time, in order.
+        """
+        return _day_windows(self.days[day.weekday()], self.tz, day)
+
+
+@functools.lru_cache(maxsize=4096)
+def _day_windows(
+    bits: int, tz: tzinfo, day: date
+) -> Tuple[Tuple[datetime, datetime], ...]:
+    # Memoised on the bitset rather than the template, so professionals sharing working hours share the result.
+    midnight = datetime.combine(day, time.min, tzinfo=tz)
+    result = []
+    slot = 0
+    while bits:
+        skip = (bits & -bits).bit_length() - 1
+        bits >>= skip
+        slot += skip
+        run = (bits ^ (bits + 1)).bit_length() - 1
+        bits >>= run
+        result.append(
+            (
+                midnight + timedelta(minutes=slot * SLOT_MINUTES),
+                midnight + timedelta(minutes=(slot + run) * SLOT_MINUTES),
+            )
+        )
+        slot += run
+    return tuple(result)
+
+
+EMPTY_TEMPLATE = WeeklyTemplate((0,) * 7)
+
+
+def working_windows(
+    template: WeeklyTemplate, start: datetime, end: datetime
+) -> Iterator[Tuple[datetime, datetime]]:
+    """
+    Yields the professional's working windows overlapping [start, end), merging windows that continue across midnight.
+
+    Args:
+        template (WeeklyTemplate): The professional's compiled template.
+        start (datetime): Start of the period, timezone-aware.
+        end (datetime): End of the period, timezone-aware.
+
+    Yields:
+        Tuple[datetime, datetime]: Aware (start, end) pairs of working time, in order. The first and last window may
+        extend beyond the period.
+    """
+    day = start.astimezone(template.tz).date()
+    last_day = end.astimezone(template.tz).date()
+    pending: Optional[Tuple[datetime, datetime]] = None
+    while day <= last_day:
+        for window_start, window_end in template.windows(day):
+            if pending is not None and pending[1] == window_start:
+                pending = (pending[0], window_end)
+                continue
+            if pending is not None:
+                yield pending
+            pending = (window_start, window_end)
+        day += timedelta(days=1)
+    if pending is not None:
+        yield pending
+
+
+def _parse_clock(value: str) -> int:
+    hours, _, minutes = value.strip().partition(":")
+    total = int(hours) * 60 + int(minutes or 0)
+    if not 0 <= total <= 24 * 60:
+        raise ValueError(f"time of day out of range: {value}")
+    return total
+
+
+def _range_mask(value: Any) -> int:
+    """
+    Converts one working range into a slot mask. Accepts {"start": "09:00", "end": "17:00"}, ["09:00", "17:00"] and
+    "09:00-17:00". Only slots fully inside the range are set.
+    """
+    if isinstance(value, dict):
+        start, end = value["start"], value["end"]
+    elif isinstance(value, str):
+        start, end = value.split("-", 1)
+    else:
+        start, end = value
+    first = -(-_parse_clock(start) // SLOT_MINUTES)
+    last = _parse_clock(end) // SLOT_MINUTES
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def compile_availability(raw: Any) -> WeeklyTemplate:
+    """
+    Compiles the free-form ProfessionalInfo.availability JSON into a WeeklyTemplate.
+
+    The expected shape maps weekday names ("monday" or "mon", any case) to a list of working ranges, with an optional
+    IANA "timezone" key; times are UTC otherwise:
+
+        {"timezone": "Europe/Berlin", "monday": [{"start": "09:00", "end": "17:00"}], "tue": ["09:00-12:00"]}
+
+    Malformed entries are skipped with a warning rather than failing the whole template.
+
+    Args:
+        raw (Any): The column value, either decoded JSON or a JSON-encoded string.
+
+    Returns:
+        WeeklyTemplate: The compiled template; EMPTY_TEMPLATE if nothing usable was found.
+    """
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError:
+            logger.warning("Ignoring availability that is not valid JSON: %r", raw)
+            return EMPTY_TEMPLATE
+    if not isinstance(raw, dict):
+        return EMPTY_TEMPLATE
+    tz: tzinfo = timezone.utc
+    if raw.get("timezone"):
+        try:
+            tz = ZoneInfo(raw["timezone"])
+        except (ZoneInfoNotFoundError, ValueError):
+            logger.warning("Ignoring unknown availability timezone %r", raw["timezone"])
+    days = [0] * 7
+    for key, ranges in raw.items():
+        weekday = WEEKDAYS.get(str(key).lower())
+        if weekday is None:
+            continue
+        if isinstance(ranges, (str, dict)):
+            ranges = [ranges]
+        for value in ranges or []:
+            try:
+                days[weekday] |= _range_mask(value)
+            except (KeyError, TypeError, ValueError):
+                logger.warning("Ignoring malformed availability range %r", value)
+    if not any(days):
+        return EMPTY_TEMPLATE
+    return WeeklyTemplate(tuple(day & FULL_DAY for day in days), tz)
+
+
+_templates: LRUCache[int, WeeklyTemplate] = LRUCache(
+    int(os.environ.get("AVAILABILITY_TEMPLATE_CACHE_SIZE", "50000"))
+)
+
+
+def invalidate(profileId: int) -> None:
+    """
+    Drops a professional's compiled template. Call after any write to ProfessionalInfo.availability.
+
+    Args:
+        profileId (int): The professional's Profile ID.
+    """
+    _templates.invalidate(profileId)
+
+
+def remember(profileId: int, raw: Any) -> WeeklyTemplate:
+    """
+    Compiles and caches a template from a ProfessionalInfo row that was read for another purpose.
+
+    Args:
+        profileId (int): The professional's Profile ID.
+        raw (Any): The row's availability column.
+
+    Returns:
+        WeeklyTemplate: The compiled template.
+    """
+    template = compile_availability(raw)
+    _templates.set(profileId, template)
+    return template
+
+
+async def get_template(profileId: int) -> WeeklyTemplate:
+    """
+    Returns a professional's compiled weekly template, compiling it on first use.
+
+    Args:
+        profileId (int): The professional's Profile ID.
+
+    Returns:
+        WeeklyTemplate: The compiled template; EMPTY_TEMPLATE if the professional has no ProfessionalInfo.
+    """
+    templates = await get_templates([profileId])
+    return templates[profileId]
+
+
+async def get_templates(profileIds: Iterable[int]) -> Dict[int, WeeklyTemplate]:
+    """
+    Returns the compiled templates of many professionals, loading all uncached ones with a single query.
+
+    Args:
+        profileIds (Iterable[int]): The professionals' Profile IDs.
+
+    Returns:
+        Dict[int, WeeklyTemplate]: The compiled template of every requested professional.
+    """
+    templates: Dict[int, WeeklyTemplate] = {}
+    missing: List[int] = []
+    for profileId in dict.fromkeys(profileIds):
+        template = _templates.get(profileId)
+        if template is None:
+            missing.append(profileId)
+        else:
+            templates[profileId] = template
+    if missing:
+        rows = await prisma.models.ProfessionalInfo.prisma().find_many(
+            where={"profileId": {"in": missing}}
+        )
+        for row in rows:
+            templates[row.profileId] = remember(row.profileId, row.availability)
+        for profileId in missing:
+            if profileId not in templates:
+                _templates.set(profileId, EMPTY_TEMPLATE)
+                templates[profileId] = EMPTY_TEMPLATE
+    return templates
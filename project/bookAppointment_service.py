@@ -1,9 +1,14 @@
+import asyncio
 from datetime import datetime
 from typing import Optional
 
 import prisma
 import prisma.enums
 import prisma.models
+import project.appointment_index
+import project.loaders
+import project.schedule_cache
+import project.schedule_versions
 from pydantic import BaseModel
 
 
@@ -52,35 +57,60 @@ async def bookAppointment(
     Returns:
         CalendarBookingResponse: Outputs the result of the booking attempt, reflecting the new status of the appointment along with a confirmation.
     """
-    user = await prisma.models.User.prisma().find_unique(where={"id": userId})
-    professional_profile = await prisma.models.Profile.prisma().find_unique(
-        where={"userId": professionalId}
+    loaders = project.loaders.get_loaders()
+    # Both profiles are looked up by user ID, so they are read with one query.
+    user, user_profile, professional_profile = await asyncio.gather(
+        loaders.user.load(userId),
+        loaders.profile_by_user.load(userId),
+        loaders.profile_by_user.load(professionalId),
     )
-    if not user or not professional_profile or (not professional_profile.user):
+    if not user or not professional_profile:
         return CalendarBookingResponse(
             success=False,
             message="User or Professional not found.",
             appointmentDetails=None,
         )
-    if not user.profile:
+    if not user_profile:
         return CalendarBookingResponse(
             success=False,
             message="User's profile information is incomplete.",
             appointmentDetails=None,
         )
-    new_appointment = await prisma.models.Appointment.prisma().create(
-        data={
-            "userId": userId,
-            "profileId": professional_profile.id,
-            "time": time,
-            "status": prisma.enums.Status.Pending,
-        }
-    )
+    async with project.appointment_index.lock(professional_profile.id):
+        try:
+            conflict = await project.appointment_index.find_conflict(
+                professional_profile.id, time
+            )
+            if conflict is not None:
+                raise project.appointment_index.SlotTaken(conflict)
+            async with prisma.get_client().tx() as transaction:
+                await project.schedule_versions.bump(transaction, professional_profile.id)
+                await project.appointment_index.claim(transaction, professional_profile.id, time)
+                new_appointment = await prisma.models.Appointment.prisma(transaction).create(
+                    data={
+                        "userId": userId,
+                        "profileId": professional_profile.id,
+                        "time": time,
+                        "status": prisma.enums.Status.Pending,
+                    }
+                )
+        except project.appointment_index.SlotTaken:
+            return CalendarBookingResponse(
+                success=False,
+                message="The professional already has an appointment at the requested time.",
+                appointmentDetails=None,
+            )
+        project.appointment_index.record(
+            professional_profile.id, new_appointment.id, new_appointment.time
+        )
+        project.schedule_cache.invalidate_appointment(
+            professional_profile.id, new_appointment.time
+        )
     appointment_details = AppointmentDetails(
         appointmentId=new_appointment.id,
         time=new_appointment.time,
         professionalName=f"{professional_profile.firstName} {professional_profile.lastName}",
-        userName=f"{user.profile.firstName} {user.profile.lastName}",
+        userName=f"{user_profile.firstName} {user_profile.lastName}",
         status=new_appointment.status,
     )
     return CalendarBookingResponse(
@@ -1,9 +1,49 @@
-from typing import List, Optional
+import json
+import logging
+from typing import Dict, List, Optional, Tuple
 
 import prisma
 import prisma.models
+import project.availability_cache
+import project.availability_changes
+import project.availability_events
 from pydantic import BaseModel
 
+logger = logging.getLogger(__name__)
+
+UPSERT_CHUNK_SIZE = 1000
+
+# Set-based upsert of one chunk. Updates for professionals that do not exist are dropped by the join and are
+# reported as errors by comparing the returned IDs against the input. All CTEs see the table as it was before the
+# statement, so "previous" holds the flags being overwritten; rows that did not exist count as unavailable. Every
+# written row is appended to the availability change log by the same statement.
+UPSERT_CHUNK_QUERY = """
+WITH updates AS (
+    SELECT u."professionalInfoId", u."isAvailable", u."currentActivity"
+    FROM json_to_recordset($1::json)
+        AS u("professionalInfoId" int, "isAvailable" boolean, "currentActivity" text)
+), previous AS (
+    SELECT rts."professionalInfoId", rts."isAvailable"
+    FROM "RealTimeStatus" rts
+    JOIN updates u ON u."professionalInfoId" = rts."professionalInfoId"
+), written AS (
+    INSERT INTO "RealTimeStatus" ("professionalInfoId", "isAvailable", "currentActivity")
+    SELECT u."professionalInfoId", u."isAvailable", u."currentActivity"
+    FROM updates u
+    JOIN "ProfessionalInfo" pi ON pi."id" = u."professionalInfoId"
+    ON CONFLICT ("professionalInfoId") DO UPDATE
+    SET "isAvailable" = EXCLUDED."isAvailable",
+        "currentActivity" = EXCLUDED."currentActivity"
+    RETURNING "professionalInfoId", "isAvailable", "currentActivity"
+), logged AS (
+    INSERT INTO "RealTimeStatusChange" ("professionalInfoId", "isAvailable", "currentActivity")
+    SELECT "professionalInfoId", "isAvailable", "currentActivity" FROM written
+)
+SELECT w."professionalInfoId", coalesce(p."isAvailable", false) AS "previousIsAvailable"
+FROM written w
+LEFT JOIN previous p ON p."professionalInfoId" = w."professionalInfoId"
+"""
+
 
 class ProfessionalAvailabilityUpdate(BaseModel):
     """
@@ -24,46 +64,127 @@ class BulkAvailabilityUpdateResponse(BaseModel):
     errors: Optional[List[str]] = None
 
 
+async def upsertChunk(
+    chunk: List[ProfessionalAvailabilityUpdate],
+) -> Tuple[Dict[int, bool], Dict[int, str]]:
+    """
+    Writes one chunk of updates in a single round trip, falling back to row-by-row upserts if the set-based
+    statement fails so that the failing rows can be identified.
+
+    Args:
+        chunk (List[ProfessionalAvailabilityUpdate]): Updates with distinct professionalInfoIds.
+
+    Returns:
+        Tuple[Dict[int, bool], Dict[int, str]]: The availability each written row had before the update, and error
+        messages keyed by the professionalInfoId that could not be written. Previous values are not known on the
+        row-by-row fallback.
+    """
+    payload = json.dumps(
+        [
+            {
+                "professionalInfoId": update.professionalInfoId,
+                "isAvailable": update.isAvailable,
+                "currentActivity": update.currentActivity,
+            }
+            for update in chunk
+        ]
+    )
+    try:
+        rows = await prisma.get_client().query_raw(UPSERT_CHUNK_QUERY, payload)
+    except Exception:
+        logger.exception("Set-based availability upsert failed, retrying row by row")
+        return {}, await upsertRowByRow(chunk)
+    previous = {row["professionalInfoId"]: row["previousIsAvailable"] for row in rows}
+    return previous, {
+        update.professionalInfoId: "professional not found"
+        for update in chunk
+        if update.professionalInfoId not in previous
+    }
+
+
+async def upsertRowByRow(chunk: List[ProfessionalAvailabilityUpdate]) -> Dict[int, str]:
+    """
+    Slow path used only when a set-based chunk fails: upserts each row on its own to isolate the failures.
+
+    Args:
+        chunk (List[ProfessionalAvailabilityUpdate]): Updates with distinct professionalInfoIds.
+
+    Returns:
+        Dict[int, str]: Error messages keyed by the professionalInfoId that could not be written.
+    """
+    errors = {}
+    for update in chunk:
+        try:
+            async with prisma.get_client().tx() as transaction:
+                await prisma.models.RealTimeStatus.prisma(transaction).upsert(
+                    where={"professionalInfoId": update.professionalInfoId},
+                    data={
+                        "create": {
+                            "professionalInfoId": update.professionalInfoId,
+                            "isAvailable": update.isAvailable,
+                            "currentActivity": update.currentActivity,
+                        },
+                        "update": {
+                            "isAvailable": update.isAvailable,
+                            "currentActivity": update.currentActivity,
+                        },
+                    },
+                )
+                await project.availability_changes.record(
+                    transaction,
+                    update.professionalInfoId,
+                    update.isAvailable,
+                    update.currentActivity,
+                )
+        except Exception as e:
+            errors[update.professionalInfoId] = str(e)
+    return errors
+
+
 async def bulkUpdateAvailability(
     updates: List[ProfessionalAvailabilityUpdate],
 ) -> BulkAvailabilityUpdateResponse:
     """
     Provides a mechanism to set or update the availability for multiple professionals at once. This is particularly valuable in scenarios where a group of professionals need to update their status due to a common event or change.
 
+    Updates are written as set-based upserts of UPSERT_CHUNK_SIZE rows each, so the number of round trips grows with
+    the number of chunks rather than with the number of updates. When the same professional appears more than once,
+    the last update wins.
+
     Args:
         updates (List[ProfessionalAvailabilityUpdate]): List of individual availability updates for professionals.
 
     Returns:
         BulkAvailabilityUpdateResponse: Response model returning the status of the bulk availability update operation.
     """
-    updated_count = 0
-    errors = []
+    latest: Dict[int, ProfessionalAvailabilityUpdate] = {}
     for update in updates:
-        try:
-            status = await prisma.models.RealTimeStatus.prisma().find_unique(
-                where={"professionalInfoId": update.professionalInfoId}
-            )
-            if not status:
-                await prisma.models.RealTimeStatus.prisma().create(
-                    data={
-                        "professionalInfoId": update.professionalInfoId,
-                        "isAvailable": update.isAvailable,
-                        "currentActivity": update.currentActivity,
-                    }
-                )
-            else:
-                await prisma.models.RealTimeStatus.prisma().update(
-                    where={"professionalInfoId": update.professionalInfoId},
-                    data={
-                        "isAvailable": update.isAvailable,
-                        "currentActivity": update.currentActivity,
-                    },
-                )
-            updated_count += 1
-        except Exception as e:
-            errors.append(
-                f"Failed to update professionalInfoId {update.professionalInfoId}: {str(e)}"
+        latest[update.professionalInfoId] = update
+    distinct = list(latest.values())
+    previous: Dict[int, bool] = {}
+    failures: Dict[int, str] = {}
+    for start in range(0, len(distinct), UPSERT_CHUNK_SIZE):
+        chunk = distinct[start : start + UPSERT_CHUNK_SIZE]
+        chunk_previous, chunk_failures = await upsertChunk(chunk)
+        previous.update(chunk_previous)
+        failures.update(chunk_failures)
+    for update in distinct:
+        if update.professionalInfoId in failures:
+            project.availability_cache.invalidate(update.professionalInfoId)
+        else:
+            await project.availability_events.status_changed(
+                update.professionalInfoId,
+                update.isAvailable,
+                update.currentActivity,
+                previous.get(update.professionalInfoId),
             )
+    updated_count = sum(
+        1 for update in distinct if update.professionalInfoId not in failures
+    )
+    errors = [
+        f"Failed to update professionalInfoId {professional_info_id}: {message}"
+        for professional_info_id, message in failures.items()
+    ]
     return BulkAvailabilityUpdateResponse(
         updatedCount=updated_count, errors=errors if errors else None
     )
@@ -0,0 +1,92 @@
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Iterable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class LRUCache(Generic[K, V]):
+    """
+    A bounded, in-process least-recently-used cache. Reads refresh an entry's recency and
+    writes evict the least recently used entry once ``maxsize`` is exceeded.
+
+    The cache is not shared between worker processes; every writer in this process is
+    expected to update or invalidate the entries it affects.
+    """
+
+    def __init__(self, maxsize: int, on_evict: Optional[Callable[[K, V], None]] = None):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be a positive integer")
+        self.maxsize = maxsize
+        self.on_evict = on_evict
+        self._entries: "OrderedDict[K, V]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._entries
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """
+        Returns the cached value for ``key`` and marks it as most recently used.
+
+        Args:
+            key (K): The cache key.
+            default (Optional[V]): Value returned when the key is not cached.
+
+        Returns:
+            Optional[V]: The cached value, or ``default`` on a miss.
+        """
+        value = self._entries.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        """
+        Stores ``value`` under ``key``, evicting the least recently used entry if the cache is full. Evicted entries
+        are passed to ``on_evict``, if set; invalidated ones are not.
+
+        Args:
+            key (K): The cache key.
+            value (V): The value to store.
+        """
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            evicted_key, evicted_value = self._entries.popitem(last=False)
+            if self.on_evict is not None:
+                self.on_evict(evicted_key, evicted_value)
+
+    def invalidate(self, key: K) -> None:
+        """
+        Drops ``key`` from the cache if present.
+
+        Args:
+            key (K): The cache key.
+        """
+        self._entries.pop(key, None)
+
+    def invalidate_many(self, keys: Iterable[K]) -> None:
+        """
+        Drops every key in ``keys`` from the cache.
+
+        Args:
+            keys (Iterable[K]): The cache keys to drop.
+        """
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Empties the cache.
+        """
+        self._entries.clear()
@@ -1,6 +1,9 @@
 import prisma
 import prisma.enums
 import prisma.models
+import project.appointment_index
+import project.schedule_cache
+import project.schedule_versions
 from pydantic import BaseModel
 
 
@@ -41,10 +44,16 @@ async def cancelAppointment(appointmentId: int) -> CancelAppointmentResponse:
         return CancelAppointmentResponse(
             success=False, message="The appointment is already canceled."
         )
-    updated_appointment = await prisma.models.Appointment.prisma().update(
-        where={"id": appointmentId}, data={"status": prisma.enums.Status.Cancelled}
-    )
+    async with prisma.get_client().tx() as transaction:
+        await project.schedule_versions.bump(transaction, appointment.profileId)
+        updated_appointment = await prisma.models.Appointment.prisma(transaction).update(
+            where={"id": appointmentId}, data={"status": prisma.enums.Status.Cancelled}
+        )
     if updated_appointment:
+        project.appointment_index.discard(appointment.profileId, appointmentId)
+        project.schedule_cache.invalidate_appointment(
+            appointment.profileId, appointment.time
+        )
         return CancelAppointmentResponse(
             success=True, message="Appointment canceled successfully."
         )
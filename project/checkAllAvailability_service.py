@@ -1,16 +1,34 @@
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 
-import prisma
-import prisma.models
-from pydantic import BaseModel
+import project.db
+import project.fast_json
+from pydantic import BaseModel, Field
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+
+# Keyset page over RealTimeStatus.id, selecting only the columns the response uses.
+AVAILABILITY_PAGE_QUERY = """
+SELECT rts."id" AS "id",
+       p."userId" AS "professional_id",
+       rts."isAvailable" AS "is_available",
+       rts."currentActivity" AS "current_activity"
+FROM "RealTimeStatus" rts
+JOIN "ProfessionalInfo" pi ON pi."id" = rts."professionalInfoId"
+JOIN "Profile" p ON p."id" = pi."profileId"
+WHERE rts."id" > $1
+ORDER BY rts."id"
+LIMIT $2
+"""
 
 
 class FetchAvailabilityRequest(BaseModel):
     """
-    Request model for fetching the real-time availability of all professionals. No specific parameters are needed for this request as it fetches availability in bulk.
+    Request model for fetching the real-time availability of all professionals, one keyset page at a time.
     """
 
-    pass
+    after_id: Optional[int] = None
+    limit: int = Field(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
 
 
 class ProfessionalAvailability(BaseModel):
@@ -25,10 +43,27 @@ class ProfessionalAvailability(BaseModel):
 
 class FetchAvailabilityResponse(BaseModel):
     """
-    Provides a list of all professionals' availability including their current activity and availability status.
+    Provides a page of professionals' availability including their current activity and availability status. Pass next_after_id back as after_id to fetch the following page; it is None on the last page.
     """
 
     availability: List[ProfessionalAvailability]
+    next_after_id: Optional[int] = None
+
+
+async def fetchAvailabilityPage(after_id: Optional[int], limit: int) -> List[dict]:
+    """
+    Reads one keyset page of RealTimeStatus rows joined to the owning profile.
+
+    Args:
+        after_id (Optional[int]): Only rows with a RealTimeStatus ID greater than this are returned. None starts from the beginning.
+        limit (int): Maximum number of RealTimeStatus rows to read.
+
+    Returns:
+        List[dict]: Rows with id, professional_id, is_available and current_activity keys, ordered by id.
+    """
+    return await project.db.reader().query_raw(
+        AVAILABILITY_PAGE_QUERY, after_id or 0, limit
+    )
 
 
 async def checkAllAvailability(
@@ -37,28 +72,69 @@ async def checkAllAvailability(
     """
     Fetches the availability status of all professionals currently registered in the system. Enables administrative or collective views on professional availability.
 
+    Results are paginated on the RealTimeStatus ID so that latency and memory depend on the page size rather than on the number of professionals.
+
     Args:
-        request (FetchAvailabilityRequest): Request model for fetching the real-time availability of all professionals. No specific parameters are needed for this request as it fetches availability in bulk.
+        request (FetchAvailabilityRequest): Request model carrying the keyset cursor and page size.
 
     Returns:
-        FetchAvailabilityResponse: Provides a list of all professionals' availability including their current activity and availability status.
+        FetchAvailabilityResponse: Provides a page of professionals' availability and the cursor for the next page.
 
     Example:
-        request = FetchAvailabilityRequest()
+        request = FetchAvailabilityRequest(limit=100)
         response = await checkAllAvailability(request)
         print(response.availability)  # Outputs a list of ProfessionalAvailability models
+        next_page = await checkAllAvailability(FetchAvailabilityRequest(after_id=response.next_after_id, limit=100))
     """
-    real_time_statuses = await prisma.models.RealTimeStatus.prisma().find_many(
-        include={"professionalInfo": {"include": {"profile": True}}}
-    )
-    availabilities = [
-        ProfessionalAvailability(
-            professional_id=status.professionalInfo.profile.userId,
-            is_available=status.isAvailable,
-            current_activity=status.currentActivity,
+    return FetchAvailabilityResponse.model_validate(await availabilityPage(request))
+
+
+def _availability(row: dict) -> dict:
+    return {
+        "professional_id": row["professional_id"],
+        "is_available": row["is_available"],
+        "current_activity": row["current_activity"],
+    }
+
+
+async def availabilityPage(request: FetchAvailabilityRequest) -> dict:
+    """
+    Reads one page of professionals' availability as plain data shaped like FetchAvailabilityResponse, for routes
+    that encode it directly with project.fast_json instead of building and re-validating models.
+
+    Args:
+        request (FetchAvailabilityRequest): Request model carrying the keyset cursor and page size.
+
+    Returns:
+        dict: The page, with availability and next_after_id keys.
+    """
+    rows = await fetchAvailabilityPage(request.after_id, request.limit)
+    return {
+        "availability": [_availability(row) for row in rows],
+        "next_after_id": rows[-1]["id"] if len(rows) == request.limit else None,
+    }
+
+
+async def streamAllAvailability(
+    batch_size: int = DEFAULT_PAGE_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    Streams the availability of every professional as newline-delimited JSON. Rows are read in keyset pages of batch_size and written out as each page arrives, so memory stays flat regardless of table size.
+
+    Args:
+        batch_size (int): Number of rows read from the database per round trip.
+
+    Yields:
+        bytes: One chunk of NDJSON lines per page, each line a ProfessionalAvailability object.
+    """
+    after_id = None
+    while True:
+        rows = await fetchAvailabilityPage(after_id, batch_size)
+        if not rows:
+            return
+        yield b"".join(
+            project.fast_json.dumps(_availability(row)) + b"\n" for row in rows
         )
-        for status in real_time_statuses
-        if status.professionalInfo and status.professionalInfo.profile
-    ]
-    response = FetchAvailabilityResponse(availability=availabilities)
-    return response
+        if len(rows) < batch_size:
+            return
+        after_id = rows[-1]["id"]
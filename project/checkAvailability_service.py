@@ -3,6 +3,7 @@ from typing import Optional
 
 import prisma
 import prisma.models
+import project.availability_cache
 from pydantic import BaseModel
 
 
@@ -30,10 +31,8 @@ async def checkAvailability(professionalId: int) -> ProfessionalAvailabilityResp
     Returns:
     ProfessionalAvailabilityResponse: Response model indicating the real-time availability status of a professional, which considers both scheduled and spontaneous events that might affect this status.
     """
-    real_time_status = await prisma.models.RealTimeStatus.prisma().find_unique(
-        where={"professionalInfoId": professionalId}
-    )
-    if real_time_status and (not real_time_status.isAvailable):
+    real_time_status = await project.availability_cache.fetch(professionalId)
+    if real_time_status.exists and (not real_time_status.isAvailable):
         return ProfessionalAvailabilityResponse(
             isAvailable=False,
             message=f"Currently not available due to: {real_time_status.currentActivity}.",
@@ -1,8 +1,14 @@
+import asyncio
 from datetime import datetime
 
 import prisma
 import prisma.enums
 import prisma.models
+import project.appointment_index
+import project.loaders
+import project.notification_outbox
+import project.schedule_cache
+import project.schedule_versions
 from pydantic import BaseModel
 
 
@@ -38,47 +44,50 @@ async def createBooking(
     Returns:
         BookingConfirmationResponse: Response model after a successful booking, confirming the details of the newly created appointment.
     """
-    user = await prisma.models.User.prisma().find_unique(where={"id": userId})
-    professional_profile = await prisma.models.Profile.prisma().find_unique(
-        where={"id": professionalId}, include={"professionalInfo": True}
+    loaders = project.loaders.get_loaders()
+    user, professional_info = await asyncio.gather(
+        loaders.user.load(userId),
+        loaders.professional_info_by_profile.load(professionalId),
     )
-    if (
-        not user
-        or not professional_profile
-        or (not professional_profile.professionalInfo)
-    ):
+    if not user or not professional_info:
         return BookingConfirmationResponse(
             message="User or professional not found",
             appointmentId=-1,
             status=prisma.enums.Status.Cancelled,
         )
-    overlapping_appointments = await prisma.models.Appointment.prisma().find_many(
-        where={
-            "profileId": professionalId,
-            "status": prisma.enums.Status.Confirmed,
-            "time": appointmentTime,
-        }
-    )
-    if overlapping_appointments:
-        return BookingConfirmationResponse(
-            message="No available slots for the requested time",
-            appointmentId=-1,
-            status=prisma.enums.Status.Cancelled,
+    async with project.appointment_index.lock(professionalId):
+        try:
+            conflict = await project.appointment_index.find_conflict(
+                professionalId, appointmentTime
+            )
+            if conflict is not None:
+                raise project.appointment_index.SlotTaken(conflict)
+            async with prisma.get_client().tx() as transaction:
+                await project.schedule_versions.bump(transaction, professionalId)
+                await project.appointment_index.claim(transaction, professionalId, appointmentTime)
+                new_appointment = await prisma.models.Appointment.prisma(transaction).create(
+                    data={
+                        "userId": userId,
+                        "profileId": professionalId,
+                        "time": appointmentTime,
+                        "status": prisma.enums.Status.Pending,
+                    }
+                )
+        except project.appointment_index.SlotTaken:
+            return BookingConfirmationResponse(
+                message="No available slots for the requested time",
+                appointmentId=-1,
+                status=prisma.enums.Status.Cancelled,
+            )
+        project.appointment_index.record(
+            professionalId, new_appointment.id, new_appointment.time
         )
-    new_appointment = await prisma.models.Appointment.prisma().create(
-        data={
-            "userId": userId,
-            "profileId": professionalId,
-            "time": appointmentTime,
-            "status": prisma.enums.Status.Pending,
-        }
-    )
-    await prisma.models.Notification.prisma().create(
-        data={
-            "userId": userId,
-            "message": f"Your appointment with professional ID {professionalId} at {appointmentTime} has been booked.",
-            "isRead": False,
-        }
+        project.schedule_cache.invalidate_appointment(
+            professionalId, new_appointment.time
+        )
+    project.notification_outbox.enqueue(
+        userId,
+        f"Your appointment with professional ID {professionalId} at {appointmentTime} has been booked.",
     )
     return BookingConfirmationResponse(
         message="Booking successfully created.",
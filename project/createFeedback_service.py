@@ -1,5 +1,6 @@
 import prisma
 import prisma.models
+import project.rating_aggregates
 from pydantic import BaseModel
 
 
@@ -22,16 +23,21 @@ async def createFeedback(
     professional_id (str): The ID of the professional to whom the feedback is being given.
     user_id (str): The ID of the user submitting the feedback. Extracted from session token and validated.
     content (str): The textual content of the feedback given by the user.
-    rating (int): A numerical rating that accompanies the feedback text, typically on a scale.
+    rating (int): A numerical rating that accompanies the feedback text, from 1 to 5.
 
     Returns:
     FeedbackResponse: A response to be returned after feedback submission. It includes information whether the attempt was successful or if errors occurred.
     """
+    if not project.rating_aggregates.is_valid_rating(rating):
+        return FeedbackResponse(
+            success=False,
+            message=f"Rating must be between {project.rating_aggregates.MIN_RATING} and {project.rating_aggregates.MAX_RATING}.",
+        )
     user = await prisma.models.User.prisma().find_unique(where={"id": int(user_id)})
     if not user:
         return FeedbackResponse(success=False, message="User not found.")
     professional = await prisma.models.Profile.prisma().find_unique(
-        where={"id": int(professional_id)}
+        where={"id": int(professional_id)}, include={"professionalInfo": True}
     )
     if not professional:
         return FeedbackResponse(success=False, message="Professional not found.")
@@ -39,14 +45,18 @@ async def createFeedback(
         return FeedbackResponse(
             success=False, message="This professional does not accept feedback."
         )
-    feedback = await prisma.models.Feedback.prisma().create(
-        data={
-            "userId": int(user_id),
-            "profileId": int(professional_id),
-            "content": content,
-            "rating": rating,
-        }
-    )
+    async with prisma.get_client().tx() as transaction:
+        feedback = await prisma.models.Feedback.prisma(transaction).create(
+            data={
+                "userId": int(user_id),
+                "profileId": int(professional_id),
+                "content": content,
+                "rating": rating,
+            }
+        )
+        await project.rating_aggregates.apply(
+            transaction, feedback.profileId, added=rating
+        )
     if feedback:
         return FeedbackResponse(
             success=True, message="Feedback submitted successfully."
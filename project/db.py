@@ -0,0 +1,310 @@
+import asyncio
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+import httpx
+import prisma.engine.errors
+import prisma.errors
+import project.metrics
+from prisma import Prisma
+
+logger = logging.getLogger(__name__)
+
+# The query engine queues queries once its connection pool is exhausted, invisibly to us. Gating queries behind a
+# semaphore of the same size moves that queue into this process, where the wait can be measured. Keep DB_POOL_SIZE
+# equal to the connection_limit of DATABASE_URL (the engine defaults to 2 * CPUs + 1).
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", str(2 * (os.cpu_count() or 1) + 1)))
+
+# Optional streaming replica for read-only services. Reads stay on the primary while it is unset, unhealthy or lagging
+# more than REPLICA_MAX_LAG_SECONDS, and for READ_YOUR_WRITES_SECONDS after a client's last mutating request.
+DATABASE_REPLICA_URL = os.environ.get("DATABASE_REPLICA_URL")
+DB_REPLICA_POOL_SIZE = int(os.environ.get("DB_REPLICA_POOL_SIZE", str(DB_POOL_SIZE)))
+REPLICA_HEALTH_SECONDS = float(os.environ.get("REPLICA_HEALTH_SECONDS", "5"))
+REPLICA_MAX_LAG_SECONDS = float(os.environ.get("REPLICA_MAX_LAG_SECONDS", "5"))
+READ_YOUR_WRITES_SECONDS = float(os.environ.get("READ_YOUR_WRITES_SECONDS", "5"))
+
+# Zero when the replica has replayed everything it received (or is not a standby at all, e.g. a second local
+# instance used for testing); otherwise how far behind its last replayed transaction is.
+REPLICA_LAG_QUERY = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+END::float8 AS "lag"
+"""
+
+# Query engine error codes meaning the database could not be used at all (P1xxx: unreachable, timed out, connection
+# closed; P2024: no connection from the pool in time), as opposed to a query that would fail on any database.
+UNAVAILABLE_ERROR_CODES = {"P2024"}
+
+DB_QUERIES = project.metrics.Counter(
+    "db_queries_total",
+    "Prisma queries executed, by database, model and action.",
+    ["database", "model", "action"],
+)
+DB_QUERY_ERRORS = project.metrics.Counter(
+    "db_query_errors_total",
+    "Prisma queries that raised, by database, model and action.",
+    ["database", "model", "action"],
+)
+DB_QUERY_SECONDS = project.metrics.Histogram(
+    "db_query_duration_seconds",
+    "Time spent in the query engine per Prisma query, excluding pool wait.",
+    ["database", "model", "action"],
+)
+DB_POOL_WAIT_SECONDS = project.metrics.Histogram(
+    "db_pool_wait_seconds",
+    "Time a Prisma query waited for a free connection slot.",
+    ["database"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+DB_IN_FLIGHT = project.metrics.Gauge(
+    "db_queries_in_flight",
+    "Prisma queries currently holding a connection slot.",
+    ["database"],
+)
+REPLICA_HEALTHY = project.metrics.Gauge(
+    "db_replica_healthy", "1 while reads are routed to the replica, 0 while they fall back to the primary."
+)
+REPLICA_LAG_SECONDS = project.metrics.Gauge(
+    "db_replica_lag_seconds", "Replication lag measured by the last replica health check."
+)
+REPLICA_FALLBACKS = project.metrics.Counter(
+    "db_replica_fallbacks_total", "Replica queries that failed and were retried on the primary."
+)
+
+
+class RequestStats:
+    """
+    Database work attributed to one HTTP request.
+    """
+
+    __slots__ = ("queries", "db_seconds", "pool_wait_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+_read_from_primary: ContextVar[bool] = ContextVar("read_from_primary", default=False)
+# Set while the health check runs, so that a failing probe is reported instead of being retried on the primary.
+_probing: ContextVar[bool] = ContextVar("probing_replica", default=False)
+
+
+def start_request() -> RequestStats:
+    """
+    Starts attributing queries in the current context to a new RequestStats. Called by the HTTP middleware before
+    the route runs; tasks spawned by the route inherit it.
+
+    Returns:
+        RequestStats: The counters that the request's queries add to.
+    """
+    stats = RequestStats()
+    _request_stats.set(stats)
+    return stats
+
+
+_pools: Dict[str, asyncio.Semaphore] = {}
+
+
+def _pool_slots(database: str) -> asyncio.Semaphore:
+    # Created lazily so that the semaphore binds to the server's event loop rather than the importing one.
+    pool = _pools.get(database)
+    if pool is None:
+        pool = _pools[database] = asyncio.Semaphore(
+            DB_REPLICA_POOL_SIZE if database == "replica" else DB_POOL_SIZE
+        )
+    return pool
+
+
+class InstrumentedPrisma(Prisma):
+    """
+    A Prisma client that counts and times every query it executes, including raw queries and queries run inside
+    ``tx()`` (transactions copy the client class). Batched writes through ``batch_()`` bypass ``_execute`` and are
+    not counted.
+    """
+
+    database = "primary"
+
+    async def _execute(self, **kwargs: Any) -> Any:
+        model = kwargs.get("model")
+        labels = {
+            "database": self.database,
+            "model": model.__name__ if model is not None else "raw",
+            "action": kwargs.get("method", "unknown"),
+        }
+        stats = _request_stats.get()
+        queued = time.perf_counter()
+        # A transaction already owns its connection, so its queries never wait for the pool.
+        pool = _pool_slots(self.database) if self._tx_id is None else None
+        if pool is not None:
+            await pool.acquire()
+        started = time.perf_counter()
+        DB_IN_FLIGHT.inc(database=self.database)
+        try:
+            return await super()._execute(**kwargs)
+        except Exception:
+            DB_QUERY_ERRORS.inc(**labels)
+            raise
+        finally:
+            finished = time.perf_counter()
+            DB_IN_FLIGHT.dec(database=self.database)
+            if pool is not None:
+                pool.release()
+                DB_POOL_WAIT_SECONDS.observe(started - queued, database=self.database)
+            DB_QUERIES.inc(**labels)
+            DB_QUERY_SECONDS.observe(finished - started, **labels)
+            if stats is not None:
+                stats.queries += 1
+                stats.db_seconds += finished - started
+                stats.pool_wait_seconds += started - queued
+
+
+class ReplicaPrisma(InstrumentedPrisma):
+    """
+    The client of the read replica. A query that fails because the replica cannot be reached is retried on the
+    primary, and reads stay on the primary until the next health check finds the replica usable again. Any other
+    error is raised unchanged.
+    """
+
+    database = "replica"
+
+    async def _execute(self, **kwargs: Any) -> Any:
+        try:
+            return await super()._execute(**kwargs)
+        except Exception as e:
+            # A query that is wrong in itself (bad raw SQL, invalid filter, record not found) would fail the same way
+            # on the primary, and says nothing about the replica's health.
+            if _probing.get() or not is_unavailable(e):
+                raise
+            logger.warning("Replica query failed, retrying on the primary", exc_info=True)
+            _set_replica_healthy(False)
+            REPLICA_FALLBACKS.inc()
+            return await db_client._execute(**kwargs)
+
+
+def is_unavailable(error: Exception) -> bool:
+    """
+    Tells whether a query failed because its database or query engine could not be reached, rather than because of
+    the query itself.
+
+    Args:
+        error (Exception): The exception raised by the query.
+
+    Returns:
+        bool: True for connection and engine failures.
+    """
+    if isinstance(error, prisma.engine.errors.UnprocessableEntityError):
+        return False
+    if isinstance(
+        error,
+        (
+            prisma.engine.errors.EngineError,
+            prisma.errors.ClientNotConnectedError,
+            prisma.errors.HTTPClientClosedError,
+            httpx.TransportError,
+            OSError,
+            asyncio.TimeoutError,
+        ),
+    ):
+        return True
+    if isinstance(error, prisma.errors.DataError):
+        code = error.code or ""
+        return code.startswith("P1") or code in UNAVAILABLE_ERROR_CODES
+    return False
+
+
+db_client = InstrumentedPrisma(auto_register=True)
+replica_client: Optional[ReplicaPrisma] = (
+    ReplicaPrisma(datasource={"url": DATABASE_REPLICA_URL})
+    if DATABASE_REPLICA_URL
+    else None
+)
+_replica_healthy = False
+
+
+def _set_replica_healthy(healthy: bool) -> None:
+    global _replica_healthy
+    if healthy != _replica_healthy:
+        logger.info("Routing reads to the %s", "replica" if healthy else "primary")
+    _replica_healthy = healthy
+    REPLICA_HEALTHY.set(1 if healthy else 0)
+
+
+def read_from_primary() -> None:
+    """
+    Sends every read in the current context to the primary. Called by the HTTP middleware for mutating requests and
+    for requests from a client that mutated within READ_YOUR_WRITES_SECONDS, so that clients read their own writes.
+    """
+    _read_from_primary.set(True)
+
+
+def reader() -> Prisma:
+    """
+    Returns the client that read-only services should query: the replica when one is configured, healthy and allowed
+    for this request, the primary otherwise. Use it as ``Model.prisma(project.db.reader())`` or
+    ``project.db.reader().query_raw(...)``. Reads that fill an in-process cache must stay on the primary, since a
+    lagging replica would leave a stale entry behind.
+
+    Returns:
+        Prisma: The client to read from.
+    """
+    if replica_client is None or not _replica_healthy or _read_from_primary.get():
+        return db_client
+    return replica_client
+
+
+async def check_replica() -> bool:
+    """
+    Probes the replica, connecting it first if needed, and routes reads to it only if it answers and its lag is
+    within REPLICA_MAX_LAG_SECONDS.
+
+    Returns:
+        bool: Whether reads are routed to the replica.
+    """
+    token = _probing.set(True)
+    try:
+        if not replica_client.is_connected():
+            await replica_client.connect()
+        rows = await asyncio.wait_for(
+            replica_client.query_raw(REPLICA_LAG_QUERY), REPLICA_HEALTH_SECONDS
+        )
+        lag = float(rows[0]["lag"])
+        REPLICA_LAG_SECONDS.set(lag)
+        healthy = lag <= REPLICA_MAX_LAG_SECONDS
+    except Exception:
+        logger.warning("Replica health check failed", exc_info=True)
+        healthy = False
+    finally:
+        _probing.reset(token)
+    _set_replica_healthy(healthy)
+    return healthy
+
+
+async def monitor_replica() -> None:
+    """
+    Checks the replica every REPLICA_HEALTH_SECONDS. Run by the server lifespan; returns at once when no replica is
+    configured.
+    """
+    if replica_client is None:
+        return
+    while True:
+        await check_replica()
+        await asyncio.sleep(REPLICA_HEALTH_SECONDS)
+
+
+async def disconnect_replica() -> None:
+    """
+    Stops routing reads to the replica and disconnects it. Called by the server lifespan.
+    """
+    if replica_client is None:
+        return
+    _set_replica_healthy(False)
+    if replica_client.is_connected():
+        await replica_client.disconnect()
@@ -1,5 +1,10 @@
 import prisma
 import prisma.models
+import project.availability_changes
+import project.availability_events
+import project.availability_template
+import project.schedule_cache
+import project.schedule_versions
 from pydantic import BaseModel
 
 
@@ -33,12 +38,24 @@ async def deleteAvailability(
         include={"professionalInfo": True},
     )
     if profile and profile.professionalInfo:
-        await prisma.models.RealTimeStatus.prisma().delete_many(
-            where={"professionalInfoId": profile.professionalInfo.id}
-        )
-        profile.professionalInfo = await prisma.models.ProfessionalInfo.prisma().update(
-            where={"id": profile.professionalInfo.id}, data={"availability": "{}"}
-        )
+        async with prisma.get_client().tx() as transaction:
+            deleted = await prisma.models.RealTimeStatus.prisma(
+                transaction
+            ).delete_many(where={"professionalInfoId": profile.professionalInfo.id})
+            if deleted:
+                await project.availability_changes.record(
+                    transaction, profile.professionalInfo.id, False, removed=True
+                )
+        await project.availability_events.status_removed(profile.professionalInfo.id)
+        async with prisma.get_client().tx() as transaction:
+            await project.schedule_versions.bump(transaction, profile.id)
+            profile.professionalInfo = await prisma.models.ProfessionalInfo.prisma(
+                transaction
+            ).update(
+                where={"id": profile.professionalInfo.id}, data={"availability": "{}"}
+            )
+        project.availability_template.invalidate(profile.id)
+        project.schedule_cache.invalidate_professional(profile.id)
         return DeleteProfessionalAvailabilityResponse(
             message="Professional availability removed.", status=True
         )
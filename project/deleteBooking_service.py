@@ -1,5 +1,9 @@
 import prisma
 import prisma.models
+import project.appointment_index
+import project.notification_outbox
+import project.schedule_cache
+import project.schedule_versions
 from pydantic import BaseModel
 
 
@@ -26,9 +30,13 @@ async def deleteBooking(bookingId: int) -> DeleteBookingResponse:
         return DeleteBookingResponse(success=False, message='Booking does not exist.')
     user_id = booking.user.id if booking.user else None
     professional_user_id = booking.profile.user.id if booking.profile and booking.profile.user else None
+    async with prisma.get_client().tx() as transaction:
+        await project.schedule_versions.bump(transaction, booking.profileId)
+        await prisma.models.Appointment.prisma(transaction).delete(where={'id': bookingId})
+    project.appointment_index.discard(booking.profileId, bookingId)
+    project.schedule_cache.invalidate_appointment(booking.profileId, booking.time)
     if user_id and professional_user_id:
-        message_user = f'Your booking on {booking.time.strftime('%Y-%m-%d %H:%M')} has been canceled.'
-        message_professional = f'A booking on {booking.time.strftime('%Y-%m-%d %H:%M')} has been canceled.'
-        await prisma.models.Notification.prisma().create_many(data=[{'userId': user_id, 'message': message_user}, {'userId': professional_user_id, 'message': message_professional}])
-    await prisma.models.Appointment.prisma().delete(where={'id': bookingId})
+        message_user = f'Your booking on {booking.time.strftime("%Y-%m-%d %H:%M")} has been canceled.'
+        message_professional = f'A booking on {booking.time.strftime("%Y-%m-%d %H:%M")} has been canceled.'
+        project.notification_outbox.enqueue_many([(user_id, message_user), (professional_user_id, message_professional)])
     return DeleteBookingResponse(success=True, message='Booking and notifications processed successfully.')
\ No newline at end of file
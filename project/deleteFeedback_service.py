@@ -1,5 +1,7 @@
 import prisma
 import prisma.models
+import project.rating_aggregates
+from project.auth import AuthenticatedUser
 from pydantic import BaseModel
 
 
@@ -12,27 +14,42 @@ class DeleteFeedbackResponse(BaseModel):
     success: bool
 
 
-async def deleteFeedback(feedbackId: int) -> DeleteFeedbackResponse:
+async def deleteFeedback(
+    feedbackId: int, current_user: AuthenticatedUser
+) -> DeleteFeedbackResponse:
     """
     Removes a feedback entry identified by its ID. Restricted to the user who posted the feedback or an admin. The route verifies the user's identity and permission, then deletes the feedback, returning a success or error response.
 
     Args:
     feedbackId (int): The unique identifier for the feedback to be deleted.
+    current_user (AuthenticatedUser): The verified caller; must be the feedback's author or an admin.
 
     Returns:
     DeleteFeedbackResponse: Response model indicating the result of the feedback deletion attempt. It will return a success message on successful deletion or an error message on failure, including lack of permissions or incorrect feedbackId.
 
     Example:
         async def test_deleteFeedback():
-            response = await deleteFeedback(1)
+            response = await deleteFeedback(1, current_user)
             print(response)
     """
-    feedback = await prisma.models.Feedback.prisma().find_many(where={"id": feedbackId})
-    if not feedback:
+    feedback = await prisma.models.Feedback.prisma().find_unique(where={"id": feedbackId})
+    if feedback is None:
         return DeleteFeedbackResponse(
             message="prisma.models.Feedback ID not found.", success=False
         )
-    result = await prisma.models.Feedback.prisma().delete(where={"id": feedbackId})
+    if feedback.userId != current_user.user_id and not current_user.is_admin:
+        return DeleteFeedbackResponse(
+            message="You do not have permission to delete this feedback.",
+            success=False,
+        )
+    async with prisma.get_client().tx() as transaction:
+        result = await prisma.models.Feedback.prisma(transaction).delete(
+            where={"id": feedbackId}
+        )
+        if result is not None:
+            await project.rating_aggregates.apply(
+                transaction, result.profileId, removed=result.rating
+            )
     if result is None:
         return DeleteFeedbackResponse(
             message="Failed to delete prisma.models.Feedback. It may have been deleted already.",
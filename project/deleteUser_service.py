@@ -1,6 +1,7 @@
 import prisma
-import prisma.enums
 import prisma.models
+import project.token_revocation
+from project.auth import AuthenticatedUser
 from pydantic import BaseModel
 
 
@@ -14,7 +15,7 @@ class DeleteUserResponse(BaseModel):
 
 
 async def deleteUser(
-    id: str, confirmation: bool, admin_user_id: str, token: str
+    id: str, confirmation: bool, current_user: AuthenticatedUser
 ) -> DeleteUserResponse:
     """
     This endpoint provides a mechanism for removing a user from the system database. It is restricted to admins and requires a confirmation step through their authenticated session before proceeding with deletion.
@@ -22,43 +23,19 @@ async def deleteUser(
     Args:
         id (str): The unique identifier for the user to delete.
         confirmation (bool): Confirmation flag to ensure that the delete action is intentional.
-        admin_user_id (str): The ID of the admin authorized to delete the user.
-        token (str): Authentication token to validate the admin's session.
+        current_user (AuthenticatedUser): The verified caller; must hold the Admin role.
 
     Returns:
         DeleteUserResponse: Response model confirming the deletion of the user. It indicates whether the deletion was successfully executed or if there were any issues (e.g., user not found or insufficient permissions).
     """
-    admin_user = await prisma.models.User.prisma().find_unique(
-        where={"id": int(admin_user_id)}
-    )
-    if (
-        not admin_user
-        or admin_user.role != prisma.enums.Role.Admin
-        or (not validate_token(admin_user, token))
-    ):
+    if not current_user.is_admin:
         return DeleteUserResponse(
             success=False, message="Invalid admin credentials or token."
         )
     if not confirmation:
         return DeleteUserResponse(success=False, message="Deletion not confirmed.")
-    user_to_delete = await prisma.models.User.prisma().find_unique(
-        where={"id": int(id)}
-    )
-    if user_to_delete is None:
+    deleted_user = await prisma.models.User.prisma().delete(where={"id": int(id)})
+    if deleted_user is None:
         return DeleteUserResponse(success=False, message="User not found.")
-    await prisma.models.User.prisma().delete(where={"id": int(id)})
+    await project.token_revocation.revoke_user(deleted_user.id)
     return DeleteUserResponse(success=True, message="User successfully deleted.")
-
-
-def validate_token(user, token):
-    """
-    Simulates token validation against stored user credentials.
-
-    Args:
-        user (prisma.models.User): The user data from the database.
-        token (str): The provided authentication token.
-
-    Returns:
-        bool: Whether the token is valid for the given user.
-    """
-    return token == user.email[::-1]
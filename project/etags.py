@@ -0,0 +1,104 @@
+from datetime import date
+from typing import Dict, Optional
+
+import project.metrics
+from fastapi.responses import Response
+
+ETAG_NOT_MODIFIED = project.metrics.Counter(
+    "etag_not_modified_total",
+    "Conditional GETs answered with 304 Not Modified instead of a body, by route.",
+    ["route"],
+)
+
+
+def _tag(*parts: object) -> str:
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def availability_etag(professionalInfoId: int, version: str) -> str:
+    """
+    Tags the availability of one professional.
+
+    Args:
+        professionalInfoId (int): The ProfessionalInfo ID the RealTimeStatus row belongs to.
+        version (str): project.availability_cache.status_version() of the status the response is built from.
+
+    Returns:
+        str: The quoted entity tag.
+    """
+    return _tag("a", professionalInfoId, version)
+
+
+def availability_list_etag(version: str) -> str:
+    """
+    Tags the availability of every professional. Take the version before reading the availability, from the database
+    it is read from, so that a write racing with the read can only make the tag older than the body, never newer.
+
+    Args:
+        version (str): project.availability_changes.log_version().
+
+    Returns:
+        str: The quoted entity tag.
+    """
+    return _tag("all", version)
+
+
+def schedule_etag(profileId: int, version: int, startDate: date, endDate: date) -> str:
+    """
+    Tags the schedule of one professional over a range of days. Take the version before reading, as with
+    availability_etag, and pass the resolved days rather than the requested ones, so that a request for today gets a
+    new tag when the day changes.
+
+    Args:
+        profileId (int): The professional's Profile ID.
+        version (int): project.schedule_versions.current() of the professional.
+        startDate (date): The first day of the schedule.
+        endDate (date): The last day of the schedule.
+
+    Returns:
+        str: The quoted entity tag.
+    """
+    return _tag("s", profileId, version, startDate.isoformat(), endDate.isoformat())
+
+
+def headers(etag: str) -> Dict[str, str]:
+    """
+    The validator headers of a tagged response. ``no-cache`` lets clients keep the body but makes them revalidate it
+    on every use.
+    """
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header lists the current tag, using the weak comparison RFC 9110 prescribes for it.
+
+    Args:
+        if_none_match (Optional[str]): The request's If-None-Match header, if any.
+        etag (str): The current tag.
+
+    Returns:
+        bool: True if the client's copy is current.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str, route: str) -> Response:
+    """
+    Answers a conditional GET whose tag matched, without a body.
+
+    Args:
+        etag (str): The current tag.
+        route (str): The route template reported in metrics.
+
+    Returns:
+        Response: A 304 response carrying the tag.
+    """
+    ETAG_NOT_MODIFIED.inc(route=route)
+    return Response(status_code=304, headers=headers(etag))
@@ -0,0 +1,59 @@
+import json
+from datetime import date, datetime, timedelta
+from enum import Enum
+from typing import Any
+
+from fastapi.responses import Response
+
+# orjson is optional. Without it the standard library encoder is used, which still skips FastAPI's response_model
+# validation and jsonable_encoder pass but encodes more slowly.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ENCODER = "orjson" if orjson is not None else "json"
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        # Written like pydantic writes it, so both response paths agree: UTC as "Z", microseconds only when set.
+        text = value.isoformat()
+        return text[:-6] + "Z" if value.utcoffset() == timedelta(0) else text
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Encodes plain Python data (dicts, lists, strings, numbers, datetimes, enums) to compact JSON bytes.
+
+    Args:
+        content (Any): The data to encode.
+
+    Returns:
+        bytes: The JSON document.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(
+        content, default=_default, separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """
+    A JSON response encoded in one pass from plain data. Returning it from a route bypasses FastAPI's response_model
+    validation and re-encoding, so only use it for service output whose shape is already trusted; keep
+    ``response_model`` on the route for the OpenAPI schema.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
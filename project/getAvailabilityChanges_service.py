@@ -0,0 +1,162 @@
+import json
+from typing import List, Optional, Tuple
+
+import prisma
+import project.db
+from pydantic import BaseModel
+
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 10000
+
+# Entries of transactions older than every transaction still in flight, in transaction order. A transaction at or above
+# the horizon may still commit, and commit entries after anything already returned; below it nothing can change.
+ENTRIES_QUERY = """
+SELECT c."txid" AS "txid", c."professionalInfoId" AS "professional_info_id", h."horizon" AS "horizon"
+FROM (SELECT txid_snapshot_xmin(txid_current_snapshot()) AS "horizon") h
+JOIN "RealTimeStatusChange" c ON c."txid" > $1 AND c."txid" < h."horizon"
+ORDER BY c."txid", c."seq"
+LIMIT $2
+"""
+
+TRANSACTION_QUERY = """
+SELECT c."txid" AS "txid", c."professionalInfoId" AS "professional_info_id"
+FROM "RealTimeStatusChange" c
+WHERE c."txid" = $1
+"""
+
+# Transaction order is not the order in which one professional's row was written (a bulk chunk can take its ID before
+# a concurrent single update and write the row after it), so every professional in a page is answered with its newest
+# entry by seq below the horizon.
+LATEST_QUERY = """
+SELECT DISTINCT ON (c."professionalInfoId")
+       c."seq" AS "seq",
+       p."userId" AS "professional_id",
+       c."professionalInfoId" AS "professional_info_id",
+       c."isAvailable" AS "is_available",
+       c."currentActivity" AS "current_activity",
+       c."removed" AS "removed"
+FROM "RealTimeStatusChange" c
+LEFT JOIN "ProfessionalInfo" pi ON pi."id" = c."professionalInfoId"
+LEFT JOIN "Profile" p ON p."id" = pi."profileId"
+WHERE c."professionalInfoId" IN (SELECT value::int FROM json_array_elements_text($1::json))
+  AND c."txid" < $2
+ORDER BY c."professionalInfoId", c."seq" DESC
+"""
+
+LOG_STATE_QUERY = """
+SELECT coalesce((SELECT "compactedThrough" FROM "RealTimeStatusChangeLog" WHERE "id" = 1), 0) AS "compacted_through",
+       txid_snapshot_xmin(txid_current_snapshot()) AS "horizon"
+"""
+
+
+class AvailabilityChange(BaseModel):
+    """
+    The availability of one professional as of its latest change. professional_id matches the professional_id of GET /availability; seq orders the changes of one professional.
+    """
+
+    seq: int
+    professional_id: Optional[int] = None
+    professional_info_id: int
+    is_available: bool
+    current_activity: Optional[str] = None
+    removed: bool = False
+
+
+class AvailabilityChangesResponse(BaseModel):
+    """
+    The availability changes after a cursor, oldest first, with one entry per professional. Pass next_since back as since to continue. When resync_required is True the changes since the cursor are no longer known: fetch GET /availability in full, then continue from next_since.
+    """
+
+    changes: List[AvailabilityChange]
+    next_since: int
+    has_more: bool = False
+    resync_required: bool = False
+
+
+async def getAvailabilityChanges(
+    since: Optional[int], limit: int = DEFAULT_PAGE_SIZE
+) -> AvailabilityChangesResponse:
+    """
+    Returns the RealTimeStatus changes made after the given point of the change log, so that a client mirroring every professional's availability only downloads what changed.
+
+    A client starts without since, which always answers resync_required: it then reads GET /availability in full and polls with the returned next_since. Every professional changed within a page is returned once, in its latest state, so a page is proportional to the number of professionals that changed rather than to the fleet size.
+
+    The cursor is the ID of the last writing transaction returned. Writers do not serialize on the log: a page only covers transactions older than every transaction still in flight, and always covers them whole.
+
+    Args:
+        since (Optional[int]): The next_since of the previous response; None to start a sync.
+        limit (int): Maximum number of log entries to read, capped at MAX_PAGE_SIZE.
+
+    Returns:
+        AvailabilityChangesResponse: The changes and the cursor to continue from.
+    """
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    client = project.db.reader()
+    res = await readChanges(client, since, limit)
+    if res.resync_required and since is not None and client is not project.db.db_client:
+        # A cursor handed out by the primary can be ahead of a lagging replica, so only the primary can tell whether
+        # it is really unknown.
+        res = await readChanges(project.db.db_client, since, limit)
+    return res
+
+
+async def readChanges(
+    client: prisma.Prisma, since: Optional[int], limit: int
+) -> AvailabilityChangesResponse:
+    """
+    Reads one page of the change log from the given database.
+
+    Args:
+        client (prisma.Prisma): The database to read from.
+        since (Optional[int]): The next_since of the previous response; None to start a sync.
+        limit (int): Maximum number of log entries to read; a larger transaction is read whole.
+
+    Returns:
+        AvailabilityChangesResponse: The changes and the cursor to continue from.
+    """
+    rows = await client.query_raw(ENTRIES_QUERY, since, limit) if since is not None else []
+    page, has_more = wholeTransactions(rows, limit)
+    if has_more and not page:
+        # A single transaction wrote more entries than fit in a page. The cursor cannot point inside a transaction,
+        # so it is returned whole.
+        page = await client.query_raw(TRANSACTION_QUERY, rows[0]["txid"])
+    changes = []
+    if page:
+        professional_info_ids = sorted({row["professional_info_id"] for row in page})
+        changes = await client.query_raw(
+            LATEST_QUERY, json.dumps(professional_info_ids), rows[0]["horizon"]
+        )
+    # The entries are read before the log state, so a compaction that removed some of them is always noticed.
+    state = (await client.query_raw(LOG_STATE_QUERY))[0]
+    latest = max(state["horizon"] - 1, state["compacted_through"])
+    # A cursor past the end of the log was not issued by this log (a restored database or a client bug): polling with
+    # it would never return anything.
+    if since is None or since < state["compacted_through"] or since > latest:
+        return AvailabilityChangesResponse(
+            changes=[], next_since=latest, resync_required=True
+        )
+    changes.sort(key=lambda change: change["seq"])
+    return AvailabilityChangesResponse(
+        changes=[AvailabilityChange(**change) for change in changes],
+        next_since=page[-1]["txid"] if page else since,
+        has_more=has_more,
+    )
+
+
+def wholeTransactions(rows: List[dict], limit: int) -> Tuple[List[dict], bool]:
+    """
+    Trims a page of log entries, read in transaction order with the given limit, to the transactions it holds in
+    full. Only the last transaction of a full page can be cut short.
+
+    Args:
+        rows (List[dict]): The entries read, each with its txid.
+        limit (int): The number of entries that was asked for.
+
+    Returns:
+        Tuple[List[dict], bool]: The entries of complete transactions, and whether more entries may follow. The
+        entries are empty when the page was filled by a single transaction.
+    """
+    if len(rows) < limit:
+        return rows, False
+    last = rows[-1]["txid"]
+    return [row for row in rows if row["txid"] != last], True
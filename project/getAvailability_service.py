@@ -1,7 +1,7 @@
 from typing import Optional
 
-import prisma
-import prisma.models
+import project.availability_cache
+import project.single_flight
 from pydantic import BaseModel
 
 
@@ -14,10 +14,17 @@ class AvailabilityCheckResponse(BaseModel):
     currentActivity: Optional[str] = None
 
 
+def _version(professionalId: int) -> int:
+    return project.availability_cache.version(professionalId)
+
+
+@project.single_flight.coalesce(version=_version)
 async def getAvailability(professionalId: int) -> AvailabilityCheckResponse:
     """
     Retrieves the current availability status of a specified professional. This endpoint will query the current state and return an availability status. Expected to be used frequently to provide real-time updates.
 
+    Concurrent calls for the same professional share one lookup, unless the status was written in between.
+
     Args:
         professionalId (int): The unique identifier for the professional whose availability is to be checked.
 
@@ -29,10 +36,8 @@ async def getAvailability(professionalId: int) -> AvailabilityCheckResponse:
         getAvailability(1)
         > AvailabilityCheckResponse(isAvailable=True, currentActivity=None)
     """
-    real_time_status = await prisma.models.RealTimeStatus.prisma().find_unique(
-        where={"professionalInfoId": professionalId}
-    )
-    if real_time_status is None:
+    real_time_status = await project.availability_cache.fetch(professionalId)
+    if not real_time_status.exists:
         return AvailabilityCheckResponse(
             isAvailable=False, currentActivity="No status available"
         )
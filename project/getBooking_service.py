@@ -4,6 +4,7 @@ from typing import Optional
 
 import prisma
 import prisma.models
+import project.db
 from pydantic import BaseModel
 
 
@@ -68,7 +69,7 @@ async def getBooking(bookingId: int) -> BookingDetailsResponse:
     Example:
         booking_details = await getBooking(5)
     """
-    appointment = await prisma.models.Appointment.prisma().find_unique(
+    appointment = await prisma.models.Appointment.prisma(project.db.reader()).find_unique(
         where={"id": bookingId}, include={"user": True, "profile": True}
     )
     if not appointment:
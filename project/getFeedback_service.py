@@ -1,13 +1,19 @@
+import asyncio
 from datetime import datetime
 
 import prisma
 import prisma.models
+import project.loaders
+from project.auth import AuthenticatedUser
 from pydantic import BaseModel
 
+# Profiles do not store a picture yet.
+DEFAULT_PROFILE_PICTURE = "default_profile.png"
+
 
 class NestedUserDetails(BaseModel):
     """
-    Details of the user including any relevant user identification.
+    Details of the user including any relevant user identification. username is the author's profile name, or their email if they have no profile.
     """
 
     userId: str
@@ -27,7 +33,9 @@ class FeedbackDetailsResponse(BaseModel):
     userDetails: NestedUserDetails
 
 
-async def getFeedback(feedbackId: str, role: str) -> FeedbackDetailsResponse:
+async def getFeedback(
+    feedbackId: str, current_user: AuthenticatedUser
+) -> FeedbackDetailsResponse:
     """
     Fetches details of a specific feedback entry by its ID. It ensures the
     requester has the right to view the feedback, either by being an
@@ -37,8 +45,8 @@ async def getFeedback(feedbackId: str, role: str) -> FeedbackDetailsResponse:
     Args:
         feedbackId (str): The unique identifier for the feedback entry,
                           used to fetch the specific feedback details.
-        role (str): The role of the individual requesting to view the feedback.
-                    This field determines permission access.
+        current_user (AuthenticatedUser): The verified caller. Admins may view any
+                    feedback, other users only feedback they wrote or received.
 
     Returns:
         FeedbackDetailsResponse: The response model returning the details of
@@ -47,40 +55,35 @@ async def getFeedback(feedbackId: str, role: str) -> FeedbackDetailsResponse:
                                  the feedback content, rating, and associated user info.
     """
     feedback = await prisma.models.Feedback.prisma().find_unique(
-        where={"id": int(feedbackId)}, include={"user": True, "profile": True}
+        where={"id": int(feedbackId)}
     )
     if feedback is None:
         raise ValueError("Feedback not found")
-    feedback_user_id = str(
-        feedback.user_id
-    )  # TODO(autogpt): Cannot access member "user_id" for type "Feedback"
-    #     Member "user_id" is unknown. reportAttributeAccessIssue
-    feedback_profile_id = str(
-        feedback.profile_id
-    )  # TODO(autogpt): Cannot access member "profile_id" for type "Feedback"
-    #     Member "profile_id" is unknown. reportAttributeAccessIssue
-    if role != "Admin" and feedback_user_id != role and (feedback_profile_id != role):
+    loaders = project.loaders.get_loaders()
+    professional_profile, author, author_profile = await asyncio.gather(
+        loaders.profile.load(feedback.profileId),
+        loaders.user.load(feedback.userId),
+        loaders.profile_by_user.load(feedback.userId),
+    )
+    if (
+        not current_user.is_admin
+        and feedback.userId != current_user.user_id
+        and (professional_profile is None or professional_profile.userId != current_user.user_id)
+    ):
         raise PermissionError("You do not have permission to view this feedback")
-    user_details = await prisma.models.User.prisma().find_unique(
-        where={"id": feedback.user_id}
-    )  # TODO(autogpt): Cannot access member "user_id" for type "Feedback"
-    #     Member "user_id" is unknown. reportAttributeAccessIssue
-    profile_pic_url = (
-        user_details.profile.profilePic
-        if user_details.profile and user_details.profile.profilePic
-        else "default_profile.png"
-    )  # TODO(autogpt): Cannot access member "profilePic" for type "Profile"
-    #     Member "profilePic" is unknown. reportAttributeAccessIssue
-    feedback_details_response = FeedbackDetailsResponse(
+    username = (
+        f"{author_profile.firstName} {author_profile.lastName}"
+        if author_profile
+        else author.email
+    )
+    return FeedbackDetailsResponse(
         id=feedbackId,
         content=feedback.content,
         rating=feedback.rating,
         createdAt=feedback.createdAt,
         userDetails=NestedUserDetails(
-            userId=feedback_user_id,
-            username=user_details.username,
-            profilePic=profile_pic_url,
+            userId=str(feedback.userId),
+            username=username,
+            profilePic=DEFAULT_PROFILE_PICTURE,
         ),
-    )  # TODO(autogpt): Cannot access member "username" for type "User"
-    #     Member "username" is unknown. reportAttributeAccessIssue
-    return feedback_details_response
+    )
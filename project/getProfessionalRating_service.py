@@ -0,0 +1,67 @@
+from typing import Dict, Optional
+
+import prisma
+import prisma.models
+import project.rating_aggregates
+from pydantic import BaseModel
+
+
+class RatingSummary(BaseModel):
+    """
+    The ratings a professional received: how many, their total and average, and how many of each star value.
+    """
+
+    professionalId: int
+    count: int
+    sum: int
+    average: Optional[float] = None
+    histogram: Dict[int, int]
+
+
+def summarize(
+    professionalId: int, aggregate: Optional[prisma.models.RatingAggregate]
+) -> RatingSummary:
+    """
+    Builds a RatingSummary from a stored aggregate; a professional without an aggregate has no ratings yet.
+
+    Args:
+        professionalId (int): The professional's Profile ID.
+        aggregate (Optional[prisma.models.RatingAggregate]): The professional's aggregate, if any.
+
+    Returns:
+        RatingSummary: The professional's rating summary.
+    """
+    stars = range(
+        project.rating_aggregates.MIN_RATING, project.rating_aggregates.MAX_RATING + 1
+    )
+    if aggregate is None or aggregate.count <= 0:
+        return RatingSummary(
+            professionalId=professionalId,
+            count=0,
+            sum=0,
+            histogram={star: 0 for star in stars},
+        )
+    return RatingSummary(
+        professionalId=professionalId,
+        count=aggregate.count,
+        sum=aggregate.sum,
+        average=round(aggregate.sum / aggregate.count, 2),
+        histogram={star: getattr(aggregate, f"rating{star}") for star in stars},
+    )
+
+
+async def getProfessionalRating(professionalId: int) -> RatingSummary:
+    """
+    Returns a professional's rating summary from their maintained aggregate, a single primary key lookup however much
+    feedback they received.
+
+    Args:
+        professionalId (int): The professional's Profile ID.
+
+    Returns:
+        RatingSummary: The ratings a professional received: how many, their total and average, and how many of each star value.
+    """
+    aggregate = await prisma.models.RatingAggregate.prisma().find_unique(
+        where={"profileId": professionalId}
+    )
+    return summarize(professionalId, aggregate)
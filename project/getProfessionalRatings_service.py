@@ -0,0 +1,38 @@
+from typing import List
+
+import project.rating_aggregates
+from project.getProfessionalRating_service import RatingSummary, summarize
+from pydantic import BaseModel
+
+MAX_BATCH_SIZE = 500
+
+
+class RatingSummaryListResponse(BaseModel):
+    """
+    The rating summaries of several professionals, in the order they were requested.
+    """
+
+    ratings: List[RatingSummary]
+
+
+async def getProfessionalRatings(professionalIds: List[int]) -> RatingSummaryListResponse:
+    """
+    Returns the rating summaries of many professionals with one query, for listing pages that show a rating next to
+    every professional.
+
+    Args:
+        professionalIds (List[int]): The professionals' Profile IDs; at most MAX_BATCH_SIZE distinct IDs.
+
+    Returns:
+        RatingSummaryListResponse: The rating summaries of several professionals, in the order they were requested.
+    """
+    professionalIds = list(dict.fromkeys(professionalIds))
+    if len(professionalIds) > MAX_BATCH_SIZE:
+        raise ValueError(f"At most {MAX_BATCH_SIZE} professionals can be requested at once")
+    aggregates = await project.rating_aggregates.get_aggregates(professionalIds)
+    return RatingSummaryListResponse(
+        ratings=[
+            summarize(professionalId, aggregates.get(professionalId))
+            for professionalId in professionalIds
+        ]
+    )
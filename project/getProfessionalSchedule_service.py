@@ -1,10 +1,32 @@
-from datetime import date, datetime, timedelta
-from typing import List, Optional
+import asyncio
+from datetime import date, datetime, time, timedelta, tzinfo
+from enum import Enum
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
 
 import prisma
+import prisma.enums
 import prisma.models
+import project.availability_template
+import project.schedule_cache
+import project.single_flight
+from project.appointment_index import APPOINTMENT_DURATION, as_utc
 from pydantic import BaseModel
 
+MAX_SCHEDULE_DAYS = 62
+
+T = TypeVar("T")
+
+
+class SlotType(Enum):
+    """
+    What occupies an interval of the schedule. Booked time takes precedence over blocked time, which takes
+    precedence over free working time.
+    """
+
+    booked = "booked"
+    blocked = "blocked"
+    free = "free"
+
 
 class ScheduleDetail(BaseModel):
     """
@@ -14,6 +36,7 @@ class ScheduleDetail(BaseModel):
     startTime: datetime
     endTime: datetime
     isBooked: bool
+    slotType: SlotType
     status: Optional[str] = None
 
 
@@ -26,6 +49,261 @@ class FetchScheduleResponse(BaseModel):
     schedules: List[ScheduleDetail]
 
 
+# Sweep events: (time, opens, slot type, appointment ID or None, appointment status or None). Closing events sort
+# before opening ones at the same instant so that back-to-back intervals do not overlap.
+SweepEvent = Tuple[datetime, bool, SlotType, Optional[int], Optional[str]]
+
+
+def appointmentBounds(appointment: prisma.models.Appointment) -> Tuple[datetime, datetime]:
+    """
+    Returns the UTC [start, end) an appointment occupies.
+    """
+    start = as_utc(appointment.time)
+    return start, start + APPOINTMENT_DURATION
+
+
+def eventBounds(event: prisma.models.CalendarEvent) -> Tuple[datetime, datetime]:
+    """
+    Returns the UTC [start, end) a calendar event blocks.
+    """
+    return as_utc(event.start), as_utc(event.end)
+
+
+def bucketByDay(
+    items: Iterable[T],
+    bounds: Callable[[T], Tuple[datetime, datetime]],
+    tz: tzinfo,
+    firstDay: date,
+    lastDay: date,
+) -> Dict[date, List[T]]:
+    """
+    Groups intervals by the local days in [firstDay, lastDay] they overlap, so that each day is merged from its own
+    intervals only. An interval crossing midnight lands in every day it touches; one ending exactly at midnight does
+    not reach the next day.
+
+    Args:
+        items (Iterable[T]): The intervals.
+        bounds (Callable[[T], Tuple[datetime, datetime]]): Returns the timezone-aware [start, end) of an item.
+        tz (tzinfo): The timezone whose days are used.
+        firstDay (date): The first day to fill.
+        lastDay (date): The last day to fill.
+
+    Returns:
+        Dict[date, List[T]]: The items overlapping each day, in input order. Days without items are absent.
+    """
+    buckets: Dict[date, List[T]] = {}
+    for item in items:
+        start, end = bounds(item)
+        if start >= end:
+            continue
+        day = max(start.astimezone(tz).date(), firstDay)
+        last = min((end - timedelta(microseconds=1)).astimezone(tz).date(), lastDay)
+        while day <= last:
+            buckets.setdefault(day, []).append(item)
+            day += timedelta(days=1)
+    return buckets
+
+
+def mergeTimeline(
+    appointments: Iterable[prisma.models.Appointment],
+    events: Iterable[prisma.models.CalendarEvent],
+    windows: Iterable[Tuple[datetime, datetime]],
+    start: datetime,
+    end: datetime,
+) -> List[ScheduleDetail]:
+    """
+    Merges appointments, calendar events and working windows into one sorted, non-overlapping timeline over
+    [start, end) with a single sweep over their boundaries. Each appointment becomes its own booked interval; blocked
+    and free time is reported only where nothing of higher precedence is scheduled. Time outside working windows
+    that is neither booked nor blocked is omitted, and so are cancelled appointments.
+
+    Args:
+        appointments (Iterable[prisma.models.Appointment]): Appointments overlapping the range.
+        events (Iterable[prisma.models.CalendarEvent]): Calendar events overlapping the range.
+        windows (Iterable[Tuple[datetime, datetime]]): Working windows overlapping the range.
+        start (datetime): Start of the range, timezone-aware.
+        end (datetime): End of the range, timezone-aware.
+
+    Returns:
+        List[ScheduleDetail]: The timeline in chronological order, in the timezone of ``start``.
+    """
+    sweep: List[SweepEvent] = []
+
+    def add(
+        interval_start: datetime,
+        interval_end: datetime,
+        slot_type: SlotType,
+        appointment_id: Optional[int] = None,
+        status: Optional[str] = None,
+    ) -> None:
+        interval_start = max(interval_start, start)
+        interval_end = min(interval_end, end)
+        if interval_start < interval_end:
+            sweep.append((interval_start, True, slot_type, appointment_id, status))
+            sweep.append((interval_end, False, slot_type, appointment_id, status))
+
+    for appointment in appointments:
+        if appointment.status == prisma.enums.Status.Cancelled:
+            continue
+        add(
+            *appointmentBounds(appointment),
+            SlotType.booked,
+            appointment.id,
+            appointment.status.name,
+        )
+    for event in events:
+        add(*eventBounds(event), SlotType.blocked)
+    for window_start, window_end in windows:
+        add(window_start, window_end, SlotType.free)
+    sweep.sort(key=lambda event: (event[0], event[1]))
+
+    tz = start.tzinfo
+    active_booked: Dict[int, Optional[str]] = {}
+    open_counts = {SlotType.blocked: 0, SlotType.free: 0}
+    timeline: List[ScheduleDetail] = []
+    # The interval being built: (slot type, appointment ID, appointment status, start).
+    current: Optional[Tuple[SlotType, Optional[int], Optional[str], datetime]] = None
+    position = 0
+    while position < len(sweep):
+        instant = sweep[position][0]
+        while position < len(sweep) and sweep[position][0] == instant:
+            _, opens, slot_type, appointment_id, status = sweep[position]
+            if slot_type is SlotType.booked:
+                if opens:
+                    active_booked[appointment_id] = status
+                else:
+                    del active_booked[appointment_id]
+            else:
+                open_counts[slot_type] += 1 if opens else -1
+            position += 1
+        if active_booked:
+            appointment_id = next(iter(active_booked))
+            label = (SlotType.booked, appointment_id, active_booked[appointment_id])
+        elif open_counts[SlotType.blocked]:
+            label = (SlotType.blocked, None, None)
+        elif open_counts[SlotType.free]:
+            label = (SlotType.free, None, None)
+        else:
+            label = None
+        if current is not None and label == current[:3]:
+            continue
+        if current is not None:
+            slot_type, _, status, segment_start = current
+            timeline.append(
+                ScheduleDetail(
+                    startTime=segment_start.astimezone(tz),
+                    endTime=instant.astimezone(tz),
+                    isBooked=slot_type is SlotType.booked,
+                    slotType=slot_type,
+                    status=status,
+                )
+            )
+        current = (*label, instant) if label is not None else None
+    return timeline
+
+
+async def loadDays(
+    profileId: int,
+    template: project.availability_template.WeeklyTemplate,
+    firstDay: date,
+    lastDay: date,
+    loaded_version: int,
+) -> Dict[date, Tuple[ScheduleDetail, ...]]:
+    """
+    Computes a professional's schedule for every local day in [firstDay, lastDay] from one appointment query and one
+    calendar event query, run concurrently, and caches each day. The rows are bucketed by day once, and each day is
+    swept over its own bucket only.
+
+    Args:
+        profileId (int): The professional's Profile ID.
+        template (project.availability_template.WeeklyTemplate): The professional's weekly working hours.
+        firstDay (date): The first local day to load.
+        lastDay (date): The last local day to load.
+        loaded_version (int): project.schedule_cache.version() taken before the template was read.
+
+    Returns:
+        Dict[date, Tuple[ScheduleDetail, ...]]: The schedule of every day in the span.
+    """
+    start = datetime.combine(firstDay, time.min, tzinfo=template.tz)
+    end = datetime.combine(lastDay + timedelta(days=1), time.min, tzinfo=template.tz)
+    appointments, events = await asyncio.gather(
+        prisma.models.Appointment.prisma().find_many(
+            where={
+                "profileId": profileId,
+                "status": {"not": prisma.enums.Status.Cancelled},
+                "time": {"gt": start - APPOINTMENT_DURATION, "lt": end},
+            },
+        ),
+        prisma.models.CalendarEvent.prisma().find_many(
+            where={
+                "calendar": {"is": {"profileId": profileId}},
+                "start": {"lt": end},
+                "end": {"gt": start},
+            },
+        ),
+    )
+    appointments_by_day = bucketByDay(
+        appointments, appointmentBounds, template.tz, firstDay, lastDay
+    )
+    events_by_day = bucketByDay(events, eventBounds, template.tz, firstDay, lastDay)
+    days: Dict[date, Tuple[ScheduleDetail, ...]] = {}
+    day = firstDay
+    while day <= lastDay:
+        day_start = datetime.combine(day, time.min, tzinfo=template.tz)
+        day_end = datetime.combine(day + timedelta(days=1), time.min, tzinfo=template.tz)
+        details = tuple(
+            mergeTimeline(
+                appointments_by_day.get(day, ()),
+                events_by_day.get(day, ()),
+                project.availability_template.working_windows(template, day_start, day_end),
+                day_start,
+                day_end,
+            )
+        )
+        project.schedule_cache.store(
+            profileId, day, day_start, day_end, details, loaded_version
+        )
+        days[day] = details
+        day += timedelta(days=1)
+    return days
+
+
+def scheduleRange(
+    template: project.availability_template.WeeklyTemplate,
+    startDate: Optional[date],
+    endDate: Optional[date],
+) -> Tuple[date, date]:
+    """
+    Resolves and validates the days a schedule request covers.
+
+    Args:
+        template (project.availability_template.WeeklyTemplate): The professional's weekly working hours, whose
+            timezone decides what today is.
+        startDate (Optional[date]): The requested first day; today in the professional's timezone if None.
+        endDate (Optional[date]): The requested last day; startDate if None.
+
+    Returns:
+        Tuple[date, date]: The first and last day, inclusive.
+
+    Raises:
+        ValueError: If the range is reversed or longer than MAX_SCHEDULE_DAYS.
+    """
+    if startDate is None:
+        startDate = datetime.now(template.tz).date()
+    if endDate is None:
+        endDate = startDate
+    if endDate < startDate:
+        raise ValueError("endDate must not be before startDate")
+    if (endDate - startDate).days >= MAX_SCHEDULE_DAYS:
+        raise ValueError(f"A schedule can span at most {MAX_SCHEDULE_DAYS} days")
+    return startDate, endDate
+
+
+def _version(professionalId: str, *args: object, **kwargs: object) -> int:
+    return project.schedule_cache.version(int(professionalId))
+
+
+@project.single_flight.coalesce(version=_version)
 async def getProfessionalSchedule(
     professionalId: str,
     startDate: Optional[date] = None,
@@ -34,6 +312,13 @@ async def getProfessionalSchedule(
     """
     Fetches the full schedule of a professional for a specific day or a range of days.
 
+    Appointments and calendar events are loaded concurrently and merged with the professional's weekly working hours
+    into one timeline of booked, blocked and free intervals. Days are the professional's local days; each computed day
+    is cached until a booking or a change to the professional's working hours in this process touches it, the route
+    observes a newer shared schedule version, or SCHEDULE_CACHE_TTL_SECONDS pass. Intervals crossing midnight are
+    split at the day boundary. Cancelled appointments do not occupy time and are left out. Concurrent
+    calls with the same arguments share one execution, unless the professional's schedule changed in between.
+
     Args:
         professionalId (str): The unique identifier of the professional whose schedule is being requested.
         startDate (Optional[date]): The start date of the period for which the schedule is requested. Defaults to today if None.
@@ -42,36 +327,31 @@ async def getProfessionalSchedule(
     Returns:
         FetchScheduleResponse: Output model showcasing the professional's schedule, including both booked appointments and available slots, associated with real-time statuses.
     """
-    if startDate is None:
-        startDate = date.today()
-    if endDate is None:
-        endDate = startDate
-    appointments = await prisma.models.Appointment.prisma().find_many(
-        where={
-            "AND": [
-                {
-                    "profile": {
-                        "professionalInfo": {"profileId": {"equals": professionalId}}
-                    }
-                },
-                {"time": {"gte": datetime.combine(startDate, datetime.min.time())}},
-                {"time": {"lte": datetime.combine(endDate, datetime.max.time())}},
-            ]
-        },
-        order={"time": "asc"},
-    )
-    schedule_details = []
-    for appointment in appointments:
-        start_time = appointment.time
-        end_time = start_time + timedelta(hours=1)
-        schedule_details.append(
-            ScheduleDetail(
-                startTime=start_time,
-                endTime=end_time,
-                isBooked=True,
-                status=appointment.status.name,
+    profileId = int(professionalId)
+    loaded_version = project.schedule_cache.version(profileId)
+    template = await project.availability_template.get_template(profileId)
+    startDate, endDate = scheduleRange(template, startDate, endDate)
+    schedule_details: List[ScheduleDetail] = []
+    missing: List[date] = []
+    cached: Dict[date, Tuple[ScheduleDetail, ...]] = {}
+    day = startDate
+    while day <= endDate:
+        details = project.schedule_cache.get(profileId, day)
+        if details is None:
+            missing.append(day)
+        else:
+            cached[day] = details
+        day += timedelta(days=1)
+    if missing:
+        cached.update(
+            await loadDays(
+                profileId, template, missing[0], missing[-1], loaded_version
             )
         )
+    day = startDate
+    while day <= endDate:
+        schedule_details.extend(cached[day])
+        day += timedelta(days=1)
     return FetchScheduleResponse(
         professionalId=professionalId, schedules=schedule_details
     )
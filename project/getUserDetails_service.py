@@ -3,6 +3,7 @@ from typing import Optional
 
 import prisma
 import prisma.models
+import project.db
 from pydantic import BaseModel
 
 
@@ -52,7 +53,7 @@ async def getUserDetails(id: str) -> UserDetailsResponse:
         response = await getUserDetails('1')
         print(response)
     """
-    user = await prisma.models.User.prisma().find_unique(
+    user = await prisma.models.User.prisma(project.db.reader()).find_unique(
         where={"id": int(id)}, include={"profile": True}
     )
     if not user:
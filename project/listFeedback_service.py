@@ -1,52 +1,235 @@
+import base64
 from datetime import datetime
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
 
-import prisma
-import prisma.models
+import project.db
+import project.fast_json
 from pydantic import BaseModel
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+EXPORT_BATCH_SIZE = 1000
+
+# Columns a caller may project, and the SQL that reads each. createdAt is read as a datetime and encoded by
+# project.fast_json in the same format as the response model.
+FEEDBACK_COLUMNS = {
+    "id": '"id"',
+    "userId": '"userId"',
+    "profileId": '"profileId"',
+    "content": '"content"',
+    "rating": '"rating"',
+    "createdAt": '"createdAt"',
+}
+
+# The keyset: newest first, ties on createdAt broken by id. The cursor keeps microseconds so that it compares exactly.
+CURSOR_COLUMNS = (
+    'to_char("createdAt", \'YYYY-MM-DD"T"HH24:MI:SS.US\') AS "_cursorCreatedAt", '
+    '"id" AS "_cursorId"'
+)
+
 
 class Feedback(BaseModel):
     """
-    This subtype describes individual feedback entries as stored in the database.
+    This subtype describes individual feedback entries as stored in the database. Fields left out of a projection are omitted.
     """
 
-    id: int
-    userId: int
-    profileId: int
-    content: str
-    rating: int
-    createdAt: datetime
+    id: Optional[int] = None
+    userId: Optional[int] = None
+    profileId: Optional[int] = None
+    content: Optional[str] = None
+    rating: Optional[int] = None
+    createdAt: Optional[datetime] = None
 
 
 class FeedbackListResponse(BaseModel):
     """
-    A list of feedback entries that have been filtered as requested, if any.
+    A page of feedback entries that have been filtered as requested, newest first. Pass next_cursor back as cursor to fetch the following page; it is None on the last page.
     """
 
     feedbacks: List[Feedback]
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(createdAt: str, feedbackId: int) -> str:
+    """
+    Packs a keyset position into an opaque cursor.
+    """
+    return base64.urlsafe_b64encode(f"{createdAt}|{feedbackId}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Unpacks a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        createdAt, feedbackId = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        datetime.fromisoformat(createdAt)
+        return createdAt, int(feedbackId)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def parse_fields(fields: Optional[str]) -> Sequence[str]:
+    """
+    Validates a comma-separated projection such as ``"id,rating"``.
+
+    Args:
+        fields (Optional[str]): The requested fields; None or empty selects every field.
+
+    Returns:
+        Sequence[str]: The selected field names, in FEEDBACK_COLUMNS order.
+
+    Raises:
+        ValueError: If an unknown field is requested.
+    """
+    if not fields:
+        return tuple(FEEDBACK_COLUMNS)
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - FEEDBACK_COLUMNS.keys()
+    if unknown:
+        raise ValueError(f"Unknown feedback fields: {', '.join(sorted(unknown))}")
+    return tuple(field for field in FEEDBACK_COLUMNS if field in requested)
+
+
+async def fetchFeedbackPage(
+    professional_id: Optional[int],
+    user_id: Optional[int],
+    fields: Sequence[str],
+    cursor: Optional[Tuple[str, int]],
+    limit: int,
+) -> List[dict]:
+    """
+    Reads one keyset page of feedback, selecting only the projected columns plus the keyset.
+
+    Args:
+        professional_id (Optional[int]): Only feedback for this professional, if given.
+        user_id (Optional[int]): Only feedback by this user, if given.
+        fields (Sequence[str]): Names from FEEDBACK_COLUMNS to select.
+        cursor (Optional[Tuple[str, int]]): The (createdAt, id) position to continue after; None starts with the newest entry.
+        limit (int): Maximum number of rows to read.
+
+    Returns:
+        List[dict]: The rows, newest first, each with the projected fields and the keyset columns.
+    """
+    conditions = []
+    arguments: list = []
+    if professional_id:
+        arguments.append(professional_id)
+        conditions.append(f'"profileId" = ${len(arguments)}')
+    if user_id:
+        arguments.append(user_id)
+        conditions.append(f'"userId" = ${len(arguments)}')
+    if cursor is not None:
+        arguments.extend(cursor)
+        conditions.append(
+            f'("createdAt", "id") < (${len(arguments) - 1}::timestamp, ${len(arguments)})'
+        )
+    arguments.append(limit)
+    columns = ", ".join(f'{FEEDBACK_COLUMNS[field]} AS "{field}"' for field in fields)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = f"""
+SELECT {columns}, {CURSOR_COLUMNS}
+FROM "Feedback"
+{where}
+ORDER BY "createdAt" DESC, "id" DESC
+LIMIT ${len(arguments)}
+"""
+    return await project.db.reader().query_raw(query, *arguments)
+
+
+def _projected(row: dict, fields: Sequence[str]) -> dict:
+    return {field: row[field] for field in fields}
 
 
 async def listFeedback(
-    professional_id: Optional[int], user_id: Optional[int]
+    professional_id: Optional[int],
+    user_id: Optional[int],
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    fields: Optional[str] = None,
 ) -> FeedbackListResponse:
     """
     Lists all feedback entries. Accessible by admins for monitoring or analysis purposes. Can be filtered by professional's ID or user's ID. Returns a list of feedback entries or an empty list if none are found.
 
+    Results are paginated on (createdAt, id), newest first, so latency and memory depend on the page size rather than on how much feedback a professional has. Only the requested fields are read from the database.
+
     Args:
         professional_id (Optional[int]): Optional filtering by Professional's ID to view feedback for a specific professional.
         user_id (Optional[int]): Optional filtering by User's ID to view feedback given by a specific user.
+        cursor (Optional[str]): The next_cursor of the previous page; None starts with the newest entry.
+        limit (int): Page size, capped at MAX_PAGE_SIZE.
+        fields (Optional[str]): Comma-separated fields to return, e.g. "id,rating"; every field if None.
 
     Returns:
-        FeedbackListResponse: A list of feedback entries that have been filtered as requested, if any.
+        FeedbackListResponse: A page of feedback entries that have been filtered as requested, and the cursor for the next page.
     """
-    query_params = {}
-    if professional_id:
-        query_params["profileId"] = professional_id
-    if user_id:
-        query_params["userId"] = user_id
-    feedback_records = await prisma.models.Feedback.prisma().find_many(
-        where=query_params
+    page = await feedbackPage(professional_id, user_id, cursor, limit, fields)
+    return FeedbackListResponse(
+        feedbacks=[Feedback(**feedback) for feedback in page["feedbacks"]],
+        next_cursor=page["next_cursor"],
     )
-    feedback_list = [Feedback(**feedback.__dict__) for feedback in feedback_records]
-    return FeedbackListResponse(feedbacks=feedback_list)
+
+
+async def feedbackPage(
+    professional_id: Optional[int],
+    user_id: Optional[int],
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    fields: Optional[str] = None,
+) -> dict:
+    """
+    Reads one page of feedback as plain data shaped like FeedbackListResponse, for routes that encode it directly
+    with project.fast_json instead of building and re-validating models. Entries hold only the projected fields.
+    Arguments are those of listFeedback.
+
+    Returns:
+        dict: The page, with feedbacks and next_cursor keys.
+    """
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    selected = parse_fields(fields)
+    position = decode_cursor(cursor) if cursor else None
+    rows = await fetchFeedbackPage(professional_id, user_id, selected, position, limit)
+    return {
+        "feedbacks": [_projected(row, selected) for row in rows],
+        "next_cursor": (
+            encode_cursor(rows[-1]["_cursorCreatedAt"], rows[-1]["_cursorId"])
+            if len(rows) == limit
+            else None
+        ),
+    }
+
+
+async def streamFeedback(
+    professional_id: Optional[int],
+    user_id: Optional[int],
+    fields: Sequence[str],
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    Streams every matching feedback entry as newline-delimited JSON, newest first. Rows are read in keyset pages of batch_size and written out as each page arrives, so memory stays flat regardless of how much feedback there is.
+
+    Args:
+        professional_id (Optional[int]): Only feedback for this professional, if given.
+        user_id (Optional[int]): Only feedback by this user, if given.
+        fields (Sequence[str]): Fields to export, as returned by parse_fields.
+        batch_size (int): Number of rows read from the database per round trip.
+
+    Yields:
+        bytes: One chunk of NDJSON lines per page, each line a Feedback object.
+    """
+    position = None
+    while True:
+        rows = await fetchFeedbackPage(
+            professional_id, user_id, fields, position, batch_size
+        )
+        if not rows:
+            return
+        yield b"".join(
+            project.fast_json.dumps(_projected(row, fields)) + b"\n" for row in rows
+        )
+        if len(rows) < batch_size:
+            return
+        position = (rows[-1]["_cursorCreatedAt"], rows[-1]["_cursorId"])
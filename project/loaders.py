@@ -0,0 +1,180 @@
+import asyncio
+from contextvars import ContextVar
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    TypeVar,
+)
+
+import prisma
+import prisma.models
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+BatchFunction = Callable[[List[K]], Awaitable[Dict[K, V]]]
+
+
+class DataLoader(Generic[K, V]):
+    """
+    Batches and caches lookups by key. Keys requested during the same event loop iteration, typically by coroutines
+    started together with asyncio.gather, are resolved by one call to the batch function, and every key is looked up
+    at most once for the lifetime of the loader. Loaders are request-scoped (see get_loaders), so the cache never
+    outlives the request that filled it.
+    """
+
+    def __init__(self, batch_function: BatchFunction):
+        self._batch_function = batch_function
+        self._results: Dict[K, asyncio.Future] = {}
+        self._queue: Dict[K, asyncio.Future] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def load(self, key: K) -> "asyncio.Future[Optional[V]]":
+        """
+        Requests one key.
+
+        Args:
+            key (K): The key to look up.
+
+        Returns:
+            asyncio.Future[Optional[V]]: Resolves to the value, or None if nothing has this key.
+        """
+        future = self._results.get(key)
+        if future is not None:
+            return future
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._results[key] = future
+        if not self._queue:
+            loop.call_soon(self._dispatch)
+        self._queue[key] = future
+        return future
+
+    async def load_many(self, keys: Iterable[K]) -> List[Optional[V]]:
+        """
+        Requests several keys in one batch.
+
+        Args:
+            keys (Iterable[K]): The keys to look up.
+
+        Returns:
+            List[Optional[V]]: The values in the order of ``keys``, None for keys that were not found.
+        """
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: K, value: Optional[V]) -> None:
+        """
+        Caches a value that was read some other way, so later loads of ``key`` need no query.
+        """
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(value)
+        self._results[key] = future
+
+    def clear(self, key: K) -> None:
+        """
+        Forgets a cached key. Call after writing the row in the same request.
+        """
+        self._results.pop(key, None)
+
+    def _dispatch(self) -> None:
+        queue, self._queue = self._queue, {}
+        task = asyncio.get_running_loop().create_task(self._resolve(queue))
+        # The loop only keeps a weak reference to tasks; hold this one until it finishes so it is not collected.
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        # A task cancelled before its first step never runs _resolve, so its finally cannot release the queue.
+        task.add_done_callback(lambda _: self._release(queue))
+
+    async def _resolve(self, queue: Dict[K, asyncio.Future]) -> None:
+        try:
+            values = await self._batch_function(list(queue))
+        except Exception as e:
+            for key, future in queue.items():
+                # Failed keys are retried by the next load rather than failing for the rest of the request.
+                if self._results.get(key) is future:
+                    del self._results[key]
+                if not future.done():
+                    future.set_exception(e)
+            return
+        else:
+            for key, future in queue.items():
+                if not future.done():
+                    future.set_result(values.get(key))
+        finally:
+            self._release(queue)
+
+    def _release(self, queue: Dict[K, asyncio.Future]) -> None:
+        # Cancellation (or any other BaseException) leaves futures pending; cancel them so the callers awaiting them
+        # are released instead of hanging, and forget them so the next load retries.
+        for key, future in queue.items():
+            if not future.done():
+                if self._results.get(key) is future:
+                    del self._results[key]
+                future.cancel()
+
+
+def _unique_lookup(model: type, field: str) -> BatchFunction:
+    async def batch(keys: List[Hashable]) -> Dict[Hashable, object]:
+        rows = await model.prisma().find_many(where={field: {"in": keys}})
+        return {getattr(row, field): row for row in rows}
+
+    return batch
+
+
+class Loaders:
+    """
+    The loaders of one request, one per model and unique lookup column.
+    """
+
+    def __init__(self):
+        self.user: DataLoader[int, prisma.models.User] = DataLoader(
+            _unique_lookup(prisma.models.User, "id")
+        )
+        self.profile: DataLoader[int, prisma.models.Profile] = DataLoader(
+            _unique_lookup(prisma.models.Profile, "id")
+        )
+        self.profile_by_user: DataLoader[int, prisma.models.Profile] = DataLoader(
+            _unique_lookup(prisma.models.Profile, "userId")
+        )
+        self.professional_info_by_profile: DataLoader[
+            int, prisma.models.ProfessionalInfo
+        ] = DataLoader(_unique_lookup(prisma.models.ProfessionalInfo, "profileId"))
+        self.real_time_status_by_professional_info: DataLoader[
+            int, prisma.models.RealTimeStatus
+        ] = DataLoader(
+            _unique_lookup(prisma.models.RealTimeStatus, "professionalInfoId")
+        )
+
+
+_loaders: ContextVar[Optional[Loaders]] = ContextVar("loaders", default=None)
+
+
+def start_request() -> Loaders:
+    """
+    Gives the current context a fresh set of loaders. Called by the HTTP middleware before the route runs.
+
+    Returns:
+        Loaders: The request's loaders.
+    """
+    loaders = Loaders()
+    _loaders.set(loaders)
+    return loaders
+
+
+def get_loaders() -> Loaders:
+    """
+    Returns the current request's loaders. Outside a request (background tasks, scripts) each call returns new
+    loaders, which still batch but do not cache across calls.
+
+    Returns:
+        Loaders: The loaders to use.
+    """
+    loaders = _loaders.get()
+    return loaders if loaders is not None else Loaders()
@@ -0,0 +1,28 @@
+import project.token_revocation
+from project.auth import AuthenticatedUser
+from pydantic import BaseModel
+
+
+class LogoutResponse(BaseModel):
+    """
+    Confirms that the presented token has been revoked.
+    """
+
+    success: bool
+    message: str
+
+
+async def logoutUser(current_user: AuthenticatedUser) -> LogoutResponse:
+    """
+    Ends the caller's session by revoking the token used for this request. Other sessions of the same user stay valid.
+
+    Args:
+        current_user (AuthenticatedUser): The verified caller.
+
+    Returns:
+        LogoutResponse: Confirms that the presented token has been revoked.
+    """
+    await project.token_revocation.revoke_token(
+        current_user.token_id, current_user.expires_at
+    )
+    return LogoutResponse(success=True, message="Logged out.")
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import os
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Iterable, List, Optional, Tuple
+
+import prisma
+import prisma.models
+import project.metrics
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_BATCH_SIZE = int(os.environ.get("NOTIFICATION_BATCH_SIZE", "500"))
+OUTBOX_FLUSH_SECONDS = float(os.environ.get("NOTIFICATION_FLUSH_SECONDS", "0.05"))
+# A batch that fails this many times in a row is retried row by row, so one bad row (for example a user deleted
+# since the notification was queued) cannot hold up the rest.
+MAX_BATCH_ATTEMPTS = 3
+
+OUTBOX_PENDING = project.metrics.Gauge(
+    "notification_outbox_pending", "Notifications queued and not yet written."
+)
+OUTBOX_BATCH_ROWS = project.metrics.Histogram(
+    "notification_outbox_batch_rows",
+    "Notifications written per create_many.",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+OUTBOX_DROPPED = project.metrics.Counter(
+    "notification_outbox_dropped_total",
+    "Notifications discarded because they could not be written.",
+)
+
+_pending: Deque[dict] = deque()
+_wakeup: Optional[asyncio.Event] = None
+_flusher: Optional[asyncio.Task] = None
+_stopping = False
+
+
+def enqueue(userId: int, message: str) -> None:
+    """
+    Queues a notification for a batched insert and returns immediately. The row is written within
+    NOTIFICATION_FLUSH_SECONDS, or sooner once NOTIFICATION_BATCH_SIZE rows are waiting. createdAt is taken now,
+    not at write time.
+
+    Args:
+        userId (int): The user to notify.
+        message (str): The notification text.
+    """
+    enqueue_many([(userId, message)])
+
+
+def enqueue_many(notifications: Iterable[Tuple[int, str]]) -> None:
+    """
+    Queues several notifications at once; see enqueue. Once stop() has been called, notifications are dropped with a
+    warning instead.
+
+    Args:
+        notifications (Iterable[Tuple[int, str]]): (userId, message) pairs.
+    """
+    if _stopping:
+        # The flusher has been stopped for shutdown and the database client is about to disconnect, so a restarted
+        # flusher could not write these either.
+        notifications = list(notifications)
+        OUTBOX_DROPPED.inc(len(notifications))
+        logger.warning("Dropping %d notifications queued after shutdown", len(notifications))
+        return
+    createdAt = datetime.now(timezone.utc)
+    for userId, message in notifications:
+        _pending.append({"userId": userId, "message": message, "createdAt": createdAt})
+    OUTBOX_PENDING.set(len(_pending))
+    start()
+    if len(_pending) >= OUTBOX_BATCH_SIZE and _wakeup is not None:
+        _wakeup.set()
+
+
+async def _write_rows_individually(batch: List[dict]) -> None:
+    for row in batch:
+        try:
+            await prisma.models.Notification.prisma().create(data=row)
+        except Exception:
+            OUTBOX_DROPPED.inc()
+            logger.exception("Dropping notification for user %s", row["userId"])
+
+
+async def flush() -> int:
+    """
+    Writes every queued notification, one create_many per NOTIFICATION_BATCH_SIZE rows.
+
+    Returns:
+        int: The number of notifications taken off the queue.
+    """
+    flushed = 0
+    while _pending:
+        batch = [_pending.popleft() for _ in range(min(OUTBOX_BATCH_SIZE, len(_pending)))]
+        for attempt in range(1, MAX_BATCH_ATTEMPTS + 1):
+            try:
+                await prisma.models.Notification.prisma().create_many(data=batch)
+                break
+            except Exception:
+                if attempt == MAX_BATCH_ATTEMPTS:
+                    logger.exception("Batched notification insert failed, writing rows one by one")
+                    await _write_rows_individually(batch)
+                else:
+                    await asyncio.sleep(0.1 * 2**attempt)
+        OUTBOX_BATCH_ROWS.observe(len(batch))
+        flushed += len(batch)
+        OUTBOX_PENDING.set(len(_pending))
+    return flushed
+
+
+async def _run() -> None:
+    while not _stopping:
+        try:
+            await asyncio.wait_for(_wakeup.wait(), OUTBOX_FLUSH_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
+        try:
+            await flush()
+        except Exception:
+            logger.exception("Failed to flush notification outbox")
+
+
+def start() -> None:
+    """
+    Starts the background flusher on the running event loop if it is not running yet. Called by the server lifespan
+    and, lazily, by the first enqueue; after stop() only the lifespan starts it again.
+    """
+    global _wakeup, _flusher, _stopping
+    if _flusher is not None and not _flusher.done():
+        return
+    _stopping = False
+    _wakeup = asyncio.Event()
+    _flusher = asyncio.get_running_loop().create_task(_run())
+
+
+async def stop() -> None:
+    """
+    Stops the flusher and writes everything still queued. Called by the server lifespan before the database client
+    disconnects, so that accepted notifications are not lost on shutdown.
+    """
+    global _flusher, _stopping
+    _stopping = True
+    if _flusher is not None:
+        _wakeup.set()
+        await _flusher
+        _flusher = None
+    await flush()
@@ -0,0 +1,135 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+import bcrypt
+import project.metrics
+
+# bcrypt releases the GIL while it works, so a thread pool gives real parallelism without the cost of pickling
+# arguments to worker processes.
+HASHING_WORKERS = int(os.environ.get("HASHING_WORKERS", str(os.cpu_count() or 1)))
+# Hashes admitted but not yet finished, across running and queued. Beyond this, callers are turned away with
+# HashingOverloadedError instead of queueing for seconds behind a login spike.
+HASHING_MAX_PENDING = int(
+    os.environ.get("HASHING_MAX_PENDING", str(HASHING_WORKERS * 8))
+)
+
+HASHING_WAIT_SECONDS = project.metrics.Histogram(
+    "password_hashing_wait_seconds",
+    "Time a bcrypt operation queued for a hashing worker.",
+    ["operation"],
+)
+HASHING_RUN_SECONDS = project.metrics.Histogram(
+    "password_hashing_run_seconds",
+    "Time a hashing worker spent in bcrypt.",
+    ["operation"],
+)
+HASHING_REJECTED = project.metrics.Counter(
+    "password_hashing_rejected_total",
+    "bcrypt operations refused because the hashing queue was full.",
+    ["operation"],
+)
+HASHING_PENDING = project.metrics.Gauge(
+    "password_hashing_pending", "bcrypt operations admitted and not yet finished."
+)
+
+
+class HashingOverloadedError(Exception):
+    """
+    Raised when the hashing queue is full. The server answers these with 503 so that clients back off and retry.
+    """
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_pending = 0
+# _pending is raised on the event loop and lowered by whichever thread finishes the job.
+_pending_lock = threading.Lock()
+
+
+def _timed(function: Callable[..., Any], *args: Any) -> Tuple[Any, float, float]:
+    started = time.perf_counter()
+    result = function(*args)
+    return result, started, time.perf_counter()
+
+
+def _finished(job: Future) -> None:
+    global _pending
+    with _pending_lock:
+        _pending -= 1
+        HASHING_PENDING.set(_pending)
+
+
+async def _run(operation: str, function: Callable[..., Any], *args: Any) -> Any:
+    global _executor, _pending
+    with _pending_lock:
+        if _pending >= HASHING_MAX_PENDING:
+            HASHING_REJECTED.inc(operation=operation)
+            raise HashingOverloadedError(
+                "Too many concurrent password operations, retry shortly"
+            )
+        _pending += 1
+        HASHING_PENDING.set(_pending)
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=HASHING_WORKERS, thread_name_prefix="bcrypt"
+        )
+    queued = time.perf_counter()
+    job = _executor.submit(_timed, function, *args)
+    # Cancelling the awaiting request (a client disconnect) does not stop a job that is already running, so the job
+    # only stops counting against HASHING_MAX_PENDING once it has actually finished or been cancelled.
+    job.add_done_callback(_finished)
+    result, started, finished = await asyncio.wrap_future(job)
+    HASHING_WAIT_SECONDS.observe(started - queued, operation=operation)
+    HASHING_RUN_SECONDS.observe(finished - started, operation=operation)
+    return result
+
+
+async def hash_password(password: str) -> str:
+    """
+    Hashes a password with a fresh salt on the hashing pool, keeping the event loop free.
+
+    Args:
+        password (str): The plain-text password.
+
+    Returns:
+        str: The bcrypt hash, ready to store in User.password.
+
+    Raises:
+        HashingOverloadedError: If the hashing queue is full.
+    """
+    hashed = await _run(
+        "hash", bcrypt.hashpw, password.encode("utf-8"), bcrypt.gensalt()
+    )
+    return hashed.decode("utf-8")
+
+
+async def verify_password(password: str, hashed: str) -> bool:
+    """
+    Checks a password against a stored bcrypt hash on the hashing pool, keeping the event loop free.
+
+    Args:
+        password (str): The plain-text password to check.
+        hashed (str): The hash stored in User.password.
+
+    Returns:
+        bool: True if the password matches.
+
+    Raises:
+        HashingOverloadedError: If the hashing queue is full.
+    """
+    return await _run(
+        "verify", bcrypt.checkpw, password.encode("utf-8"), hashed.encode("utf-8")
+    )
+
+
+def shutdown() -> None:
+    """
+    Stops the hashing workers. Called from the server lifespan on shutdown.
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,55 @@
+from typing import Dict, List
+
+import project.availability_cache
+from project.getAvailability_service import AvailabilityCheckResponse
+from pydantic import BaseModel, Field
+
+MAX_QUERY_IDS = 500
+
+
+class AvailabilityQueryRequest(BaseModel):
+    """
+    Request model listing the professionals whose availability should be returned in one call.
+    """
+
+    professionalIds: List[int] = Field(..., max_length=MAX_QUERY_IDS)
+
+
+class AvailabilityQueryResponse(BaseModel):
+    """
+    The availability status of each requested professional, keyed by professional ID.
+    """
+
+    availability: Dict[int, AvailabilityCheckResponse]
+
+
+async def queryAvailability(
+    request: AvailabilityQueryRequest,
+) -> AvailabilityQueryResponse:
+    """
+    Retrieves the current availability status of many professionals at once. Statuses are served from the availability cache where possible and all remaining professionals are loaded with a single query, instead of one request per professional.
+
+    Args:
+        request (AvailabilityQueryRequest): Request model listing the professional IDs to look up.
+
+    Returns:
+        AvailabilityQueryResponse: The availability status of each requested professional, keyed by professional ID. Professionals without a status are reported the same way getAvailability reports them.
+
+    Example:
+        response = await queryAvailability(AvailabilityQueryRequest(professionalIds=[1, 2]))
+        > AvailabilityQueryResponse(availability={1: AvailabilityCheckResponse(isAvailable=True, currentActivity=None), 2: ...})
+    """
+    statuses = await project.availability_cache.fetch_many(request.professionalIds)
+    return AvailabilityQueryResponse(
+        availability={
+            professionalId: AvailabilityCheckResponse(
+                isAvailable=status.isAvailable,
+                currentActivity=status.currentActivity,
+            )
+            if status.exists
+            else AvailabilityCheckResponse(
+                isAvailable=False, currentActivity="No status available"
+            )
+            for professionalId, status in statuses.items()
+        }
+    )
@@ -0,0 +1,152 @@
+"""
+Per-professional rating aggregates, kept current by the feedback services.
+
+Rebuild every aggregate from the Feedback table (for example after a backfill or a bulk import) with:
+    python -m project.rating_aggregates
+"""
+
+import asyncio
+import json
+from datetime import timedelta
+from typing import Dict, Iterable, Optional
+
+import prisma
+import prisma.models
+
+MIN_RATING = 1
+MAX_RATING = 5
+
+# Recomputes every aggregate in one statement and drops the aggregates of professionals without feedback. Ratings
+# outside MIN_RATING..MAX_RATING, which predate validation, are left out just as apply() leaves them out.
+REBUILD_QUERY = """
+WITH totals AS (
+    SELECT "profileId",
+           count(*)::int AS "count",
+           sum("rating")::int AS "sum",
+           count(*) FILTER (WHERE "rating" = 1)::int AS "rating1",
+           count(*) FILTER (WHERE "rating" = 2)::int AS "rating2",
+           count(*) FILTER (WHERE "rating" = 3)::int AS "rating3",
+           count(*) FILTER (WHERE "rating" = 4)::int AS "rating4",
+           count(*) FILTER (WHERE "rating" = 5)::int AS "rating5"
+    FROM "Feedback"
+    WHERE "rating" BETWEEN 1 AND 5
+    GROUP BY "profileId"
+), removed AS (
+    DELETE FROM "RatingAggregate"
+    WHERE "profileId" NOT IN (SELECT "profileId" FROM totals)
+)
+INSERT INTO "RatingAggregate"
+    ("profileId", "count", "sum", "rating1", "rating2", "rating3", "rating4", "rating5")
+SELECT "profileId", "count", "sum", "rating1", "rating2", "rating3", "rating4", "rating5"
+FROM totals
+ON CONFLICT ("profileId") DO UPDATE SET
+    "count" = EXCLUDED."count",
+    "sum" = EXCLUDED."sum",
+    "rating1" = EXCLUDED."rating1",
+    "rating2" = EXCLUDED."rating2",
+    "rating3" = EXCLUDED."rating3",
+    "rating4" = EXCLUDED."rating4",
+    "rating5" = EXCLUDED."rating5"
+"""
+
+
+def is_valid_rating(rating: Optional[int]) -> bool:
+    """
+    Whether a rating is on the accepted 1-5 scale.
+
+    Args:
+        rating (Optional[int]): The rating to check.
+
+    Returns:
+        bool: True if the rating can be stored.
+    """
+    return rating is not None and MIN_RATING <= rating <= MAX_RATING
+
+
+async def apply(
+    client: prisma.Prisma,
+    profileId: int,
+    added: Optional[int] = None,
+    removed: Optional[int] = None,
+) -> None:
+    """
+    Adjusts a professional's aggregate for one feedback write. Run it on the transaction client of that write, so the
+    aggregate and the Feedback table never disagree.
+
+    Args:
+        client (prisma.Prisma): The transaction client of the feedback write.
+        profileId (int): The professional's Profile ID.
+        added (Optional[int]): The rating of a created or updated feedback entry.
+        removed (Optional[int]): The rating of a deleted feedback entry, or the previous rating of an updated one.
+    """
+    deltas: Dict[str, int] = {"count": 0, "sum": 0}
+    if is_valid_rating(added):
+        deltas["count"] += 1
+        deltas["sum"] += added
+        deltas[f"rating{added}"] = deltas.get(f"rating{added}", 0) + 1
+    if is_valid_rating(removed):
+        deltas["count"] -= 1
+        deltas["sum"] -= removed
+        deltas[f"rating{removed}"] = deltas.get(f"rating{removed}", 0) - 1
+    deltas = {column: delta for column, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    await prisma.models.RatingAggregate.prisma(client).upsert(
+        where={"profileId": profileId},
+        data={
+            "create": {
+                "profileId": profileId,
+                **{column: max(delta, 0) for column, delta in deltas.items()},
+            },
+            "update": {
+                column: {"increment": delta} for column, delta in deltas.items()
+            },
+        },
+    )
+
+
+async def get_aggregates(
+    profileIds: Iterable[int],
+) -> Dict[int, prisma.models.RatingAggregate]:
+    """
+    Loads the aggregates of many professionals with one primary key lookup.
+
+    Args:
+        profileIds (Iterable[int]): The professionals' Profile IDs.
+
+    Returns:
+        Dict[int, prisma.models.RatingAggregate]: The aggregates found, keyed by Profile ID. Professionals without
+        feedback are absent.
+    """
+    rows = await prisma.models.RatingAggregate.prisma().find_many(
+        where={"profileId": {"in": list(profileIds)}}
+    )
+    return {row.profileId: row for row in rows}
+
+
+async def rebuild(client: prisma.Prisma) -> None:
+    """
+    Recomputes every aggregate from the Feedback table. Feedback writes are blocked while it runs, so no increment
+    made concurrently is lost.
+
+    Args:
+        client (prisma.Prisma): A connected client.
+    """
+    async with client.tx(timeout=timedelta(minutes=10)) as transaction:
+        await transaction.execute_raw('LOCK TABLE "Feedback" IN SHARE MODE')
+        await transaction.execute_raw(REBUILD_QUERY)
+
+
+async def _main() -> None:
+    client = prisma.Prisma()
+    await client.connect()
+    try:
+        await rebuild(client)
+        aggregates = await prisma.models.RatingAggregate.prisma(client).count()
+    finally:
+        await client.disconnect()
+    print(json.dumps({"aggregates": aggregates}))
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
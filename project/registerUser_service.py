@@ -1,9 +1,9 @@
 from typing import Optional
 
-import bcrypt
 import prisma
 import prisma.enums
 import prisma.models
+import project.password_hashing
 from pydantic import BaseModel
 
 
@@ -33,6 +33,9 @@ async def registerUser(
     Returns:
         UserRegistrationResponse: Responds with the outcome of the registration attempt including the newly assigned user ID if successful.
 
+    Raises:
+        HashingOverloadedError: If too many password hashes are already queued.
+
     Example:
         registerUser("John Doe", "john.doe@example.com", "s3cr3t")
         > {
@@ -41,12 +44,12 @@ async def registerUser(
             "message": "User registered successfully."
         }
     """
-    hashed_password = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
+    hashed_password = await project.password_hashing.hash_password(password)
     try:
         user = await prisma.models.User.prisma().create(
             data={
                 "email": email,
-                "password": hashed_password.decode("utf-8"),
+                "password": hashed_password,
                 "role": prisma.enums.Role.User,
                 "profile": {
                     "create": {
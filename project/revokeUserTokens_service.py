@@ -0,0 +1,33 @@
+import project.token_revocation
+from project.auth import AuthenticatedUser
+from pydantic import BaseModel
+
+
+class RevokeTokensResponse(BaseModel):
+    """
+    Indicates whether all of the user's tokens were revoked.
+    """
+
+    success: bool
+    message: str
+
+
+async def revokeUserTokens(
+    id: str, current_user: AuthenticatedUser
+) -> RevokeTokensResponse:
+    """
+    Forces a user to sign in again by revoking every token issued to them so far. Restricted to admins.
+
+    Args:
+        id (str): The unique identifier of the user whose tokens are revoked.
+        current_user (AuthenticatedUser): The verified caller; must hold the Admin role.
+
+    Returns:
+        RevokeTokensResponse: Indicates whether all of the user's tokens were revoked.
+    """
+    if not current_user.is_admin:
+        return RevokeTokensResponse(
+            success=False, message="Only admins can revoke another user's tokens."
+        )
+    await project.token_revocation.revoke_user(int(id))
+    return RevokeTokensResponse(success=True, message="All tokens revoked.")
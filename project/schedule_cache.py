@@ -0,0 +1,197 @@
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+import project.availability_template
+import project.metrics
+from project.appointment_index import APPOINTMENT_DURATION, as_utc
+from project.cache import LRUCache
+
+SCHEDULE_CACHE_HITS = project.metrics.Counter(
+    "schedule_cache_hits_total", "Professional schedule days served from the cache."
+)
+SCHEDULE_CACHE_MISSES = project.metrics.Counter(
+    "schedule_cache_misses_total", "Professional schedule days computed from the database."
+)
+
+
+SCHEDULE_CACHE_SIZE = int(os.environ.get("SCHEDULE_CACHE_SIZE", "20000"))
+# Days are also recomputed after this long, so that writes no version counts (such as calendar events written around
+# the API) show up eventually.
+TTL_SECONDS = float(os.environ.get("SCHEDULE_CACHE_TTL_SECONDS", "60"))
+
+
+class DaySchedule:
+    """
+    The computed schedule of one professional for one of their local days, together with the UTC instants that day
+    spans, so that a change can be matched against it without knowing the professional's timezone.
+    """
+
+    __slots__ = ("start", "end", "generation", "expires", "details")
+
+    def __init__(self, start: datetime, end: datetime, generation: int, details: Tuple[Any, ...]):
+        self.start = as_utc(start)
+        self.end = as_utc(end)
+        self.generation = generation
+        self.expires = time.monotonic() + TTL_SECONDS
+        self.details = details
+
+
+class _Ticks:
+    """
+    The tick at which each professional last changed in some way, for a bounded number of professionals. Ticks come
+    from one clock shared by every professional. A professional that was evicted reads as changed at the newest
+    evicted tick, which is never earlier than their real one, so at worst days that were still valid are recomputed.
+    """
+
+    def __init__(self, maxsize: int):
+        self._ticks: LRUCache[int, int] = LRUCache(maxsize, on_evict=self._evicted)
+        self._floor = 0
+
+    def _evicted(self, profileId: int, tick: int) -> None:
+        self._floor = max(self._floor, tick)
+
+    def get(self, profileId: int) -> int:
+        return self._ticks.get(profileId, self._floor)
+
+    def set(self, profileId: int, tick: int) -> None:
+        self._ticks.set(profileId, tick)
+
+
+_clock = 0
+_days: LRUCache[Tuple[int, date], DaySchedule] = LRUCache(SCHEDULE_CACHE_SIZE)
+# Set by every change to a professional, so that a load which raced with a booking is not cached.
+_versions = _Ticks(SCHEDULE_CACHE_SIZE)
+# Set when a professional's working hours change, which affects every one of their days at once: days loaded before
+# that tick are stale.
+_generations = _Ticks(SCHEDULE_CACHE_SIZE)
+# The shared schedule version each professional had when last observed, see observe().
+_observed: LRUCache[int, int] = LRUCache(SCHEDULE_CACHE_SIZE)
+
+
+def _tick() -> int:
+    global _clock
+    _clock += 1
+    return _clock
+
+
+def version(profileId: int) -> int:
+    """
+    Snapshots the professional's change counter. Take it before loading a day and pass it to store.
+
+    Args:
+        profileId (int): The professional's Profile ID.
+
+    Returns:
+        int: The current counter.
+    """
+    return _versions.get(profileId)
+
+
+def observe(profileId: int, shared_version: int) -> None:
+    """
+    Drops a professional's cached days and compiled template if their schedule changed since it was last observed,
+    which catches writes made by other processes. Call it with a version read before the schedule is computed.
+
+    Args:
+        profileId (int): The professional's Profile ID.
+        shared_version (int): project.schedule_versions.current() of the professional.
+    """
+    if _observed.get(profileId) != shared_version:
+        invalidate_professional(profileId)
+        project.availability_template.invalidate(profileId)
+        _observed.set(profileId, shared_version)
+
+
+def get(profileId: int, day: date) -> Optional[Tuple[Any, ...]]:
+    """
+    Returns a cached day schedule.
+
+    Args:
+        profileId (int): The professional's Profile ID.
+        day (date): The professional's local date.
+
+    Returns:
+        Optional[Tuple[Any, ...]]: The day's ScheduleDetail entries, or None if the day is not cached.
+    """
+    entry = _days.get((profileId, day))
+    if (
+        entry is None
+        or entry.generation < _generations.get(profileId)
+        or entry.expires <= time.monotonic()
+    ):
+        SCHEDULE_CACHE_MISSES.inc()
+        return None
+    SCHEDULE_CACHE_HITS.inc()
+    return entry.details
+
+
+def store(
+    profileId: int,
+    day: date,
+    start: datetime,
+    end: datetime,
+    details: Tuple[Any, ...],
+    loaded_version: int,
+) -> None:
+    """
+    Caches a computed day schedule unless the professional changed since ``loaded_version`` was taken.
+
+    Args:
+        profileId (int): The professional's Profile ID.
+        day (date): The professional's local date.
+        start (datetime): The start of the day, timezone-aware.
+        end (datetime): The start of the next day, timezone-aware.
+        details (Tuple[Any, ...]): The day's ScheduleDetail entries.
+        loaded_version (int): The value of version() taken before the day was loaded.
+    """
+    if loaded_version != _versions.get(profileId):
+        return
+    _days.set((profileId, day), DaySchedule(start, end, loaded_version, details))
+
+
+def invalidate_interval(profileId: int, start: datetime, end: datetime) -> None:
+    """
+    Drops the cached days of a professional that overlap [start, end).
+
+    Args:
+        profileId (int): The professional's Profile ID.
+        start (datetime): Start of the changed interval.
+        end (datetime): End of the changed interval.
+    """
+    _versions.set(profileId, _tick())
+    start, end = as_utc(start), as_utc(end)
+    # A local date is never more than a day away from the UTC date of the same instant.
+    day = start.date() - timedelta(days=1)
+    last_day = end.date() + timedelta(days=1)
+    while day <= last_day:
+        entry = _days.get((profileId, day))
+        if entry is not None and entry.start < end and start < entry.end:
+            _days.invalidate((profileId, day))
+        day += timedelta(days=1)
+
+
+def invalidate_appointment(profileId: int, *starts: Optional[datetime]) -> None:
+    """
+    Drops the cached days touched by an appointment. Pass both the old and the new start of a moved appointment.
+
+    Args:
+        profileId (int): The professional's Profile ID.
+        *starts (Optional[datetime]): The appointment's start times; None entries are ignored.
+    """
+    for start in starts:
+        if start is not None:
+            invalidate_interval(profileId, start, as_utc(start) + APPOINTMENT_DURATION)
+
+
+def invalidate_professional(profileId: int) -> None:
+    """
+    Drops every cached day of a professional. Call after their working hours change.
+
+    Args:
+        profileId (int): The professional's Profile ID.
+    """
+    tick = _tick()
+    _versions.set(profileId, tick)
+    _generations.set(profileId, tick)
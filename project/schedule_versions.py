@@ -0,0 +1,50 @@
+"""
+Per-professional schedule versions, shared by every process through the ScheduleVersion table.
+"""
+
+from typing import Optional
+
+import prisma
+
+# Taking the row lock is the point: concurrent writers for one professional queue on it until the bumping transaction
+# ends, in every process.
+BUMP_QUERY = """
+INSERT INTO "ScheduleVersion" ("profileId", "version")
+VALUES ($1, 1)
+ON CONFLICT ("profileId") DO UPDATE SET "version" = "ScheduleVersion"."version" + 1
+"""
+
+VERSION_QUERY = """
+SELECT coalesce((SELECT "version" FROM "ScheduleVersion" WHERE "profileId" = $1), 0) AS "version"
+"""
+
+
+async def bump(client: prisma.Prisma, *profileIds: Optional[int]) -> None:
+    """
+    Marks the schedules of the given professionals as changed. Run it on the transaction client of a write to their
+    appointments or working hours, before the write: it also holds each professional's version row locked until the
+    transaction ends, so that writes to one professional's schedule are serialized across processes. The rows are
+    locked in ID order so that two writers touching the same pair of professionals cannot deadlock.
+
+    Args:
+        client (prisma.Prisma): The transaction client of the write.
+        *profileIds (Optional[int]): The professionals' Profile IDs; None entries are ignored.
+    """
+    for profileId in sorted({profileId for profileId in profileIds if profileId is not None}):
+        await client.execute_raw(BUMP_QUERY, profileId)
+
+
+async def current(client: prisma.Prisma, profileId: int) -> int:
+    """
+    Returns a professional's schedule version, which grows with every committed write to their appointments or working
+    hours made through the API, in any process.
+
+    Args:
+        client (prisma.Prisma): The database the caller is about to read the schedule from.
+        profileId (int): The professional's Profile ID.
+
+    Returns:
+        int: The version; 0 if their schedule was never written.
+    """
+    row = (await client.query_raw(VERSION_QUERY, profileId))[0]
+    return int(row["version"])
@@ -0,0 +1,201 @@
+import asyncio
+import heapq
+import itertools
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import prisma
+import prisma.enums
+import prisma.models
+import project.availability_template
+from project.appointment_index import APPOINTMENT_DURATION, as_utc
+from pydantic import BaseModel
+
+MAX_SLOT_COUNT = 100
+INITIAL_HORIZON = timedelta(days=1)
+MAX_HORIZON = timedelta(days=28)
+SLOT_STEP = timedelta(minutes=project.availability_template.SLOT_MINUTES)
+
+Interval = Tuple[datetime, datetime]
+
+
+class FreeSlot(BaseModel):
+    """
+    An open appointment slot with a specific professional.
+    """
+
+    professionalId: int
+    startTime: datetime
+    endTime: datetime
+
+
+class FreeSlotSearchResponse(BaseModel):
+    """
+    The earliest open slots across all professionals, in chronological order.
+    """
+
+    slots: List[FreeSlot]
+
+
+async def loadBusyIntervals(start: datetime, end: datetime) -> Dict[int, List[Interval]]:
+    """
+    Loads every non-cancelled appointment and calendar event that can overlap a slot starting in [start, end), with
+    both queries in flight at once. A slot starting just before ``end`` runs until almost ``end`` plus
+    APPOINTMENT_DURATION, so intervals are loaded up to that point.
+
+    Args:
+        start (datetime): Start of the search window.
+        end (datetime): End of the search window.
+
+    Returns:
+        Dict[int, List[Interval]]: Busy intervals sorted by start, keyed by the professional's Profile ID.
+    """
+    last_slot_end = end + APPOINTMENT_DURATION
+    appointments, events = await asyncio.gather(
+        prisma.models.Appointment.prisma().find_many(
+            where={
+                "status": {"not": prisma.enums.Status.Cancelled},
+                "time": {"gt": start - APPOINTMENT_DURATION, "lt": last_slot_end},
+            }
+        ),
+        prisma.models.CalendarEvent.prisma().find_many(
+            where={"start": {"lt": last_slot_end}, "end": {"gt": start}},
+            include={"calendar": True},
+        ),
+    )
+    busy: Dict[int, List[Interval]] = defaultdict(list)
+    for appointment in appointments:
+        appointment_start = as_utc(appointment.time)
+        busy[appointment.profileId].append(
+            (appointment_start, appointment_start + APPOINTMENT_DURATION)
+        )
+    for event in events:
+        if event.calendar is not None:
+            busy[event.calendar.profileId].append((as_utc(event.start), as_utc(event.end)))
+    for intervals in busy.values():
+        intervals.sort()
+    return busy
+
+
+def professionalFreeSlots(
+    profileId: int,
+    template: project.availability_template.WeeklyTemplate,
+    busy: List[Interval],
+    start: datetime,
+    end: datetime,
+) -> Iterator[Tuple[datetime, int, datetime]]:
+    """
+    Lazily yields one professional's free slots starting in [start, end), in chronological order. A slot must lie
+    inside a working window and must not overlap an appointment or calendar event.
+
+    Yields:
+        Tuple[datetime, int, datetime]: (slot start, Profile ID, slot end), ordered so that generators merge by time.
+    """
+    busy_position = 0
+    for window_start, window_end in project.availability_template.working_windows(
+        template, start, end
+    ):
+        if window_end <= start:
+            continue
+        candidate = window_start
+        if candidate < start:
+            candidate += -((window_start - start) // SLOT_STEP) * SLOT_STEP
+        while candidate < end and candidate + APPOINTMENT_DURATION <= window_end:
+            candidate_end = candidate + APPOINTMENT_DURATION
+            while busy_position < len(busy) and busy[busy_position][1] <= candidate:
+                busy_position += 1
+            blocked_until = None
+            position = busy_position
+            while position < len(busy) and busy[position][0] < candidate_end:
+                busy_end = busy[position][1]
+                if busy_end > candidate and (blocked_until is None or busy_end > blocked_until):
+                    blocked_until = busy_end
+                position += 1
+            if blocked_until is None:
+                yield (candidate, profileId, candidate_end)
+                candidate += SLOT_STEP
+            else:
+                # Jump to the first slot boundary after the blocking interval.
+                candidate += -((candidate - blocked_until) // SLOT_STEP) * SLOT_STEP
+
+
+def sharedFreeSlots(
+    profileIds: List[int],
+    template: project.availability_template.WeeklyTemplate,
+    start: datetime,
+    end: datetime,
+) -> Iterator[Tuple[datetime, int, datetime]]:
+    """
+    Free slots of several professionals who share working hours and have nothing booked in the window: their slots
+    are identical, so the slot stream is computed once and repeated for each of them.
+    """
+    for slot_start, _, slot_end in professionalFreeSlots(
+        profileIds[0], template, [], start, end
+    ):
+        for profileId in profileIds:
+            yield (slot_start, profileId, slot_end)
+
+
+async def searchFreeSlots(
+    count: int = 10, after: Optional[datetime] = None
+) -> FreeSlotSearchResponse:
+    """
+    Finds the next ``count`` open slots with any professional. Each professional's compiled weekly template is
+    combined with their non-cancelled appointments and calendar events, and the per-professional slot streams are
+    merged with a heap so only the slots that end up in the answer are materialised.
+
+    The search starts with a one-day window and doubles it, up to MAX_HORIZON, only while too few slots were found,
+    so busy intervals are loaded no further ahead than needed.
+
+    Args:
+        count (int): Number of slots to return, at most MAX_SLOT_COUNT.
+        after (Optional[datetime]): Earliest slot start; defaults to now.
+
+    Returns:
+        FreeSlotSearchResponse: The earliest open slots across all professionals, in chronological order.
+
+    Example:
+        response = await searchFreeSlots(10)
+        print(response.slots[0].professionalId, response.slots[0].startTime)
+    """
+    count = max(1, min(count, MAX_SLOT_COUNT))
+    now = datetime.now(timezone.utc)
+    start = max(as_utc(after), now) if after is not None else now
+    professionals = await prisma.get_client().query_raw(
+        'SELECT "profileId" FROM "ProfessionalInfo"'
+    )
+    templates = await project.availability_template.get_templates(
+        row["profileId"] for row in professionals
+    )
+    templates = {
+        profileId: template for profileId, template in templates.items() if template
+    }
+    horizon = INITIAL_HORIZON
+    while True:
+        end = start + horizon
+        busy = await loadBusyIntervals(start, end)
+        streams = []
+        unbooked: Dict[tuple, List[int]] = defaultdict(list)
+        for profileId, template in templates.items():
+            if profileId in busy:
+                streams.append(
+                    professionalFreeSlots(profileId, template, busy[profileId], start, end)
+                )
+            else:
+                unbooked[(template.days, template.tz)].append(profileId)
+        for profileIds in unbooked.values():
+            profileIds.sort()
+            streams.append(
+                sharedFreeSlots(profileIds, templates[profileIds[0]], start, end)
+            )
+        merged = heapq.merge(*streams)
+        found = list(itertools.islice(merged, count))
+        if len(found) >= count or horizon >= MAX_HORIZON:
+            return FreeSlotSearchResponse(
+                slots=[
+                    FreeSlot(professionalId=profileId, startTime=slot_start, endTime=slot_end)
+                    for slot_start, profileId, slot_end in found
+                ]
+            )
+        horizon = min(horizon * 2, MAX_HORIZON)
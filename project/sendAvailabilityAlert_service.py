@@ -1,7 +1,17 @@
+import asyncio
+
 import prisma
 import prisma.models
+import project.availability_changes
+import project.availability_events
+import project.loaders
+import project.notification_outbox
 from pydantic import BaseModel
 
+LOCK_STATUS_QUERY = """
+SELECT "isAvailable", "currentActivity" FROM "RealTimeStatus" WHERE "id" = $1 FOR UPDATE
+"""
+
 
 class NotificationAvailabilityResponseModel(BaseModel):
     """
@@ -29,35 +39,69 @@ async def sendAvailabilityAlert(
     Returns:
     NotificationAvailabilityResponseModel: Response model confirming that a notification has been sent successfully.
     """
-    user = await prisma.models.User.prisma().find_unique(
-        where={"id": userId}, include={"profile": True}
+    loaders = project.loaders.get_loaders()
+    # Both profiles are looked up by user ID, so they are read with one query.
+    user, user_profile, professional_profile = await asyncio.gather(
+        loaders.user.load(userId),
+        loaders.profile_by_user.load(userId),
+        loaders.profile_by_user.load(professionalId),
     )
-    professional_info = await prisma.models.ProfessionalInfo.prisma().find_first(
-        where={"profile": {"userId": professionalId}}
+    professional_info = (
+        await loaders.professional_info_by_profile.load(professional_profile.id)
+        if professional_profile
+        else None
     )
     if user is None or professional_info is None:
         return NotificationAvailabilityResponseModel(
             message="Notification failed: User or professional not found.",
             status="failed",
         )
-    if user.profile is None:
+    if user_profile is None:
         return NotificationAvailabilityResponseModel(
             message="Notification failed: User profile not found.", status="failed"
         )
-    real_time_status = await prisma.models.RealTimeStatus.prisma().find_unique(
-        where={"professionalInfoId": professional_info.id}
+    real_time_status = await loaders.real_time_status_by_professional_info.load(
+        professional_info.id
     )
+    watcher_alerted = False
     if real_time_status and real_time_status.isAvailable != newAvailability:
-        await prisma.models.RealTimeStatus.prisma().update(
-            where={"id": real_time_status.id}, data={"isAvailable": newAvailability}
-        )
-    available_text = "available" if newAvailability else "not available"
-    message = (
-        f"{user.profile.firstName} {user.profile.lastName} is now {available_text}."
-    )
-    await prisma.models.Notification.prisma().create(
-        data={"userId": userId, "message": message}
-    )
+        updated_status = None
+        async with prisma.get_client().tx() as transaction:
+            # The loader's read was taken outside the transaction, so the decision is made again on the locked row:
+            # the change log must only record states that were actually written.
+            locked = await transaction.query_raw(LOCK_STATUS_QUERY, real_time_status.id)
+            if locked and locked[0]["isAvailable"] != newAvailability:
+                updated_status = await prisma.models.RealTimeStatus.prisma(
+                    transaction
+                ).update(
+                    where={"id": real_time_status.id},
+                    data={"isAvailable": newAvailability},
+                )
+                await project.availability_changes.record(
+                    transaction,
+                    professional_info.id,
+                    updated_status.isAvailable,
+                    updated_status.currentActivity,
+                )
+        loaders.real_time_status_by_professional_info.clear(professional_info.id)
+        if updated_status is not None:
+            await project.availability_events.status_changed(
+                professional_info.id,
+                updated_status.isAvailable,
+                updated_status.currentActivity,
+                locked[0]["isAvailable"],
+            )
+            # The change is fanned out to every watcher of the professional, so a watching user already gets it.
+            watcher_alerted = (
+                await prisma.models.ProfessionalWatch.prisma().find_first(
+                    where={"userId": userId, "profileId": professional_profile.id}
+                )
+                is not None
+            )
+    if not watcher_alerted:
+        available_text = "available" if newAvailability else "not available"
+        message = f"{professional_profile.firstName} {professional_profile.lastName} is now {available_text}."
+        project.notification_outbox.enqueue(userId, message)
     return NotificationAvailabilityResponseModel(
         message="Notification sent successfully.", status="success"
     )
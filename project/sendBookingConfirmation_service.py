@@ -1,5 +1,6 @@
 import prisma
 import prisma.models
+import project.notification_outbox
 from pydantic import BaseModel
 
 
@@ -44,7 +45,5 @@ async def sendBookingConfirmation(
     professional_name = booking.profile.firstName + " " + booking.profile.lastName
     booking_datetime = booking.time.strftime("%Y-%m-%d at %H:%M")
     message = f"Booking confirmed! Your appointment with {professional_name} is scheduled for {booking_datetime}."
-    await prisma.models.Notification.prisma().create(
-        data={"userId": user_id, "message": message}
-    )
+    project.notification_outbox.enqueue(user_id, message)
     return BookingNotificationResponse(success=True, message=message)
@@ -1,12 +1,18 @@
+import asyncio
 import logging
+import math
+import time
 from contextlib import asynccontextmanager
-from datetime import datetime
-from typing import (
-    date,
-)  # TODO(autogpt): "date" is unknown import symbol. reportAttributeAccessIssue
+from datetime import date, datetime
 from typing import List, Optional
 
+import project.auth
 import project.authenticateUser_service
+import project.availability_alerts
+import project.availability_cache
+import project.availability_changes
+import project.availability_stream
+import project.availability_template
 import project.bookAppointment_service
 import project.bulkUpdateAvailability_service
 import project.cancelAppointment_service
@@ -14,40 +20,106 @@ import project.checkAllAvailability_service
 import project.checkAvailability_service
 import project.createBooking_service
 import project.createFeedback_service
+import project.db
 import project.deleteAvailability_service
 import project.deleteBooking_service
 import project.deleteFeedback_service
 import project.deleteUser_service
+import project.etags
+import project.fast_json
 import project.getAvailability_service
+import project.getAvailabilityChanges_service
 import project.getBooking_service
 import project.getFeedback_service
+import project.getProfessionalRating_service
+import project.getProfessionalRatings_service
 import project.getProfessionalSchedule_service
 import project.getUserDetails_service
 import project.listFeedback_service
+import project.loaders
+import project.logoutUser_service
+import project.metrics
+import project.notification_outbox
+import project.password_hashing
+import project.queryAvailability_service
 import project.registerUser_service
+import project.revokeUserTokens_service
+import project.schedule_cache
+import project.schedule_versions
+import project.searchFreeSlots_service
 import project.sendAvailabilityAlert_service
 import project.sendBookingConfirmation_service
 import project.setAvailability_service
+import project.token_revocation
+import project.unwatchProfessional_service
 import project.updateAppointment_service
 import project.updateAvailability_service
 import project.updateBooking_service
 import project.updateFeedback_service
 import project.updateUserRole_service
-from fastapi import FastAPI
+import project.watchProfessional_service
+from fastapi import Depends, FastAPI, Header, Query, Request
 from fastapi.encoders import jsonable_encoder
-from fastapi.responses import Response
-from prisma import Prisma
+from fastapi.responses import Response, StreamingResponse
+from project.cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
-db_client = Prisma(auto_register=True)
+db_client = project.db.db_client
+
+# Requests with these methods never write, so they do not pin the client to the primary.
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+READ_YOUR_WRITES_COOKIE = "read_primary_until"
+# When each recently mutating user may read from the replica again, keyed by the user ID of their bearer token. API
+# clients rarely keep cookies, but they send their token on every request.
+_primary_reads_until: LRUCache[int, float] = LRUCache(10000)
+
+HTTP_REQUEST_SECONDS = project.metrics.Histogram(
+    "http_request_duration_seconds",
+    "Time to produce a response, by route template.",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DB_QUERIES = project.metrics.Histogram(
+    "http_request_db_queries",
+    "Prisma queries issued per request, by route template. High counts point at N+1 access patterns.",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 500),
+)
+HTTP_REQUEST_DB_SECONDS = project.metrics.Histogram(
+    "http_request_db_seconds",
+    "Time spent in the query engine per request, by route template.",
+    ["method", "route"],
+)
+HTTP_REQUEST_POOL_WAIT_SECONDS = project.metrics.Histogram(
+    "http_request_db_pool_wait_seconds",
+    "Time spent waiting for database connections per request, by route template.",
+    ["method", "route"],
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await db_client.connect()
+    await project.token_revocation.rebuild()
+    revocation_refresher = asyncio.create_task(
+        project.token_revocation.run_refresher()
+    )
+    project.notification_outbox.start()
+    replica_monitor = asyncio.create_task(project.db.monitor_replica())
+    change_compactor = asyncio.create_task(
+        project.availability_changes.run_compactor()
+    )
+    cache_follower = asyncio.create_task(project.availability_cache.run_follower())
     yield
+    cache_follower.cancel()
+    change_compactor.cancel()
+    replica_monitor.cancel()
+    revocation_refresher.cancel()
+    await project.availability_alerts.drain()
+    await project.notification_outbox.stop()
+    await project.db.disconnect_replica()
     await db_client.disconnect()
+    project.password_hashing.shutdown()
 
 
 app = FastAPI(
@@ -57,20 +129,99 @@ app = FastAPI(
 )
 
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    stats = project.db.start_request()
+    project.loaders.start_request()
+    started = time.perf_counter()
+    status = "500"
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        # Label by the matched route template, not the raw path, to keep the number of series bounded.
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=path,
+            status=status,
+        )
+        HTTP_REQUEST_DB_QUERIES.observe(stats.queries, method=request.method, route=path)
+        HTTP_REQUEST_DB_SECONDS.observe(stats.db_seconds, method=request.method, route=path)
+        HTTP_REQUEST_POOL_WAIT_SECONDS.observe(
+            stats.pool_wait_seconds, method=request.method, route=path
+        )
+
+
+def _bearer_user_id(request: Request) -> Optional[int]:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        # Verified claims are cached, so this costs a hash and a lookup for a token seen before.
+        return project.auth.verify_token(token).user_id
+    except project.auth.AuthenticationError:
+        return None
+
+
+@app.middleware("http")
+async def route_reads(request: Request, call_next):
+    # Mutating requests, and any request within READ_YOUR_WRITES_SECONDS of the same client's last one, read from the
+    # primary so that a client always sees its own writes despite replication lag. A client is recognised by the
+    # user of its bearer token or, without one, by a cookie.
+    mutating = request.method not in SAFE_METHODS
+    now = time.time()
+    user_id = _bearer_user_id(request) if project.db.replica_client is not None else None
+    try:
+        recent_write = float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0)) > now
+    except ValueError:
+        recent_write = False
+    if user_id is not None and _primary_reads_until.get(user_id, 0) > now:
+        recent_write = True
+    if mutating or recent_write:
+        project.db.read_from_primary()
+    response = await call_next(request)
+    if mutating and project.db.replica_client is not None:
+        until = time.time() + project.db.READ_YOUR_WRITES_SECONDS
+        if user_id is not None:
+            _primary_reads_until.set(user_id, until)
+        response.set_cookie(
+            READ_YOUR_WRITES_COOKIE,
+            f"{until:.3f}",
+            max_age=math.ceil(project.db.READ_YOUR_WRITES_SECONDS),
+            httponly=True,
+            samesite="lax",
+        )
+    return response
+
+
+@app.get("/metrics", include_in_schema=False)
+async def api_get_metrics() -> Response:
+    """
+    Exposes request latency, per-request query counts, per-query latency by model and action, and connection pool
+    wait in the Prometheus text format.
+    """
+    return Response(
+        content=project.metrics.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 @app.post(
-    "/availability/{professionalId}",
-    response_model=project.setAvailability_service.ProfessionalAvailabilityUpdateResponse,
+    "/availability/query",
+    response_model=project.queryAvailability_service.AvailabilityQueryResponse,
 )
-async def api_post_setAvailability(
-    professionalId: str, isAvailable: bool, currentActivity: Optional[str]
-) -> project.setAvailability_service.ProfessionalAvailabilityUpdateResponse | Response:
+async def api_post_queryAvailability(
+    request: project.queryAvailability_service.AvailabilityQueryRequest,
+) -> project.queryAvailability_service.AvailabilityQueryResponse | Response:
     """
-    Sets or updates the availability status of a professional. This will not only update the module's internal state but also trigger an interaction with the Calendar Module to update the professional's schedule.
+    Retrieves the current availability status of many professionals in one call, answered from the availability cache and a single database query. Intended for directory pages that show dozens of professionals at once.
     """
     try:
-        res = project.setAvailability_service.setAvailability(
-            professionalId, isAvailable, currentActivity
-        )
+        res = await project.queryAvailability_service.queryAvailability(request)
         return res
     except Exception as e:
         logger.exception("Error processing request")
@@ -182,19 +333,126 @@ async def api_delete_deleteAvailability(
         )
 
 
+@app.get("/availability/stream")
+async def api_get_streamAvailability(
+    professionalId: Optional[int] = None,
+) -> Response:
+    """
+    Streams real-time availability changes as Server-Sent Events, replacing polling of GET /availability and GET /availability/{professionalId}. Subscribe to a single professional by passing professionalId, or omit it to receive changes for every professional.
+    """
+    try:
+        initial = None
+        if professionalId is not None:
+            status = await project.availability_cache.fetch(professionalId)
+            initial = project.availability_stream.AvailabilityDelta(
+                professionalInfoId=professionalId,
+                isAvailable=status.isAvailable,
+                currentActivity=status.currentActivity,
+                removed=not status.exists,
+            )
+        return StreamingResponse(
+            project.availability_stream.event_stream(professionalId, initial),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/availability/changes",
+    response_model=project.getAvailabilityChanges_service.AvailabilityChangesResponse,
+)
+async def api_get_getAvailabilityChanges(
+    since: Optional[int] = None,
+    limit: int = project.getAvailabilityChanges_service.DEFAULT_PAGE_SIZE,
+) -> project.getAvailabilityChanges_service.AvailabilityChangesResponse | Response:
+    """
+    Returns only the availability changes made after since, for clients that mirror the availability of every professional. Start without since, load GET /availability in full, then poll with the returned next_since; whenever resync_required is true, load GET /availability again and continue from the new next_since.
+    """
+    try:
+        res = await project.getAvailabilityChanges_service.getAvailabilityChanges(
+            since, limit
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get("/availability/export")
+async def api_get_exportAllAvailability(
+    batch_size: int = project.checkAllAvailability_service.DEFAULT_PAGE_SIZE,
+) -> Response:
+    """
+    Streams the availability status of every professional as newline-delimited JSON, reading the table in keyset pages so that memory stays flat for any number of professionals.
+    """
+    try:
+        batch_size = min(
+            max(batch_size, 1), project.checkAllAvailability_service.MAX_PAGE_SIZE
+        )
+        return StreamingResponse(
+            project.checkAllAvailability_service.streamAllAvailability(batch_size),
+            media_type="application/x-ndjson",
+        )
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
 @app.get(
     "/availability",
     response_model=project.checkAllAvailability_service.FetchAvailabilityResponse,
 )
 async def api_get_checkAllAvailability(
-    request: project.checkAllAvailability_service.FetchAvailabilityRequest,
+    after_id: Optional[int] = None,
+    limit: int = Query(
+        project.checkAllAvailability_service.DEFAULT_PAGE_SIZE,
+        ge=1,
+        le=project.checkAllAvailability_service.MAX_PAGE_SIZE,
+    ),
+    if_none_match: Optional[str] = Header(None),
 ) -> project.checkAllAvailability_service.FetchAvailabilityResponse | Response:
     """
-    Fetches the availability status of all professionals currently registered in the system. Enables administrative or collective views on professional availability.
+    Fetches the availability status of all professionals currently registered in the system. Enables administrative or collective views on professional availability. Results are paginated: pass next_after_id from the previous page as after_id. Responses carry an ETag; send it back in If-None-Match to get 304 Not Modified while no professional's availability has changed.
     """
     try:
-        res = await project.checkAllAvailability_service.checkAllAvailability(request)
-        return res
+        # The version is read from the database the page will be read from, and before it, so that the tag is never
+        # newer than the body. Once the primary has been asked, the page must not come from a lagging replica.
+        client = project.db.reader()
+        if client is db_client:
+            project.db.read_from_primary()
+        etag = project.etags.availability_list_etag(
+            await project.availability_changes.log_version(client)
+        )
+        if project.etags.matches(if_none_match, etag):
+            return project.etags.not_modified(etag, "/availability")
+        request = project.checkAllAvailability_service.FetchAvailabilityRequest(
+            after_id=after_id, limit=limit
+        )
+        res = await project.checkAllAvailability_service.availabilityPage(request)
+        return project.fast_json.FastJSONResponse(
+            res, headers=project.etags.headers(etag)
+        )
     except Exception as e:
         logger.exception("Error processing request")
         res = dict()
@@ -212,12 +470,23 @@ async def api_get_checkAllAvailability(
 )
 async def api_get_getAvailability(
     professionalId: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
 ) -> project.getAvailability_service.AvailabilityCheckResponse | Response:
     """
-    Retrieves the current availability status of a specified professional. This endpoint will query the current state and return an availability status. Expected to be used frequently to provide real-time updates.
+    Retrieves the current availability status of a specified professional. This endpoint will query the current state and return an availability status. Expected to be used frequently to provide real-time updates. Responses carry an ETag; send it back in If-None-Match to get 304 Not Modified while the status is unchanged.
     """
     try:
+        # Tagged by the cached status itself: the change log follower drops entries written by other processes, so a
+        # poll answered from the cache costs no database round trip.
+        status = await project.availability_cache.fetch(professionalId)
+        etag = project.etags.availability_etag(
+            professionalId, project.availability_cache.status_version(status)
+        )
+        if project.etags.matches(if_none_match, etag):
+            return project.etags.not_modified(etag, "/availability/{professionalId}")
         res = await project.getAvailability_service.getAvailability(professionalId)
+        response.headers.update(project.etags.headers(etag))
         return res
     except Exception as e:
         logger.exception("Error processing request")
@@ -253,16 +522,56 @@ async def api_get_getUserDetails(
         )
 
 
-@app.get("/feedback", response_model=project.listFeedback_service.FeedbackListResponse)
+@app.get(
+    "/feedback",
+    response_model=project.listFeedback_service.FeedbackListResponse,
+    response_model_exclude_unset=True,
+)
 async def api_get_listFeedback(
-    professional_id: Optional[int], user_id: Optional[int]
+    professional_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = project.listFeedback_service.DEFAULT_PAGE_SIZE,
+    fields: Optional[str] = None,
 ) -> project.listFeedback_service.FeedbackListResponse | Response:
     """
-    Lists all feedback entries. Accessible by admins for monitoring or analysis purposes. Can be filtered by professional's ID or user's ID. Returns a list of feedback entries or an empty list if none are found.
+    Lists all feedback entries. Accessible by admins for monitoring or analysis purposes. Can be filtered by professional's ID or user's ID. Returns a list of feedback entries or an empty list if none are found. Entries are returned newest first in pages of at most limit; pass next_cursor back as cursor for the next page, and fields (e.g. "id,rating") to return only some fields.
     """
     try:
-        res = await project.listFeedback_service.listFeedback(professional_id, user_id)
-        return res
+        res = await project.listFeedback_service.feedbackPage(
+            professional_id, user_id, cursor, limit, fields
+        )
+        return project.fast_json.FastJSONResponse(res)
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get("/feedback/export")
+async def api_get_exportFeedback(
+    professional_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    fields: Optional[str] = None,
+    batch_size: int = project.listFeedback_service.EXPORT_BATCH_SIZE,
+) -> Response:
+    """
+    Streams every matching feedback entry as newline-delimited JSON, newest first, reading the table in keyset pages so that memory stays flat however much feedback there is.
+    """
+    try:
+        selected = project.listFeedback_service.parse_fields(fields)
+        batch_size = min(max(batch_size, 1), project.listFeedback_service.MAX_PAGE_SIZE)
+        return StreamingResponse(
+            project.listFeedback_service.streamFeedback(
+                professional_id, user_id, selected, batch_size
+            ),
+            media_type="application/x-ndjson",
+        )
     except Exception as e:
         logger.exception("Error processing request")
         res = dict()
@@ -276,14 +585,18 @@ async def api_get_listFeedback(
 
 @app.delete("/users/{id}", response_model=project.deleteUser_service.DeleteUserResponse)
 async def api_delete_deleteUser(
-    confirmation: bool, id: str, admin_user_id: str, token: str
+    confirmation: bool,
+    id: str,
+    current_user: project.auth.AuthenticatedUser = Depends(
+        project.auth.get_current_user
+    ),
 ) -> project.deleteUser_service.DeleteUserResponse | Response:
     """
     This endpoint provides a mechanism for removing a user from the system database. It is restricted to admins and requires a confirmation step through their authenticated session before proceeding with deletion.
     """
     try:
         res = await project.deleteUser_service.deleteUser(
-            confirmation, id, admin_user_id, token
+            id, confirmation, current_user
         )
         return res
     except Exception as e:
@@ -327,12 +640,17 @@ async def api_get_getBooking(
 )
 async def api_delete_deleteFeedback(
     feedbackId: int,
+    current_user: project.auth.AuthenticatedUser = Depends(
+        project.auth.get_current_user
+    ),
 ) -> project.deleteFeedback_service.DeleteFeedbackResponse | Response:
     """
     Removes a feedback entry identified by its ID. Restricted to the user who posted the feedback or an admin. The route verifies the user's identity and permission, then deletes the feedback, returning a success or error response.
     """
     try:
-        res = await project.deleteFeedback_service.deleteFeedback(feedbackId)
+        res = await project.deleteFeedback_service.deleteFeedback(
+            feedbackId, current_user
+        )
         return res
     except Exception as e:
         logger.exception("Error processing request")
@@ -411,6 +729,15 @@ async def api_post_registerUser(
     try:
         res = await project.registerUser_service.registerUser(name, email, password)
         return res
+    except project.password_hashing.HashingOverloadedError as e:
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=503,
+            media_type="application/json",
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
         logger.exception("Error processing request")
         res = dict()
@@ -427,15 +754,57 @@ async def api_post_registerUser(
     response_model=project.getProfessionalSchedule_service.FetchScheduleResponse,
 )
 async def api_get_getProfessionalSchedule(
-    professionalId: str, startDate: Optional[date], endDate: Optional[date]
+    professionalId: str,
+    startDate: Optional[date] = None,
+    endDate: Optional[date] = None,
+    if_none_match: Optional[str] = Header(None),
 ) -> project.getProfessionalSchedule_service.FetchScheduleResponse | Response:
     """
-    Fetches the full schedule of a professional for a specific day or range of days. This is useful for both users planning to book and for professionals managing their schedules. The response includes all booked and available time slots, integrating data from both the Booking and Real-Time Status Modules.
+    Fetches the full schedule of a professional for a specific day or range of days. This is useful for both users planning to book and for professionals managing their schedules. The response includes all booked and available time slots, integrating data from both the Booking and Real-Time Status Modules. Responses carry an ETag; send it back in If-None-Match to get 304 Not Modified while the schedule is unchanged.
     """
     try:
+        profileId = int(professionalId)
+        version = await project.schedule_versions.current(db_client, profileId)
+        project.schedule_cache.observe(profileId, version)
+        template = await project.availability_template.get_template(profileId)
+        startDate, endDate = project.getProfessionalSchedule_service.scheduleRange(
+            template, startDate, endDate
+        )
+        etag = project.etags.schedule_etag(profileId, version, startDate, endDate)
+        if project.etags.matches(if_none_match, etag):
+            return project.etags.not_modified(
+                etag, "/calendar/schedule/{professionalId}"
+            )
         res = await project.getProfessionalSchedule_service.getProfessionalSchedule(
             professionalId, startDate, endDate
         )
+        body = res.model_dump_json().encode("utf-8")
+        return project.fast_json.FastJSONResponse(
+            body, headers=project.etags.headers(etag)
+        )
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/calendar/slots",
+    response_model=project.searchFreeSlots_service.FreeSlotSearchResponse,
+)
+async def api_get_searchFreeSlots(
+    count: int = 10, after: Optional[datetime] = None
+) -> project.searchFreeSlots_service.FreeSlotSearchResponse | Response:
+    """
+    Finds the next open appointment slots with any professional, combining each professional's weekly availability with their appointments and calendar events. Returns the earliest slots first.
+    """
+    try:
+        res = await project.searchFreeSlots_service.searchFreeSlots(count, after)
         return res
     except Exception as e:
         logger.exception("Error processing request")
@@ -476,6 +845,32 @@ async def api_post_bulkUpdateAvailability(
         )
 
 
+@app.post(
+    "/availability/{professionalId}",
+    response_model=project.setAvailability_service.ProfessionalAvailabilityUpdateResponse,
+)
+async def api_post_setAvailability(
+    professionalId: int, isAvailable: bool, currentActivity: Optional[str]
+) -> project.setAvailability_service.ProfessionalAvailabilityUpdateResponse | Response:
+    """
+    Sets the availability status of a professional, creating it if the professional has none yet.
+    """
+    try:
+        res = await project.setAvailability_service.setAvailability(
+            professionalId, isAvailable, currentActivity
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
 @app.post(
     "/users/authenticate",
     response_model=project.authenticateUser_service.AuthenticationResponse,
@@ -489,6 +884,15 @@ async def api_post_authenticateUser(
     try:
         res = await project.authenticateUser_service.authenticateUser(email, password)
         return res
+    except project.password_hashing.HashingOverloadedError as e:
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=503,
+            media_type="application/json",
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
         logger.exception("Error processing request")
         res = dict()
@@ -552,6 +956,114 @@ async def api_post_sendAvailabilityAlert(
         )
 
 
+@app.post(
+    "/professionals/{professionalId}/watch",
+    response_model=project.watchProfessional_service.WatchResponse,
+)
+async def api_post_watchProfessional(
+    professionalId: int,
+    current_user: project.auth.AuthenticatedUser = Depends(
+        project.auth.get_current_user
+    ),
+) -> project.watchProfessional_service.WatchResponse | Response:
+    """
+    Follows a professional. Whenever the professional's availability changes, every follower receives a notification, written in the background in bulk so that the status update itself stays fast.
+    """
+    try:
+        res = await project.watchProfessional_service.watchProfessional(
+            professionalId, current_user
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.delete(
+    "/professionals/{professionalId}/watch",
+    response_model=project.watchProfessional_service.WatchResponse,
+)
+async def api_delete_unwatchProfessional(
+    professionalId: int,
+    current_user: project.auth.AuthenticatedUser = Depends(
+        project.auth.get_current_user
+    ),
+) -> project.watchProfessional_service.WatchResponse | Response:
+    """
+    Stops following a professional, so that the caller no longer receives notifications about their availability.
+    """
+    try:
+        res = await project.unwatchProfessional_service.unwatchProfessional(
+            professionalId, current_user
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/professionals/ratings",
+    response_model=project.getProfessionalRatings_service.RatingSummaryListResponse,
+)
+async def api_get_getProfessionalRatings(
+    ids: List[int] = Query(...),
+) -> project.getProfessionalRatings_service.RatingSummaryListResponse | Response:
+    """
+    Returns the rating summaries of several professionals at once, for example every professional on a search results page. Pass each Profile ID as a repeated ids parameter.
+    """
+    try:
+        res = await project.getProfessionalRatings_service.getProfessionalRatings(ids)
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/professionals/{professionalId}/rating",
+    response_model=project.getProfessionalRating_service.RatingSummary,
+)
+async def api_get_getProfessionalRating(
+    professionalId: int,
+) -> project.getProfessionalRating_service.RatingSummary | Response:
+    """
+    Returns a professional's rating summary: the number of ratings, their sum and average, and a histogram of 1 to 5 star ratings.
+    """
+    try:
+        res = await project.getProfessionalRating_service.getProfessionalRating(
+            professionalId
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
 @app.post(
     "/calendar/book",
     response_model=project.bookAppointment_service.CalendarBookingResponse,
@@ -583,13 +1095,70 @@ async def api_post_bookAppointment(
     response_model=project.updateFeedback_service.UpdateFeedbackResponse,
 )
 async def api_put_updateFeedback(
-    feedbackId: int, content: str
+    feedbackId: int,
+    content: str,
+    rating: Optional[int] = None,
+    current_user: project.auth.AuthenticatedUser = Depends(
+        project.auth.get_current_user
+    ),
 ) -> project.updateFeedback_service.UpdateFeedbackResponse | Response:
     """
-    Allows updates to a specific feedback entry. Only the user who submitted the feedback or an admin can update it. Requires feedback ID and new feedback content. Validates the user’s permission and then updates the entry, returning a success or error message.
+    Allows updates to a specific feedback entry. Only the user who submitted the feedback or an admin can update it. Requires feedback ID and new feedback content, and optionally a new rating. Validates the user’s permission and then updates the entry, returning a success or error message.
     """
     try:
-        res = await project.updateFeedback_service.updateFeedback(feedbackId, content)
+        res = await project.updateFeedback_service.updateFeedback(
+            feedbackId, content, current_user, rating
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.post("/users/logout", response_model=project.logoutUser_service.LogoutResponse)
+async def api_post_logoutUser(
+    current_user: project.auth.AuthenticatedUser = Depends(
+        project.auth.get_current_user
+    ),
+) -> project.logoutUser_service.LogoutResponse | Response:
+    """
+    Ends the caller's session by revoking the bearer token sent with this request. The token is rejected by every server instance within a few seconds, and immediately by the one that handled the logout.
+    """
+    try:
+        res = await project.logoutUser_service.logoutUser(current_user)
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=jsonable_encoder(res),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.post(
+    "/users/{id}/revoke-tokens",
+    response_model=project.revokeUserTokens_service.RevokeTokensResponse,
+)
+async def api_post_revokeUserTokens(
+    id: str,
+    current_user: project.auth.AuthenticatedUser = Depends(
+        project.auth.get_current_user
+    ),
+) -> project.revokeUserTokens_service.RevokeTokensResponse | Response:
+    """
+    Revokes every token issued to a user so far, forcing them to sign in again. Restricted to admins. Role changes and account deletion revoke tokens automatically.
+    """
+    try:
+        res = await project.revokeUserTokens_service.revokeUserTokens(id, current_user)
         return res
     except Exception as e:
         logger.exception("Error processing request")
@@ -606,13 +1175,19 @@ async def api_put_updateFeedback(
     "/users/{id}/role", response_model=project.updateUserRole_service.RoleUpdateResponse
 )
 async def api_put_updateUserRole(
-    id: str, new_role: project.updateUserRole_service.Role
+    id: str,
+    new_role: project.updateUserRole_service.Role,
+    current_user: project.auth.AuthenticatedUser = Depends(
+        project.auth.get_current_user
+    ),
 ) -> project.updateUserRole_service.RoleUpdateResponse | Response:
     """
     Allows updating the role of a user. Only accessible by admins. This function is essential for role management within the system. It involves a check against the Access Control Module to confirm the admin status before the role update is allowed.
     """
     try:
-        res = await project.updateUserRole_service.updateUserRole(id, new_role)
+        res = await project.updateUserRole_service.updateUserRole(
+            id, new_role, current_user
+        )
         return res
     except Exception as e:
         logger.exception("Error processing request")
@@ -680,13 +1255,18 @@ async def api_get_checkAvailability(
     response_model=project.getFeedback_service.FeedbackDetailsResponse,
 )
 async def api_get_getFeedback(
-    feedbackId: str, role: str
+    feedbackId: str,
+    current_user: project.auth.AuthenticatedUser = Depends(
+        project.auth.get_current_user
+    ),
 ) -> project.getFeedback_service.FeedbackDetailsResponse | Response:
     """
     Fetches details of a specific feedback entry by its ID. It ensures the requester has the right to view the feedback, either by being an admin, the user who created it or the professional it's about. Returns the feedback details if permitted.
     """
     try:
-        res = await project.getFeedback_service.getFeedback(feedbackId, role)
+        res = await project.getFeedback_service.getFeedback(
+            feedbackId, current_user
+        )
         return res
     except Exception as e:
         logger.exception("Error processing request")
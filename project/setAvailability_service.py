@@ -0,0 +1,69 @@
+import json
+from typing import Optional
+
+import prisma
+import project.availability_events
+from project.bulkUpdateAvailability_service import UPSERT_CHUNK_QUERY
+from pydantic import BaseModel
+
+
+class ProfessionalAvailabilityUpdateResponse(BaseModel):
+    """
+    Response model confirming the availability status stored for the professional.
+    """
+
+    success: bool
+    message: str
+    professionalInfoId: int
+    isAvailable: bool
+    currentActivity: Optional[str] = None
+
+
+async def setAvailability(
+    professionalId: int, isAvailable: bool, currentActivity: Optional[str] = None
+) -> ProfessionalAvailabilityUpdateResponse:
+    """
+    Sets a professional's availability status, creating their RealTimeStatus if they have none yet. Unlike
+    updateAvailability, which only changes an existing status, this also works for a professional whose status was
+    never set or was deleted.
+
+    The row is written by the same statement as a bulk update chunk, so the write, its change log entry and the
+    previous availability flag (for watcher alerts) take one round trip.
+
+    Args:
+        professionalId (int): The ProfessionalInfo ID of the professional.
+        isAvailable (bool): Whether the professional is available.
+        currentActivity (Optional[str]): What the professional is doing, if anything.
+
+    Returns:
+        ProfessionalAvailabilityUpdateResponse: The stored status, or success False if the professional does not
+        exist.
+    """
+    payload = json.dumps(
+        [
+            {
+                "professionalInfoId": professionalId,
+                "isAvailable": isAvailable,
+                "currentActivity": currentActivity,
+            }
+        ]
+    )
+    rows = await prisma.get_client().query_raw(UPSERT_CHUNK_QUERY, payload)
+    if not rows:
+        return ProfessionalAvailabilityUpdateResponse(
+            success=False,
+            message=f"No professional found with ID {professionalId}.",
+            professionalInfoId=professionalId,
+            isAvailable=isAvailable,
+            currentActivity=currentActivity,
+        )
+    await project.availability_events.status_changed(
+        professionalId, isAvailable, currentActivity, rows[0]["previousIsAvailable"]
+    )
+    return ProfessionalAvailabilityUpdateResponse(
+        success=True,
+        message="Availability status set successfully.",
+        professionalInfoId=professionalId,
+        isAvailable=isAvailable,
+        currentActivity=currentActivity,
+    )
@@ -0,0 +1,79 @@
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+import project.metrics
+
+T = TypeVar("T")
+
+SINGLE_FLIGHT_CALLS = project.metrics.Counter(
+    "single_flight_calls_total",
+    "Calls to a coalesced function, by function.",
+    ["function"],
+)
+SINGLE_FLIGHT_COALESCED = project.metrics.Counter(
+    "single_flight_coalesced_total",
+    "Calls to a coalesced function that shared a call already in flight instead of running their own, by function.",
+    ["function"],
+)
+
+_in_flight: Dict[Hashable, asyncio.Task] = {}
+
+
+async def run(key: Hashable, name: str, call: Callable[[], Awaitable[T]]) -> T:
+    """
+    Runs ``call`` unless a call with the same key is already running, in which case its result (or exception) is
+    shared. Nothing is cached: the key is forgotten as soon as the call finishes, so a caller can only receive a result
+    read at most one round trip before it arrived.
+
+    The shared call runs in its own task, so a caller that is cancelled (for example by a client disconnect) does not
+    cancel it for the others.
+
+    Args:
+        key (Hashable): Identifies identical calls.
+        name (str): The function name reported in metrics.
+        call (Callable[[], Awaitable[T]]): Starts the call.
+
+    Returns:
+        T: The call's result.
+    """
+    SINGLE_FLIGHT_CALLS.inc(function=name)
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.get_running_loop().create_task(call())
+        _in_flight[key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+    else:
+        SINGLE_FLIGHT_COALESCED.inc(function=name)
+    return await asyncio.shield(task)
+
+
+def coalesce(
+    function: Optional[Callable[..., Awaitable[T]]] = None,
+    *,
+    version: Optional[Callable[..., Hashable]] = None,
+) -> Any:
+    """
+    Decorates a read-only async service function so that concurrent calls with equal arguments share one execution.
+    Calls with unhashable arguments run on their own.
+
+    Use as ``@coalesce``, or as ``@coalesce(version=...)`` where ``version`` is called with the function's arguments
+    and returns a change counter of the data it reads. Calls only share an execution started at the same version, so
+    a caller that arrives after a write never receives a result read before it.
+    """
+    if function is None:
+        return functools.partial(coalesce, version=version)
+    name = f"{function.__module__}.{function.__qualname__}"
+
+    @functools.wraps(function)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        key = (name, args, tuple(sorted(kwargs.items())))
+        if version is not None:
+            key += (version(*args, **kwargs),)
+        try:
+            hash(key)
+        except TypeError:
+            return await function(*args, **kwargs)
+        return await run(key, name, lambda: function(*args, **kwargs))
+
+    return wrapper
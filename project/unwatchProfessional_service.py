@@ -0,0 +1,29 @@
+import prisma
+import prisma.models
+from project.auth import AuthenticatedUser
+from project.watchProfessional_service import WatchResponse
+
+
+async def unwatchProfessional(
+    professionalId: int, current_user: AuthenticatedUser
+) -> WatchResponse:
+    """
+    Stops following a professional, so the caller no longer receives their availability alerts.
+
+    Args:
+        professionalId (int): The Profile ID of the professional to stop following.
+        current_user (AuthenticatedUser): The verified caller.
+
+    Returns:
+        WatchResponse: Indicates whether the caller was following the professional.
+    """
+    removed = await prisma.models.ProfessionalWatch.prisma().delete_many(
+        where={"userId": current_user.user_id, "profileId": professionalId}
+    )
+    if removed == 0:
+        return WatchResponse(
+            success=False, message="You are not following this professional."
+        )
+    return WatchResponse(
+        success=True, message="You will no longer be notified of availability changes."
+    )
@@ -2,7 +2,11 @@ from datetime import datetime
 from typing import Optional
 
 import prisma
+import prisma.enums
 import prisma.models
+import project.appointment_index
+import project.schedule_cache
+import project.schedule_versions
 from pydantic import BaseModel
 
 
@@ -55,19 +59,67 @@ async def updateAppointment(
         AppointmentUpdateResponse: Response model indicating the outcome of the update operation, reflecting current state of the specified appointment.
 
     """
-    appointment = await prisma.models.Appointment.prisma().find_unique(
-        where={"id": appointmentId}
-    )
-    if not appointment:
-        return AppointmentUpdateResponse(success=False, updated_appointment=None)
     update_data = {"time": new_time, "updatedAt": datetime.now()}
     if new_professionalId is not None:
         update_data["profileId"] = new_professionalId
     if notes is not None:
         update_data["notes"] = notes
-    updated_appointment = await prisma.models.Appointment.prisma().update(
-        where={"id": appointmentId}, data=update_data
-    )
+    while True:
+        appointment = await prisma.models.Appointment.prisma().find_unique(
+            where={"id": appointmentId}
+        )
+        if not appointment:
+            return AppointmentUpdateResponse(success=False, updated_appointment=None)
+        profileId = appointment.profileId
+        target_profile_id = (
+            new_professionalId if new_professionalId is not None else profileId
+        )
+        # Moving the appointment to another professional touches both indexes.
+        async with project.appointment_index.lock(profileId, target_profile_id):
+            try:
+                if appointment.status != prisma.enums.Status.Cancelled:
+                    conflict = await project.appointment_index.find_conflict(
+                        target_profile_id, new_time, exclude_id=appointmentId
+                    )
+                    if conflict is not None:
+                        raise project.appointment_index.SlotTaken(conflict)
+                async with prisma.get_client().tx() as transaction:
+                    await project.schedule_versions.bump(
+                        transaction, profileId, target_profile_id
+                    )
+                    # Every write to an appointment bumps its professional first, so once that row is locked the
+                    # appointment read here stays current until the commit.
+                    appointment = await prisma.models.Appointment.prisma(
+                        transaction
+                    ).find_unique(where={"id": appointmentId})
+                    if appointment is None or appointment.profileId != profileId:
+                        raise project.appointment_index.AppointmentMoved()
+                    is_active = appointment.status != prisma.enums.Status.Cancelled
+                    if is_active:
+                        await project.appointment_index.claim(
+                            transaction, target_profile_id, new_time, exclude_id=appointmentId
+                        )
+                    updated_appointment = await prisma.models.Appointment.prisma(
+                        transaction
+                    ).update(where={"id": appointmentId}, data=update_data)
+            except project.appointment_index.SlotTaken:
+                return AppointmentUpdateResponse(
+                    success=False, updated_appointment=appointment
+                )
+            except project.appointment_index.AppointmentMoved:
+                continue
+            project.appointment_index.discard(profileId, appointmentId)
+            if is_active:
+                project.appointment_index.record(
+                    updated_appointment.profileId, appointmentId, updated_appointment.time
+                )
+                project.schedule_cache.invalidate_appointment(
+                    profileId, appointment.time
+                )
+                project.schedule_cache.invalidate_appointment(
+                    updated_appointment.profileId, updated_appointment.time
+                )
+        break
     response = AppointmentUpdateResponse(
         success=True, updated_appointment=updated_appointment
     )
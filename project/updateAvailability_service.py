@@ -2,8 +2,15 @@ from typing import Optional
 
 import prisma
 import prisma.models
+import project.availability_cache
+import project.availability_changes
+import project.availability_events
 from pydantic import BaseModel
 
+PREVIOUS_STATUS_QUERY = """
+SELECT "isAvailable" FROM "RealTimeStatus" WHERE "professionalInfoId" = $1 FOR UPDATE
+"""
+
 
 class RealTimeStatus(BaseModel):
     """
@@ -47,10 +54,25 @@ async def updateAvailability(
         print(response.updatedStatus.currentActivity)  # "In a meeting"
     """
     try:
-        rt_status = await prisma.models.RealTimeStatus.prisma().find_unique(
-            where={"professionalInfoId": professionalId}
-        )
-        if not rt_status:
+        async with prisma.get_client().tx() as transaction:
+            # Read under the row lock, so that the previous state handed to watcher alerts is the one this write
+            # replaced even when writers race.
+            previous = await transaction.query_raw(PREVIOUS_STATUS_QUERY, professionalId)
+            if previous:
+                updated_status = await prisma.models.RealTimeStatus.prisma(
+                    transaction
+                ).update(
+                    where={"professionalInfoId": professionalId},
+                    data={"isAvailable": isAvailable, "currentActivity": currentActivity},
+                )
+                await project.availability_changes.record(
+                    transaction,
+                    professionalId,
+                    updated_status.isAvailable,
+                    updated_status.currentActivity,
+                )
+        if not previous:
+            project.availability_cache.store_absent(professionalId)
             return AvailabilityUpdateResponse(
                 success=False,
                 message=f"No real-time status found for professional ID {professionalId}.",
@@ -58,9 +80,11 @@ async def updateAvailability(
                     isAvailable=isAvailable, currentActivity=currentActivity
                 ),
             )
-        updated_status = await prisma.models.RealTimeStatus.prisma().update(
-            where={"professionalInfoId": professionalId},
-            data={"isAvailable": isAvailable, "currentActivity": currentActivity},
+        await project.availability_events.status_changed(
+            professionalId,
+            updated_status.isAvailable,
+            updated_status.currentActivity,
+            previous[0]["isAvailable"],
         )
         return AvailabilityUpdateResponse(
             success=True,
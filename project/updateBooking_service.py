@@ -2,7 +2,12 @@ from datetime import datetime
 from typing import Optional
 
 import prisma
+import prisma.enums
 import prisma.models
+import project.appointment_index
+import project.notification_outbox
+import project.schedule_cache
+import project.schedule_versions
 from pydantic import BaseModel
 
 
@@ -54,21 +59,62 @@ async def updateBooking(
         UpdateBookingResponse: Response model indicating the result of the booking update operation,
                                including a confirmation of the changes made.
     """
-    appointment = await prisma.models.Appointment.prisma().find_unique(
-        where={"id": bookingId}
-    )
-    if not appointment:
-        return UpdateBookingResponse(
-            success=False,
-            message=f"No booking found with ID {bookingId}",
-            updatedBooking=None,
-        )
     updated_data = {"status": status}
     if newTime:
         updated_data["time"] = newTime
-    updated_appointment = await prisma.models.Appointment.prisma().update(
-        where={"id": bookingId}, data=updated_data
-    )
+    is_active = status != prisma.enums.Status.Cancelled
+    while True:
+        appointment = await prisma.models.Appointment.prisma().find_unique(
+            where={"id": bookingId}
+        )
+        if not appointment:
+            return UpdateBookingResponse(
+                success=False,
+                message=f"No booking found with ID {bookingId}",
+                updatedBooking=None,
+            )
+        profileId = appointment.profileId
+        async with project.appointment_index.lock(profileId):
+            try:
+                if is_active:
+                    conflict = await project.appointment_index.find_conflict(
+                        profileId, newTime or appointment.time, exclude_id=bookingId
+                    )
+                    if conflict is not None:
+                        raise project.appointment_index.SlotTaken(conflict)
+                async with prisma.get_client().tx() as transaction:
+                    await project.schedule_versions.bump(transaction, profileId)
+                    # Every write to an appointment bumps its professional first, so once that row is locked the
+                    # booking read here stays current until the commit.
+                    appointment = await prisma.models.Appointment.prisma(
+                        transaction
+                    ).find_unique(where={"id": bookingId})
+                    if appointment is None or appointment.profileId != profileId:
+                        raise project.appointment_index.AppointmentMoved()
+                    if is_active:
+                        await project.appointment_index.claim(
+                            transaction, profileId, newTime or appointment.time, exclude_id=bookingId
+                        )
+                    updated_appointment = await prisma.models.Appointment.prisma(
+                        transaction
+                    ).update(where={"id": bookingId}, data=updated_data)
+            except project.appointment_index.SlotTaken:
+                return UpdateBookingResponse(
+                    success=False,
+                    message="The professional already has an appointment at the requested time.",
+                    updatedBooking=appointment,
+                )
+            except project.appointment_index.AppointmentMoved:
+                continue
+            project.appointment_index.discard(profileId, bookingId)
+            if is_active:
+                project.appointment_index.record(
+                    profileId, bookingId, updated_appointment.time
+                )
+            project.schedule_cache.invalidate_appointment(
+                profileId, appointment.time, updated_appointment.time
+            )
+        break
     user_notification_message = f"Your booking has been updated. New status: {status}."
     professional_notification_message = (
         f"Booking with ID {bookingId} has been updated. New status: {status}."
@@ -77,21 +123,11 @@ async def updateBooking(
         where={"id": updated_appointment.profileId}, include={"user": True}
     )
     if profile and profile.user:
-        await prisma.models.Notification.prisma().create(
-            data={
-                "userId": updated_appointment.userId,
-                "message": user_notification_message,
-                "isRead": False,
-                "createdAt": datetime.now(),
-            }
-        )
-        await prisma.models.Notification.prisma().create(
-            data={
-                "userId": profile.user.id,
-                "message": professional_notification_message,
-                "isRead": False,
-                "createdAt": datetime.now(),
-            }
+        project.notification_outbox.enqueue_many(
+            [
+                (updated_appointment.userId, user_notification_message),
+                (profile.user.id, professional_notification_message),
+            ]
         )
     return UpdateBookingResponse(
         success=True,
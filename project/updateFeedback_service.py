@@ -1,7 +1,15 @@
+from typing import Optional
+
 import prisma
 import prisma.models
+import project.rating_aggregates
+from project.auth import AuthenticatedUser
 from pydantic import BaseModel
 
+LOCK_FEEDBACK_QUERY = """
+SELECT "profileId", "rating" FROM "Feedback" WHERE "id" = $1 FOR UPDATE
+"""
+
 
 class UpdateFeedbackResponse(BaseModel):
     """
@@ -11,18 +19,28 @@ class UpdateFeedbackResponse(BaseModel):
     message: str
 
 
-async def updateFeedback(feedbackId: int, content: str) -> UpdateFeedbackResponse:
+async def updateFeedback(
+    feedbackId: int,
+    content: str,
+    current_user: AuthenticatedUser,
+    rating: Optional[int] = None,
+) -> UpdateFeedbackResponse:
     """
-    Allows updates to a specific feedback entry. Only the user who submitted the feedback or an admin can update it. Requires feedback ID and new feedback content. Validates the user’s permission and then updates the entry, returning a success or error message.
+    Allows updates to a specific feedback entry. Only the user who submitted the feedback or an admin can update it. Requires feedback ID and new feedback content, and optionally a new rating. Validates the user’s permission and then updates the entry, returning a success or error message.
 
     Args:
         feedbackId (int): The unique identifier of the feedback to be updated.
         content (str): The new content to update the existing feedback.
+        current_user (AuthenticatedUser): The verified caller; must be the feedback's author or an admin.
+        rating (Optional[int]): A new rating from 1 to 5; the current rating is kept if None.
 
     Returns:
         UpdateFeedbackResponse: Response model after attempting to update a feedback. It provides a message indicating the success or failure of the operation.
     """
-    current_user_id, current_user_role = await get_current_user_details()
+    if rating is not None and not project.rating_aggregates.is_valid_rating(rating):
+        return UpdateFeedbackResponse(
+            message=f"Rating must be between {project.rating_aggregates.MIN_RATING} and {project.rating_aggregates.MAX_RATING}."
+        )
     feedback = await prisma.models.Feedback.prisma().find_unique(
         where={"id": feedbackId}
     )
@@ -30,22 +48,31 @@ async def updateFeedback(feedbackId: int, content: str) -> UpdateFeedbackRespons
         return UpdateFeedbackResponse(
             message=f"No feedback found with ID: {feedbackId}"
         )
-    if feedback.userId != current_user_id and current_user_role != "Admin":
+    if feedback.userId != current_user.user_id and not current_user.is_admin:
         return UpdateFeedbackResponse(
             message="You do not have permission to update this feedback."
         )
-    updated_feedback = await prisma.models.Feedback.prisma().update(
-        where={"id": feedbackId}, data={"content": content}
-    )
+    if rating is None:
+        await prisma.models.Feedback.prisma().update(
+            where={"id": feedbackId}, data={"content": content}
+        )
+        return UpdateFeedbackResponse(message="Feedback has been successfully updated.")
+    async with prisma.get_client().tx() as transaction:
+        # The row is locked before the rating it replaces is read, so two concurrent rating changes cannot both
+        # subtract the same previous rating, and an unchanged rating is judged on the current row.
+        locked = await transaction.query_raw(LOCK_FEEDBACK_QUERY, feedbackId)
+        if not locked:
+            return UpdateFeedbackResponse(
+                message=f"No feedback found with ID: {feedbackId}"
+            )
+        await prisma.models.Feedback.prisma(transaction).update(
+            where={"id": feedbackId}, data={"content": content, "rating": rating}
+        )
+        if rating != locked[0]["rating"]:
+            await project.rating_aggregates.apply(
+                transaction,
+                locked[0]["profileId"],
+                added=rating,
+                removed=locked[0]["rating"],
+            )
     return UpdateFeedbackResponse(message="Feedback has been successfully updated.")
-
-
-async def get_current_user_details():
-    """
-    Simulates retrieval of the current user's ID and role from session or authentication context.
-    Replace this method to integrate with actual user authentication system.
-
-    Returns:
-        tuple: (user_id: int, user_role: str) Tuple containing current user's ID and role
-    """
-    return (1, "Admin")
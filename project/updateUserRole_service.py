@@ -3,6 +3,8 @@ from typing import Optional
 
 import prisma
 import prisma.models
+import project.token_revocation
+from project.auth import AuthenticatedUser
 from pydantic import BaseModel
 
 
@@ -25,17 +27,27 @@ class RoleUpdateResponse(BaseModel):
     message: Optional[str] = None
 
 
-async def updateUserRole(id: str, new_role: Role) -> RoleUpdateResponse:
+async def updateUserRole(
+    id: str, new_role: Role, current_user: AuthenticatedUser
+) -> RoleUpdateResponse:
     """
     Updates the role of a user in the system, restricted to be performed by admin users only.
 
     Args:
         id (str): The unique identifier of the user whose role is being updated.
         new_role (Role): The new role to be assigned to the user.
+        current_user (AuthenticatedUser): The verified caller; must hold the Admin role.
 
     Returns:
         RoleUpdateResponse: A detailed response about the outcome of the update operation.
     """
+    if not current_user.is_admin:
+        return RoleUpdateResponse(
+            success=False,
+            user_id=id,
+            new_role=new_role,
+            message="Only admins can update user roles.",
+        )
     user = await prisma.models.User.prisma().find_unique(where={"id": int(id)})
     if not user:
         return RoleUpdateResponse(
@@ -43,8 +55,10 @@ async def updateUserRole(id: str, new_role: Role) -> RoleUpdateResponse:
         )  # TODO(autogpt): Argument missing for parameter "new_role". reportCallIssue
     try:
         updated_user = await prisma.models.User.prisma().update(
-            {"where": {"id": int(id)}, "data": {"role": new_role}}
-        )  # TODO(autogpt): Argument missing for parameter "where". reportCallIssue
+            where={"id": int(id)}, data={"role": new_role}
+        )
+        # Tokens carry the role, so tokens issued under the old role must stop working.
+        await project.token_revocation.revoke_user(int(id))
         return RoleUpdateResponse(
             success=True,
             user_id=id,
@@ -0,0 +1,44 @@
+import prisma
+import prisma.errors
+import prisma.models
+from project.auth import AuthenticatedUser
+from pydantic import BaseModel
+
+
+class WatchResponse(BaseModel):
+    """
+    Indicates whether the caller now follows, or no longer follows, the professional.
+    """
+
+    success: bool
+    message: str
+
+
+async def watchProfessional(
+    professionalId: int, current_user: AuthenticatedUser
+) -> WatchResponse:
+    """
+    Follows a professional so that the caller is notified whenever the professional becomes available or
+    unavailable. Following a professional twice has no further effect.
+
+    Args:
+        professionalId (int): The Profile ID of the professional to follow.
+        current_user (AuthenticatedUser): The verified caller, who becomes a watcher.
+
+    Returns:
+        WatchResponse: Indicates whether the caller now follows the professional.
+    """
+    professional_info = await prisma.models.ProfessionalInfo.prisma().find_unique(
+        where={"profileId": professionalId}
+    )
+    if professional_info is None:
+        return WatchResponse(success=False, message="Professional not found.")
+    try:
+        await prisma.models.ProfessionalWatch.prisma().create(
+            data={"userId": current_user.user_id, "profileId": professionalId}
+        )
+    except prisma.errors.UniqueViolationError:
+        pass
+    return WatchResponse(
+        success=True, message="You will be notified of availability changes."
+    )
@@ -0,0 +1,148 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import prisma.enums
+import prisma.models
+import project.appointment_index as appointment_index
+import pytest
+from project.appointment_index import IntervalIndex, SlotTaken, as_utc
+
+START = datetime(2026, 1, 5, 9, tzinfo=timezone.utc)
+HOUR = timedelta(hours=1)
+
+
+def make_index(*intervals):
+    index = IntervalIndex(START - timedelta(days=1))
+    for appointmentId, (start, end) in enumerate(intervals, 1):
+        index.add(appointmentId, start, end)
+    return index
+
+
+def test_as_utc_treats_naive_values_as_utc():
+    naive = datetime(2026, 1, 5, 9)
+    assert as_utc(naive) == START
+    assert as_utc(naive).tzinfo is timezone.utc
+    berlin = timezone(timedelta(hours=1))
+    assert as_utc(datetime(2026, 1, 5, 10, tzinfo=berlin)) == START
+
+
+def test_overlapping_finds_an_overlap():
+    index = make_index((START, START + HOUR))
+    assert index.overlapping(START + HOUR / 2, START + 2 * HOUR) == 1
+    assert index.overlapping(START - HOUR / 2, START + HOUR / 2) == 1
+    assert index.overlapping(START + HOUR / 4, START + HOUR / 2) == 1
+
+
+def test_back_to_back_intervals_do_not_overlap():
+    index = make_index((START, START + HOUR))
+    assert index.overlapping(START + HOUR, START + 2 * HOUR) is None
+    assert index.overlapping(START - HOUR, START) is None
+
+
+def test_exclude_id_ignores_the_appointment_being_moved():
+    index = make_index((START, START + HOUR))
+    assert index.overlapping(START, START + HOUR, exclude_id=1) is None
+
+
+def test_long_appointment_is_found_from_far_after_its_start():
+    index = make_index((START, START + 8 * HOUR), (START + 9 * HOUR, START + 10 * HOUR))
+    assert index.overlapping(START + 6 * HOUR, START + 7 * HOUR) == 1
+    assert index.overlapping(START + 8 * HOUR, START + 9 * HOUR) is None
+
+
+def test_add_moves_and_remove_drops():
+    index = make_index((START, START + HOUR))
+    index.add(1, START + 3 * HOUR, START + 4 * HOUR)
+    assert len(index) == 1
+    assert index.overlapping(START, START + HOUR) is None
+    assert index.overlapping(START + 3 * HOUR, START + 4 * HOUR) == 1
+    index.remove(1)
+    index.remove(1)
+    assert len(index) == 0
+    assert index.overlapping(START + 3 * HOUR, START + 4 * HOUR) is None
+
+
+def test_equal_starts_are_kept_apart():
+    index = make_index((START, START + HOUR), (START, START + HOUR))
+    index.remove(1)
+    assert index.overlapping(START, START + HOUR) == 2
+
+
+def test_covers_accounts_for_the_longest_appointment():
+    index = IntervalIndex(START)
+    assert index.covers(START + HOUR)
+    assert not index.covers(START + HOUR / 2)
+    index.add(1, START + 5 * HOUR, START + 8 * HOUR)
+    assert not index.covers(START + 2 * HOUR)
+    assert index.covers(START + 3 * HOUR)
+
+
+class FakeAppointments:
+    """
+    The Appointment table as another process sees it: rows change without the index being told.
+    """
+
+    def __init__(self):
+        self.rows = []
+
+    def prisma(self, client=None):
+        return self
+
+    def book(self, appointmentId, time):
+        row = SimpleNamespace(
+            id=appointmentId, profileId=7, time=time, status=prisma.enums.Status.Pending
+        )
+        self.rows.append(row)
+        return row
+
+    def _active(self, where):
+        return [
+            row
+            for row in self.rows
+            if row.profileId == where["profileId"]
+            and row.status != where["status"]["not"]
+            and row.id != where.get("id", {}).get("not")
+        ]
+
+    async def find_many(self, where):
+        return [row for row in self._active(where) if row.time >= where["time"]["gte"]]
+
+    async def find_first(self, where):
+        time = where["time"]
+        for row in self._active(where):
+            if time["gt"] < row.time < time["lt"]:
+                return row
+        return None
+
+
+@pytest.fixture
+def appointments(monkeypatch):
+    appointments = FakeAppointments()
+    monkeypatch.setattr(prisma.models, "Appointment", appointments)
+    appointment_index._indexes.clear()
+    yield appointments
+    appointment_index._indexes.clear()
+
+
+SOON = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+
+def test_index_conflicts_are_confirmed_against_the_database(appointments):
+    booking = appointments.book(1, SOON)
+    assert asyncio.run(appointment_index.find_conflict(7, SOON + HOUR / 2)) == 1
+    # Cancelled by another process: the index still holds it, the database does not.
+    booking.status = prisma.enums.Status.Cancelled
+    assert asyncio.run(appointment_index.find_conflict(7, SOON + HOUR / 2)) is None
+    assert appointment_index._indexes.get(7) is None
+
+
+def test_claim_rejects_a_slot_booked_by_another_process(appointments):
+    assert asyncio.run(appointment_index.find_conflict(7, SOON)) is None
+    appointments.book(2, SOON)
+    assert asyncio.run(appointment_index.find_conflict(7, SOON)) is None
+    with pytest.raises(SlotTaken) as taken:
+        asyncio.run(appointment_index.claim(None, 7, SOON + HOUR / 2))
+    assert taken.value.appointmentId == 2
+    assert appointment_index._indexes.get(7) is None
+    asyncio.run(appointment_index.claim(None, 7, SOON + HOUR))
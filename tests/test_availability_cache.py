@@ -0,0 +1,92 @@
+import asyncio
+
+import prisma
+import project.availability_cache as availability_cache
+import pytest
+from project.availability_cache import ABSENT, CachedStatus, status_version
+from project.cache import LRUCache
+
+
+class FakeLog:
+    """
+    Answers CHANGED_QUERY with the given horizon and changed professionals.
+    """
+
+    def __init__(self):
+        self.horizon = 10
+        self.compacted_through = None
+        self.changed = []
+        self.cursors = []
+
+    async def query_raw(self, query, cursor):
+        assert query == availability_cache.CHANGED_QUERY
+        self.cursors.append(cursor)
+        rows = [
+            {
+                "horizon": self.horizon,
+                "compacted_through": self.compacted_through,
+                "professional_info_id": professionalInfoId,
+            }
+            for professionalInfoId in self.changed
+        ]
+        return rows or [
+            {
+                "horizon": self.horizon,
+                "compacted_through": self.compacted_through,
+                "professional_info_id": None,
+            }
+        ]
+
+
+@pytest.fixture
+def log(monkeypatch):
+    log = FakeLog()
+    monkeypatch.setattr(prisma, "get_client", lambda: log)
+    monkeypatch.setattr(availability_cache, "_cursor", None)
+    availability_cache._cache.clear()
+    return log
+
+
+def test_follow_drops_professionals_written_elsewhere(log):
+    availability_cache.store(1, True, None)
+    assert asyncio.run(availability_cache.follow()) == 0
+    assert availability_cache.get(1) is None
+    availability_cache.store(1, True, None)
+    availability_cache.store(2, False, "Break")
+    log.horizon, log.changed = 12, [2]
+    assert asyncio.run(availability_cache.follow()) == 1
+    assert availability_cache.get(1) is not None
+    assert availability_cache.get(2) is None
+    assert log.cursors == [None, 10]
+
+
+def test_follow_resets_after_compaction_past_the_cursor(log):
+    asyncio.run(availability_cache.follow())
+    availability_cache.store(1, True, None)
+    log.horizon, log.compacted_through = 20, 15
+    asyncio.run(availability_cache.follow())
+    assert availability_cache.get(1) is None
+    assert availability_cache._cursor == 20
+
+
+def test_status_version_follows_the_status():
+    available = CachedStatus(exists=True, isAvailable=True)
+    assert status_version(available) == status_version(CachedStatus(True, True))
+    assert status_version(available) != status_version(CachedStatus(True, False))
+    assert status_version(available) != status_version(CachedStatus(True, True, ""))
+    assert status_version(CachedStatus(True, True, "a")) != status_version(
+        CachedStatus(True, True, "b")
+    )
+    assert status_version(ABSENT) != status_version(CachedStatus(True, False))
+
+
+def test_versions_are_bounded_and_never_go_back(monkeypatch):
+    monkeypatch.setattr(availability_cache, "_versions", LRUCache(2, on_evict=availability_cache._version_evicted))
+    assert availability_cache.version(1) == availability_cache.version(99)
+    assert len(availability_cache._versions) == 0
+    availability_cache.invalidate(1)
+    written = availability_cache.version(1)
+    availability_cache.invalidate(2)
+    availability_cache.invalidate(3)
+    assert len(availability_cache._versions) == 2
+    assert availability_cache.version(1) >= written
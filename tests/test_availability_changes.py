@@ -0,0 +1,109 @@
+import asyncio
+
+import project.getAvailabilityChanges_service as service
+from project.getAvailabilityChanges_service import readChanges, wholeTransactions
+
+
+def entry(txid, professional_info_id=1, horizon=100):
+    return {"txid": txid, "professional_info_id": professional_info_id, "horizon": horizon}
+
+
+def change(seq, professional_info_id, is_available=True):
+    return {
+        "seq": seq,
+        "professional_id": professional_info_id * 10,
+        "professional_info_id": professional_info_id,
+        "is_available": is_available,
+        "current_activity": None,
+        "removed": False,
+    }
+
+
+class FakeLog:
+    """
+    Answers the change log queries from fixed rows.
+    """
+
+    def __init__(self, entries, latest=(), compacted_through=0, horizon=100):
+        self.entries = entries
+        self.latest = list(latest)
+        self.state = {"compacted_through": compacted_through, "horizon": horizon}
+        self.latest_args = None
+
+    async def query_raw(self, query, *args):
+        if query == service.ENTRIES_QUERY:
+            since, limit = args
+            return [row for row in self.entries if row["txid"] > since][:limit]
+        if query == service.TRANSACTION_QUERY:
+            return [row for row in self.entries if row["txid"] == args[0]]
+        if query == service.LATEST_QUERY:
+            self.latest_args = args
+            return list(self.latest)
+        if query == service.LOG_STATE_QUERY:
+            return [self.state]
+        raise AssertionError(query)
+
+
+def read(log, since, limit=10):
+    return asyncio.run(readChanges(log, since, limit))
+
+
+def test_short_page_is_complete():
+    rows = [entry(1), entry(2)]
+    assert wholeTransactions(rows, 3) == (rows, False)
+
+
+def test_full_page_drops_its_last_transaction():
+    rows = [entry(1), entry(2), entry(2)]
+    assert wholeTransactions(rows, 3) == ([entry(1)], True)
+
+
+def test_full_page_of_one_transaction_is_empty():
+    assert wholeTransactions([entry(5), entry(5)], 2) == ([], True)
+
+
+def test_changes_collapse_to_one_per_professional_in_seq_order():
+    log = FakeLog(
+        [entry(3, 1), entry(4, 2), entry(5, 1)],
+        latest=[change(9, 1, False), change(7, 2)],
+    )
+    res = read(log, 2)
+    assert [c.professional_info_id for c in res.changes] == [2, 1]
+    assert not res.changes[1].is_available
+    assert res.next_since == 5
+    assert not res.has_more
+    assert not res.resync_required
+    assert log.latest_args == ("[1, 2]", 100)
+
+
+def test_nothing_new_keeps_the_cursor():
+    res = read(FakeLog([entry(3)]), 3)
+    assert res.changes == []
+    assert res.next_since == 3
+    assert not res.resync_required
+
+
+def test_transaction_larger_than_a_page_is_returned_whole():
+    log = FakeLog([entry(3, 1), entry(3, 2), entry(3, 3)], latest=[change(1, 1)])
+    res = read(log, 2, limit=2)
+    assert res.next_since == 3
+    assert res.has_more
+    assert log.latest_args == ("[1, 2, 3]", 100)
+
+
+def test_start_without_cursor_requires_resync():
+    res = read(FakeLog([], horizon=50), None)
+    assert res.resync_required
+    assert res.next_since == 49
+
+
+def test_compacted_cursor_requires_resync():
+    res = read(FakeLog([], compacted_through=20), 10)
+    assert res.resync_required
+    assert res.next_since == 99
+
+
+def test_cursor_ahead_of_the_log_requires_resync():
+    res = read(FakeLog([], horizon=50), 80)
+    assert res.resync_required
+    assert res.next_since == 49
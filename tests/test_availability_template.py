@@ -0,0 +1,93 @@
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo
+
+from project.availability_template import (
+    EMPTY_TEMPLATE,
+    FULL_DAY,
+    compile_availability,
+    working_windows,
+)
+
+MONDAY = date(2026, 1, 5)
+
+
+def test_compiles_every_range_format():
+    template = compile_availability(
+        {
+            "Monday": [{"start": "09:00", "end": "12:00"}, ["13:00", "17:30"]],
+            "tue": "08:00-09:00",
+        }
+    )
+    assert template.windows(MONDAY) == (
+        (
+            datetime(2026, 1, 5, 9, tzinfo=timezone.utc),
+            datetime(2026, 1, 5, 12, tzinfo=timezone.utc),
+        ),
+        (
+            datetime(2026, 1, 5, 13, tzinfo=timezone.utc),
+            datetime(2026, 1, 5, 17, 30, tzinfo=timezone.utc),
+        ),
+    )
+    assert template.windows(date(2026, 1, 6)) == (
+        (
+            datetime(2026, 1, 6, 8, tzinfo=timezone.utc),
+            datetime(2026, 1, 6, 9, tzinfo=timezone.utc),
+        ),
+    )
+    assert template.windows(date(2026, 1, 7)) == ()
+
+
+def test_only_slots_fully_inside_a_range_are_set():
+    template = compile_availability({"mon": ["09:10-10:20"]})
+    assert template.windows(MONDAY) == (
+        (
+            datetime(2026, 1, 5, 9, 15, tzinfo=timezone.utc),
+            datetime(2026, 1, 5, 10, 15, tzinfo=timezone.utc),
+        ),
+    )
+
+
+def test_adjacent_ranges_merge_into_one_window():
+    template = compile_availability({"mon": ["09:00-10:00", "10:00-11:00"]})
+    assert len(template.windows(MONDAY)) == 1
+
+
+def test_whole_day():
+    template = compile_availability({"mon": ["00:00-24:00"]})
+    assert template.days[0] == FULL_DAY
+    assert template.is_scheduled(datetime(2026, 1, 5, 23, 59, tzinfo=timezone.utc))
+
+
+def test_is_scheduled_uses_the_template_timezone():
+    template = compile_availability(
+        {"timezone": "Europe/Berlin", "monday": ["09:00-17:00"]}
+    )
+    assert template.tz == ZoneInfo("Europe/Berlin")
+    assert template.is_scheduled(datetime(2026, 1, 5, 8, tzinfo=timezone.utc))
+    assert not template.is_scheduled(datetime(2026, 1, 5, 16, 15, tzinfo=timezone.utc))
+    # Naive values are UTC.
+    assert template.is_scheduled(datetime(2026, 1, 5, 15, 59))
+
+
+def test_malformed_input_is_skipped():
+    template = compile_availability(
+        {"timezone": "Nowhere/Else", "mon": ["09:00-10:00", "late", {"start": "25:00"}]}
+    )
+    assert template.tz == timezone.utc
+    assert len(template.windows(MONDAY)) == 1
+    assert compile_availability("not json") is EMPTY_TEMPLATE
+    assert compile_availability('{"someday": ["09:00-10:00"]}') is EMPTY_TEMPLATE
+    assert compile_availability(None) is EMPTY_TEMPLATE
+    assert not EMPTY_TEMPLATE
+
+
+def test_working_windows_merge_across_midnight():
+    template = compile_availability({"mon": "20:00-24:00", "tue": ["00:00-02:00", "09:00-10:00"]})
+
+    def at(day, hour):
+        return datetime(2026, 1, day, hour, tzinfo=timezone.utc)
+
+    assert list(working_windows(template, at(5, 21), at(6, 12))) == [
+        (at(5, 20), at(6, 2)),
+        (at(6, 9), at(6, 10)),
+    ]
@@ -0,0 +1,30 @@
+from datetime import date
+
+from project.etags import matches, not_modified, schedule_etag
+
+DAY = date(2026, 1, 5)
+
+
+def test_schedule_etag_changes_with_version_and_days():
+    etag = schedule_etag(7, 3, DAY, DAY)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == schedule_etag(7, 3, DAY, DAY)
+    assert etag != schedule_etag(7, 4, DAY, DAY)
+    assert etag != schedule_etag(8, 3, DAY, DAY)
+    assert etag != schedule_etag(7, 3, DAY, date(2026, 1, 6))
+
+
+def test_matches_uses_weak_comparison():
+    etag = schedule_etag(7, 3, DAY, DAY)
+    assert matches(etag, etag)
+    assert matches(f'"other", W/{etag}', etag)
+    assert matches("*", etag)
+    assert not matches(None, etag)
+    assert not matches('"other"', etag)
+
+
+def test_not_modified_has_no_body():
+    response = not_modified('"x"', "/route")
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["ETag"] == '"x"'
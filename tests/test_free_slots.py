@@ -0,0 +1,63 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import prisma.enums
+import prisma.models
+import pytest
+from project.availability_template import compile_availability
+from project.searchFreeSlots_service import loadBusyIntervals, professionalFreeSlots
+
+MONDAY = datetime(2026, 1, 5, tzinfo=timezone.utc)
+
+
+def at(hour, minute=0):
+    return MONDAY + timedelta(hours=hour, minutes=minute)
+
+
+def within(value, condition):
+    return ("lt" not in condition or value < condition["lt"]) and (
+        "gt" not in condition or value > condition["gt"]
+    )
+
+
+class FakeModel:
+    """
+    Applies the lt/gt conditions of a find_many filter to in-memory rows.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def prisma(self):
+        return self
+
+    async def find_many(self, where, include=None):
+        return [
+            row
+            for row in self.rows
+            if all(
+                within(getattr(row, field), condition)
+                for field, condition in where.items()
+                if field != "status"
+            )
+        ]
+
+
+@pytest.fixture
+def booked(monkeypatch):
+    appointments = []
+    monkeypatch.setattr(prisma.models, "Appointment", FakeModel(appointments))
+    monkeypatch.setattr(prisma.models, "CalendarEvent", FakeModel([]))
+    return appointments
+
+
+def test_booking_just_after_the_window_blocks_the_slots_it_overlaps(booked):
+    booked.append(
+        SimpleNamespace(profileId=1, time=at(10, 30), status=prisma.enums.Status.Confirmed)
+    )
+    start, end = at(9), at(10)
+    busy = asyncio.run(loadBusyIntervals(start, end))
+    template = compile_availability({"mon": ["09:00-17:00"]})
+    slots = list(professionalFreeSlots(1, template, busy[1], start, end))
+    assert [slot_start for slot_start, _, _ in slots] == [at(9), at(9, 15), at(9, 30)]
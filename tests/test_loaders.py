@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from project.loaders import DataLoader
+
+
+def test_keys_loaded_together_share_one_batch():
+    batches = []
+
+    async def batch(keys):
+        batches.append(keys)
+        return {key: key * 2 for key in keys if key != 3}
+
+    async def main():
+        loader = DataLoader(batch)
+        values = await asyncio.gather(loader.load(1), loader.load(2), loader.load(3))
+        return values, await loader.load(1)
+
+    values, cached = asyncio.run(main())
+    assert values == [2, 4, None]
+    assert cached == 2
+    assert batches == [[1, 2, 3]]
+
+
+def test_failed_keys_are_retried():
+    attempts = []
+
+    async def batch(keys):
+        attempts.append(keys)
+        if len(attempts) == 1:
+            raise ValueError("boom")
+        return {key: key for key in keys}
+
+    async def main():
+        loader = DataLoader(batch)
+        with pytest.raises(ValueError):
+            await loader.load(1)
+        return await loader.load(1)
+
+    assert asyncio.run(main()) == 1
+    assert attempts == [[1], [1]]
+
+
+# Zero ticks cancels the batch task before it starts; two cancel it while the batch function is awaiting.
+@pytest.mark.parametrize("ticks", [0, 2])
+def test_cancelled_batch_releases_its_callers(ticks):
+    async def batch(keys):
+        await asyncio.sleep(60)
+
+    async def main():
+        loader = DataLoader(batch)
+        future = loader.load(1)
+        await asyncio.sleep(0)
+        for _ in range(ticks):
+            await asyncio.sleep(0)
+        (task,) = loader._tasks
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(future, 1)
+        assert not loader._tasks
+        # The key is forgotten, so the next load starts a new batch instead of returning the cancelled future.
+        assert loader.load(1) is not future
+
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+from datetime import date, datetime, timedelta, timezone
+
+import project.schedule_cache as schedule_cache
+import pytest
+
+DAY = date(2026, 1, 5)
+DAY_START = datetime(2026, 1, 5, tzinfo=timezone.utc)
+DAY_END = DAY_START + timedelta(days=1)
+
+
+@pytest.fixture(autouse=True)
+def fresh(monkeypatch):
+    monkeypatch.setattr(schedule_cache, "_days", schedule_cache.LRUCache(100))
+    monkeypatch.setattr(schedule_cache, "_versions", schedule_cache._Ticks(2))
+    monkeypatch.setattr(schedule_cache, "_generations", schedule_cache._Ticks(2))
+
+
+def cache_day(profileId, details=("day",)):
+    schedule_cache.store(
+        profileId, DAY, DAY_START, DAY_END, details, schedule_cache.version(profileId)
+    )
+
+
+def test_lookups_do_not_track_unknown_professionals():
+    for profileId in range(10):
+        assert schedule_cache.get(profileId, DAY) is None
+        schedule_cache.version(profileId)
+    assert len(schedule_cache._versions._ticks) == 0
+    assert len(schedule_cache._generations._ticks) == 0
+
+
+def test_loads_racing_with_a_change_are_not_cached():
+    loaded_version = schedule_cache.version(1)
+    schedule_cache.invalidate_appointment(1, DAY_START)
+    schedule_cache.store(1, DAY, DAY_START, DAY_END, ("stale",), loaded_version)
+    assert schedule_cache.get(1, DAY) is None
+    cache_day(1)
+    assert schedule_cache.get(1, DAY) == ("day",)
+
+
+def test_evicted_professionals_stay_invalidated():
+    cache_day(1)
+    schedule_cache.invalidate_professional(1)
+    cache_day(1, ("new",))
+    cache_day(2)
+    schedule_cache.invalidate_professional(2)
+    # Evicting 1 and 2 raises the floor to 2's tick: 2's stale day stays invalid, and 1's day, loaded before that
+    # tick, is conservatively recomputed.
+    schedule_cache.invalidate_professional(3)
+    schedule_cache.invalidate_professional(4)
+    assert len(schedule_cache._generations._ticks) == 2
+    assert schedule_cache.get(1, DAY) is None
+    assert schedule_cache.get(2, DAY) is None
+
+
+def test_days_expire(monkeypatch):
+    cache_day(1)
+    assert schedule_cache.get(1, DAY) == ("day",)
+    monkeypatch.setattr(schedule_cache, "TTL_SECONDS", -1)
+    cache_day(1)
+    assert schedule_cache.get(1, DAY) is None
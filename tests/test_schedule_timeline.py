@@ -0,0 +1,118 @@
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+import prisma.enums
+from project.getProfessionalSchedule_service import (
+    SlotType,
+    appointmentBounds,
+    bucketByDay,
+    mergeTimeline,
+)
+
+DAY_START = datetime(2026, 1, 5, tzinfo=timezone.utc)
+DAY_END = DAY_START + timedelta(days=1)
+
+
+def at(hour, minute=0):
+    return DAY_START + timedelta(hours=hour, minutes=minute)
+
+
+def appointment(id, start, status=prisma.enums.Status.Confirmed):
+    return SimpleNamespace(id=id, time=start, status=status)
+
+
+def event(start, end):
+    return SimpleNamespace(start=start, end=end)
+
+
+def intervals(timeline):
+    return [
+        (detail.startTime, detail.endTime, detail.slotType, detail.status)
+        for detail in timeline
+    ]
+
+
+def test_booked_takes_precedence_over_blocked_over_free():
+    timeline = mergeTimeline(
+        [appointment(1, at(10))],
+        [event(at(10, 30), at(12))],
+        [(at(9), at(13))],
+        DAY_START,
+        DAY_END,
+    )
+    assert intervals(timeline) == [
+        (at(9), at(10), SlotType.free, None),
+        (at(10), at(11), SlotType.booked, "Confirmed"),
+        (at(11), at(12), SlotType.blocked, None),
+        (at(12), at(13), SlotType.free, None),
+    ]
+    assert [detail.isBooked for detail in timeline] == [False, True, False, False]
+
+
+def test_back_to_back_appointments_stay_separate():
+    timeline = mergeTimeline(
+        [appointment(1, at(10)), appointment(2, at(11))], [], [], DAY_START, DAY_END
+    )
+    assert intervals(timeline) == [
+        (at(10), at(11), SlotType.booked, "Confirmed"),
+        (at(11), at(12), SlotType.booked, "Confirmed"),
+    ]
+
+
+def test_overlapping_blocks_merge():
+    timeline = mergeTimeline(
+        [], [event(at(8), at(10)), event(at(9), at(11))], [], DAY_START, DAY_END
+    )
+    assert intervals(timeline) == [(at(8), at(11), SlotType.blocked, None)]
+
+
+def test_cancelled_appointments_are_left_out():
+    timeline = mergeTimeline(
+        [appointment(1, at(10), prisma.enums.Status.Cancelled)],
+        [],
+        [(at(9), at(12))],
+        DAY_START,
+        DAY_END,
+    )
+    assert intervals(timeline) == [(at(9), at(12), SlotType.free, None)]
+
+
+def test_intervals_are_clipped_to_the_range():
+    timeline = mergeTimeline(
+        [appointment(1, DAY_START - timedelta(minutes=30))],
+        [event(at(23), DAY_END + timedelta(hours=2))],
+        [],
+        DAY_START,
+        DAY_END,
+    )
+    assert intervals(timeline) == [
+        (DAY_START, at(0, 30), SlotType.booked, "Confirmed"),
+        (at(23), DAY_END, SlotType.blocked, None),
+    ]
+
+
+def test_timeline_is_in_the_timezone_of_the_range():
+    berlin = ZoneInfo("Europe/Berlin")
+    start = datetime(2026, 1, 5, tzinfo=berlin)
+    timeline = mergeTimeline(
+        [appointment(1, datetime(2026, 1, 5, 9, tzinfo=timezone.utc))],
+        [],
+        [],
+        start,
+        start + timedelta(days=1),
+    )
+    assert timeline[0].startTime == datetime(2026, 1, 5, 10, tzinfo=berlin)
+    assert timeline[0].startTime.tzinfo is berlin
+
+
+def test_bucket_by_day_splits_at_local_midnight():
+    berlin = ZoneInfo("Europe/Berlin")
+    late = appointment(1, datetime(2026, 1, 5, 22, 30, tzinfo=timezone.utc))
+    # Ends exactly at local midnight, so it does not reach the next day.
+    evening = appointment(2, datetime(2026, 1, 5, 22, tzinfo=timezone.utc))
+    before = appointment(3, datetime(2026, 1, 1, 12, tzinfo=timezone.utc))
+    buckets = bucketByDay(
+        [late, evening, before], appointmentBounds, berlin, date(2026, 1, 5), date(2026, 1, 7)
+    )
+    assert buckets == {date(2026, 1, 5): [late, evening], date(2026, 1, 6): [late]}
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+from project.single_flight import _in_flight, coalesce, run
+
+
+def test_concurrent_calls_share_one_execution():
+    calls = []
+
+    @coalesce
+    async def read(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return [key]
+
+    async def main():
+        return await asyncio.gather(read(1), read(1), read(2))
+
+    first, second, other = asyncio.run(main())
+    assert first == second == [1]
+    assert first is second
+    assert other == [2]
+    assert calls == [1, 2]
+    assert not _in_flight
+
+
+def test_nothing_is_cached_after_the_call_finishes():
+    calls = []
+
+    @coalesce
+    async def read():
+        calls.append(None)
+
+    async def main():
+        await read()
+        await read()
+
+    asyncio.run(main())
+    assert len(calls) == 2
+
+
+def test_calls_at_different_versions_do_not_share():
+    versions = {"value": 0}
+    calls = []
+
+    @coalesce(version=lambda key: versions["value"])
+    async def read(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+
+    async def main():
+        first = asyncio.ensure_future(read(1))
+        await asyncio.sleep(0)
+        versions["value"] += 1
+        await asyncio.gather(first, read(1), read(1))
+
+    asyncio.run(main())
+    # The first call started before the write; the two after it share a second execution.
+    assert calls == [1, 1]
+
+
+def test_exception_is_shared():
+    calls = []
+
+    async def fail():
+        calls.append(None)
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(
+            run("key", "fail", fail), run("key", "fail", fail), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert [type(result) for result in results] == [ValueError, ValueError]
+    assert len(calls) == 1
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    async def slow():
+        await asyncio.sleep(0.01)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(run("key", "slow", slow))
+        second = asyncio.ensure_future(run("key", "slow", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_unhashable_arguments_run_on_their_own():
+    calls = []
+
+    @coalesce
+    async def read(keys):
+        calls.append(keys)
+        await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(read([1]), read([1]))
+
+    asyncio.run(main())
+    assert calls == [[1], [1]]
@@ -0,0 +1,44 @@
+import uuid
+
+from project.token_revocation import BloomFilter, RevocationSet, _token_key
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    keys = [_token_key(uuid.uuid4().hex) for _ in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+
+
+def test_bloom_filter_false_positive_rate_is_near_its_target():
+    bloom = BloomFilter(1000, 0.01)
+    for _ in range(1000):
+        bloom.add(_token_key(uuid.uuid4().hex))
+    false_positives = sum(_token_key(uuid.uuid4().hex) in bloom for _ in range(10000))
+    assert false_positives < 300
+
+
+def test_token_key_accepts_any_token_id():
+    token_id = uuid.uuid4().hex
+    assert _token_key(token_id) == int(token_id, 16)
+    assert _token_key("legacy-token") == _token_key("legacy-token")
+    assert _token_key("legacy-token") != _token_key("legacy-token2")
+    assert 0 <= _token_key("z" * 32) < 1 << 128
+
+
+def test_revoked_token():
+    revocations = RevocationSet(100)
+    token_id = uuid.uuid4().hex
+    revocations.add_token(token_id)
+    assert revocations.contains(token_id, 1, 1000)
+    assert not revocations.contains(uuid.uuid4().hex, 1, 1000)
+
+
+def test_user_cutoff_revokes_tokens_issued_up_to_it():
+    revocations = RevocationSet(100)
+    revocations.apply({"tokenId": None, "userId": 7, "revokedAt": 1000})
+    revocations.add_user(7, 900)
+    assert revocations.contains(uuid.uuid4().hex, 7, 1000)
+    assert not revocations.contains(uuid.uuid4().hex, 7, 1001)
+    assert not revocations.contains(uuid.uuid4().hex, 8, 1000)